@@ -0,0 +1,50 @@
+from django.contrib import admin
+
+from apps.core.models import APILog, APILogRollup
+
+
+class APILogAdmin(admin.ModelAdmin):
+
+    list_display = ('added_on', 'method', 'path', 'status_code', 'execution_time', 'user_id')
+
+    list_filter = ('method', 'status_code')
+
+    search_fields = ('path',)
+
+    date_hierarchy = 'added_on'
+
+    ordering = ('-added_on',)
+
+    # Evita o COUNT(*) da tabela inteira a cada acesso à listagem
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+admin.site.register(APILog, APILogAdmin)
+
+
+class APILogRollupAdmin(admin.ModelAdmin):
+
+    list_display = ('hour', 'method', 'route', 'count', 'error_count', 'p50', 'p95', 'p99')
+
+    list_filter = ('method',)
+
+    search_fields = ('route',)
+
+    date_hierarchy = 'hour'
+
+    ordering = ('-hour', 'route')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+admin.site.register(APILogRollup, APILogRollupAdmin)
@@ -0,0 +1,311 @@
+"""
+Log assíncrono dos requests da API.
+
+Substitui o `drf_api_logger`, que gravava cada request no banco dentro do
+próprio request. O `APILogMiddleware` só monta um registro compacto (corpos
+truncados e com segredos mascarados) e o coloca num buffer:
+
+- `memory`: ring buffer do processo, descarregado por uma thread em segundo
+  plano a cada `API_LOG_FLUSH_INTERVAL` segundos (ou ao juntar um lote) e
+  pelo hook `worker_exit` do gunicorn;
+- `redis`: stream compartilhado entre os workers, descarregado pela task
+  periódica do Celery beat.
+
+Nos dois casos o buffer é limitado a `API_LOG_BUFFER_SIZE` registros: se o
+flusher atrasar, os mais antigos são descartados em vez de crescer a memória.
+A amostragem é decidida por rota e status (`API_LOG_SAMPLE_RULES`).
+"""
+import ipaddress
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from fnmatch import fnmatchcase
+
+import orjson
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from rest_framework.settings import api_settings
+
+from apps.core.logs import logger
+from apps.core.models import APILog
+from apps.core.redis_client import get_redis
+
+FLUSH_BATCH_SIZE = 500
+
+# Content-types cujo corpo é texto e pode ir para o log
+TEXT_CONTENT_TYPES = ('application/json', 'application/x-www-form-urlencoded', 'text/')
+
+# Chaves cujo valor nunca é gravado (senhas, tokens de acesso/refresh...).
+# Casam pelo nome inteiro: `access_level` ou `token_generation` não são segredos.
+SENSITIVE_KEYS = (
+    'password', 'new_password', 'old_password', 'current_password', 'password_confirm',
+    'token', 'tokens', 'access', 'refresh', 'access_token', 'refresh_token',
+    'secret', 'client_secret', 'api_key',
+)
+_SENSITIVE_KEY = '(?:' + '|'.join(map(re.escape, SENSITIVE_KEYS)) + ')'
+_JSON_SECRET = re.compile(
+    rf'("{_SENSITIVE_KEY}"\s*:\s*)(?:"(?:[^"\\]|\\.)*"?|\[[^\]]*\]?)', re.IGNORECASE)
+_FORM_SECRET = re.compile(rf'((?:^|&){_SENSITIVE_KEY}=)[^&]*', re.IGNORECASE)
+MASK = '"***"'
+
+
+class InMemoryAPILogBuffer:
+    """Ring buffer local ao processo (um por worker do gunicorn)."""
+
+    def __init__(self, size):
+        self._lock = threading.Lock()
+        self._records = deque(maxlen=size)
+        self._dropped = 0
+
+    def push(self, record):
+        with self._lock:
+            if len(self._records) == self._records.maxlen:
+                self._dropped += 1
+            self._records.append(record)
+            return len(self._records)
+
+    def drain(self):
+        with self._lock:
+            records, dropped = list(self._records), self._dropped
+            self._records.clear()
+            self._dropped = 0
+        if dropped:
+            logger.warning("Buffer de log da API cheio: %s registros descartados", dropped)
+        return records
+
+
+class RedisAPILogBuffer:
+    """Stream compartilhado entre workers, drenado pela task do beat."""
+
+    STREAM_KEY = 'api_log:stream'
+
+    def __init__(self, size):
+        self._size = size
+
+    def push(self, record):
+        # MAXLEN aproximado: o Redis corta em blocos inteiros, bem mais barato
+        get_redis().xadd(self.STREAM_KEY, {'r': orjson.dumps(record)}, maxlen=self._size, approximate=True)
+
+    def drain(self):
+        # MULTI/EXEC: leitura e limpeza atômicas, como no buffer do login
+        pipe = get_redis().pipeline(transaction=True)
+        pipe.xrange(self.STREAM_KEY)
+        pipe.delete(self.STREAM_KEY)
+        entries, _ = pipe.execute()
+        return [orjson.loads(fields[b'r']) for _, fields in entries]
+
+
+_BUFFER_CLASSES = {
+    'memory': InMemoryAPILogBuffer,
+    'redis': RedisAPILogBuffer,
+}
+_buffers = {}
+
+
+def get_api_log_buffer():
+    backend = settings.API_LOG_BACKEND
+    if backend not in _buffers:
+        _buffers[backend] = _BUFFER_CLASSES[backend](settings.API_LOG_BUFFER_SIZE)
+    return _buffers[backend]
+
+
+class APILogFlusher(threading.Thread):
+    """Descarrega o buffer em memória fora do caminho dos requests."""
+
+    def __init__(self):
+        super().__init__(name='api-log-flusher', daemon=True)
+        self.pid = os.getpid()
+        self._wake = threading.Event()
+
+    def wake(self):
+        self._wake.set()
+
+    def run(self):
+        while True:
+            self._wake.wait(settings.API_LOG_FLUSH_INTERVAL)
+            self._wake.clear()
+            try:
+                flush_api_logs()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Falha ao descarregar o log da API")
+            finally:
+                # A thread tem a própria conexão; não a deixa aberta entre ciclos
+                connection.close()
+
+
+_flusher = None
+_flusher_lock = threading.Lock()
+
+
+def get_flusher():
+    """Thread do processo atual, criada no primeiro uso (inclusive após o fork)."""
+    global _flusher  # pylint: disable=global-statement
+    if _flusher is None or _flusher.pid != os.getpid():
+        with _flusher_lock:
+            if _flusher is None or _flusher.pid != os.getpid():
+                _flusher = APILogFlusher()
+                _flusher.start()
+    return _flusher
+
+
+def get_sample_rate(route, status_code):
+    """Taxa da primeira regra `(rota, status, taxa)` que casar; senão `API_LOG_SAMPLE_RATE`."""
+    status_code = str(status_code)
+    for route_pattern, status_pattern, rate in settings.API_LOG_SAMPLE_RULES:
+        if fnmatchcase(route, route_pattern) and fnmatchcase(status_code, status_pattern):
+            return rate
+    return settings.API_LOG_SAMPLE_RATE
+
+
+def summarize_body(content, content_type):
+    """Corpo truncado em `API_LOG_MAX_BODY_LENGTH` bytes e com os segredos mascarados."""
+    if not content:
+        return ''
+    content_type = (content_type or '').split(';')[0].strip().lower()
+    if not content_type.startswith(TEXT_CONTENT_TYPES):
+        return f'<{content_type or "binary"}: {len(content)} bytes>'
+    text = bytes(content[:settings.API_LOG_MAX_BODY_LENGTH]).decode(errors='replace')
+    if content_type == 'application/x-www-form-urlencoded':
+        text = _FORM_SECRET.sub(r'\1***', text)
+    else:
+        text = _JSON_SECRET.sub(rf'\1{MASK}', text)
+    if len(content) > settings.API_LOG_MAX_BODY_LENGTH:
+        text += f'... <{len(content)} bytes>'
+    return text
+
+
+def read_request_body(request):
+    """
+    Lê o corpo antes da view, que depois o consome do cache do HttpRequest.
+
+    Uploads (multipart) e corpos acima de `API_LOG_MAX_BODY_READ` não são lidos
+    aqui: ficariam inteiros na memória só para o log.
+    """
+    content_type = request.META.get('CONTENT_TYPE', '')
+    try:
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        length = 0
+    if not length:
+        return ''
+    if content_type.startswith('multipart/') or length > settings.API_LOG_MAX_BODY_READ:
+        return f'<{content_type.split(";")[0] or "binary"}: {length} bytes>'
+    return summarize_body(request.body, content_type)
+
+
+def get_client_ip(request):
+    """
+    IP do cliente escolhido como no `get_ident` dos throttles do DRF: o
+    `X-Forwarded-For` só é lido com `NUM_PROXIES` configurado, e dele vale o
+    hop gravado pelo proxy confiável mais externo. Os anteriores vêm do
+    próprio cliente e podem ser forjados.
+    """
+    ip = request.META.get('REMOTE_ADDR')
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR')
+    num_proxies = api_settings.NUM_PROXIES
+    if forwarded and num_proxies:
+        hops = forwarded.split(',')
+        ip = hops[-min(num_proxies, len(hops))].strip()
+    try:
+        return str(ipaddress.ip_address(ip))
+    except ValueError:
+        return None
+
+
+def get_user_id(request):
+    # O DRF substitui o `request.user` preguiçoso do AuthenticationMiddleware
+    # pelo usuário autenticado; sem isso, ler o atributo consultaria a sessão.
+    user = request.__dict__.get('user')
+    if user is None or isinstance(user, SimpleLazyObject):
+        return None
+    return str(user.pk) if user.pk is not None else None
+
+
+def record_api_log(record):
+    buffer = get_api_log_buffer()
+    size = buffer.push(record)
+    if isinstance(buffer, InMemoryAPILogBuffer):
+        # A thread é criada mesmo abaixo do lote: ela garante o intervalo
+        flusher = get_flusher()
+        if size >= FLUSH_BATCH_SIZE:
+            flusher.wake()
+
+
+def flush_api_logs():
+    """
+    Persiste em lote o que estiver no buffer.
+
+    :return: quantidade de registros gravados.
+    """
+    records = get_api_log_buffer().drain()
+    APILog.objects.bulk_create(
+        [
+            APILog(**{**record, 'added_on': datetime.fromisoformat(record['added_on'])})
+            for record in records
+        ],
+        batch_size=FLUSH_BATCH_SIZE,
+    )
+    if records:
+        logger.debug("Log da API descarregado: %s registros", len(records))
+    return len(records)
+
+
+class APILogMiddleware:
+    """Registra os requests da API sem escrever no banco durante o request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.API_LOG_ENABLED or request.path.startswith(settings.API_LOG_SKIP_PATHS):
+            return self.get_response(request)
+
+        added_on = timezone.now()
+        start = time.perf_counter()
+        request_body = self._safely(read_request_body, request, default='')
+        response = self.get_response(request)
+        execution_time = (time.perf_counter() - start) * 1000
+        self._safely(self._record, request, response, added_on, execution_time, request_body)
+        return response
+
+    @staticmethod
+    def _safely(func, *args, default=None):
+        # O log nunca derruba o request
+        try:
+            return func(*args)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Falha ao registrar o log da API")
+            return default
+
+    @staticmethod
+    def _record(request, response, added_on, execution_time, request_body):
+        match = request.resolver_match
+        route = match.route if match else ''
+        sample_rate = get_sample_rate(route, response.status_code)
+        if sample_rate <= 0 or (sample_rate < 1 and random.random() >= sample_rate):
+            return
+
+        if response.streaming:
+            response_body = '<streaming>'
+        else:
+            response_body = summarize_body(response.content, response.get('Content-Type'))
+
+        record_api_log({
+            'added_on': added_on.isoformat(),
+            'method': request.method,
+            'path': request.get_full_path()[:512],
+            'route': route[:255],
+            'status_code': response.status_code,
+            'execution_time': round(execution_time, 3),
+            'user_id': get_user_id(request),
+            'client_ip': get_client_ip(request),
+            'request_body': request_body,
+            'response_body': response_body,
+            'sample_rate': sample_rate,
+        })
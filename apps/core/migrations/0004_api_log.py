@@ -0,0 +1,34 @@
+# Generated by Django 5.1.10 on 2026-10-18 18:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_delete_core'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='APILog',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('added_on', models.DateTimeField(db_index=True)),
+                ('method', models.CharField(max_length=10)),
+                ('path', models.CharField(max_length=512)),
+                ('route', models.CharField(blank=True, max_length=255)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('execution_time', models.FloatField()),
+                ('user_id', models.UUIDField(blank=True, null=True)),
+                ('client_ip', models.GenericIPAddressField(blank=True, null=True)),
+                ('request_body', models.TextField(blank=True)),
+                ('response_body', models.TextField(blank=True)),
+                ('sample_rate', models.FloatField(default=1.0)),
+            ],
+            options={
+                'verbose_name': 'log da API',
+                'verbose_name_plural': 'logs da API',
+            },
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.1.10 on 2026-10-18 19:01
+
+from django.db import migrations, models
+
+import apps.core.operations
+
+# Postgres: core_apilog passa a ser particionada por dia (UTC) em added_on.
+# A chave primária precisa incluir a coluna de partição, e tabelas
+# particionadas só aceitam IDENTITY a partir do Postgres 17: o id usa uma
+# sequence. As partições diárias são criadas por apps.core.partitions; até lá
+# (e para as linhas já existentes) vale a partição default.
+PARTITION_SQL = [
+    'ALTER TABLE core_apilog RENAME TO core_apilog_unpartitioned',
+    'CREATE TABLE core_apilog (LIKE core_apilog_unpartitioned INCLUDING DEFAULTS) PARTITION BY RANGE (added_on)',
+    'CREATE TABLE core_apilog_default PARTITION OF core_apilog DEFAULT',
+    'INSERT INTO core_apilog SELECT * FROM core_apilog_unpartitioned',
+    'DROP TABLE core_apilog_unpartitioned',
+    'CREATE SEQUENCE core_apilog_id_seq OWNED BY core_apilog.id',
+    "SELECT setval('core_apilog_id_seq', COALESCE(MAX(id), 0) + 1, false) FROM core_apilog",
+    "ALTER TABLE core_apilog ALTER COLUMN id SET DEFAULT nextval('core_apilog_id_seq')",
+    'ALTER TABLE core_apilog ADD PRIMARY KEY (id, added_on)',
+    'CREATE INDEX core_apilog_added_on_idx ON core_apilog (added_on)',
+]
+
+UNPARTITION_SQL = [
+    'ALTER TABLE core_apilog RENAME TO core_apilog_partitioned',
+    'ALTER SEQUENCE core_apilog_id_seq OWNED BY NONE',
+    'CREATE TABLE core_apilog (LIKE core_apilog_partitioned INCLUDING DEFAULTS)',
+    'ALTER SEQUENCE core_apilog_id_seq OWNED BY core_apilog.id',
+    'INSERT INTO core_apilog SELECT * FROM core_apilog_partitioned',
+    'DROP TABLE core_apilog_partitioned',
+    'ALTER TABLE core_apilog ADD PRIMARY KEY (id)',
+    'CREATE INDEX core_apilog_added_on_idx ON core_apilog (added_on)',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_api_log'),
+    ]
+
+    operations = [
+        apps.core.operations.PostgresOnlyRunSQL(PARTITION_SQL, reverse_sql=UNPARTITION_SQL),
+        migrations.CreateModel(
+            name='APILogRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('method', models.CharField(max_length=10)),
+                ('route', models.CharField(blank=True, max_length=255)),
+                ('count', models.PositiveIntegerField()),
+                ('error_count', models.PositiveIntegerField()),
+                ('p50', models.FloatField()),
+                ('p95', models.FloatField()),
+                ('p99', models.FloatField()),
+            ],
+            options={
+                'verbose_name': 'agregado horário da API',
+                'verbose_name_plural': 'agregados horários da API',
+                'constraints': [models.UniqueConstraint(fields=('hour', 'method', 'route'), name='core_apilogrollup_hour_endpoint_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,64 @@
+from django.db import models
+
+
+class APILog(models.Model):
+    """
+    Request da API registrado pelo `APILogMiddleware` (apps.core.api_logs).
+
+    As linhas são gravadas em lote pelo flusher, nunca no request. `user_id`
+    não é FK: o log não deve impedir a remoção de usuários nem custar um JOIN.
+
+    No Postgres a tabela é particionada por dia em `added_on` (migração 0005 e
+    apps.core.partitions): a retenção descarta partições inteiras e consultas
+    devem sempre filtrar por `added_on`. Painéis usam `APILogRollup`.
+    """
+    id = models.BigAutoField(primary_key=True)
+    added_on = models.DateTimeField(db_index=True)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=512)
+    # padrão da URL (ex.: 'users/<uuid:id>/'); agrupa os requests por endpoint
+    route = models.CharField(max_length=255, blank=True)
+    status_code = models.PositiveSmallIntegerField()
+    # em milissegundos
+    execution_time = models.FloatField()
+    user_id = models.UUIDField(null=True, blank=True)
+    client_ip = models.GenericIPAddressField(null=True, blank=True)
+    request_body = models.TextField(blank=True)
+    response_body = models.TextField(blank=True)
+    # taxa de amostragem aplicada: cada linha representa 1/sample_rate requests
+    sample_rate = models.FloatField(default=1.0)
+
+    class Meta:
+        verbose_name = 'log da API'
+        verbose_name_plural = 'logs da API'
+
+    def __str__(self):
+        return f'{self.method} {self.path} {self.status_code}'
+
+
+class APILogRollup(models.Model):
+    """
+    Agregado por hora e endpoint dos logs da API (apps.core.rollups).
+
+    Os painéis leem esta tabela, nunca as linhas de `APILog`. As contagens já
+    compensam a amostragem (cada linha pesa 1/sample_rate); erros são os 5xx.
+    """
+    hour = models.DateTimeField()
+    method = models.CharField(max_length=10)
+    route = models.CharField(max_length=255, blank=True)
+    count = models.PositiveIntegerField()
+    error_count = models.PositiveIntegerField()
+    # percentis da latência, em milissegundos
+    p50 = models.FloatField()
+    p95 = models.FloatField()
+    p99 = models.FloatField()
+
+    class Meta:
+        verbose_name = 'agregado horário da API'
+        verbose_name_plural = 'agregados horários da API'
+        constraints = [
+            models.UniqueConstraint(fields=['hour', 'method', 'route'], name='core_apilogrollup_hour_endpoint_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.hour:%Y-%m-%d %H:00} {self.method} {self.route}'
@@ -0,0 +1,35 @@
+"""
+Operações de migração restritas ao Postgres.
+
+O SQL só roda no Postgres, o que mantém o SQLite dos testes e do
+desenvolvimento funcionando.
+"""
+from django.db import migrations
+
+
+class PostgresOnlyMixin:
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class PostgresOnlyAddIndex(PostgresOnlyMixin, migrations.AddIndex):
+    """
+    `AddIndex` para índices específicos do Postgres (GIN, GiST, ...).
+
+    O índice fica fora do estado dos models (e portanto fora do
+    `Meta.indexes`): o SQLite recria a tabela a partir do estado em qualquer
+    ALTER e tentaria recriar junto um índice que não sabe compilar.
+    """
+
+    def state_forwards(self, app_label, state):
+        pass
+
+
+class PostgresOnlyRunSQL(PostgresOnlyMixin, migrations.RunSQL):
+    """`RunSQL` com SQL específico do Postgres (particionamento, ...)."""
@@ -0,0 +1,42 @@
+"""
+Parsers da API: JSON via orjson (padrão) e MessagePack via `Content-Type`.
+"""
+import msgpack
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+
+class ORJSONParser(JSONParser):
+    """`JSONParser` do DRF com o decode feito pelo orjson."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+def _reject_ext_type(code, data):
+    raise ValueError(f'ExtType {code} não é aceito')
+
+
+class MessagePackParser(BaseParser):
+    """
+    Aceita apenas o que o JSON também representa: `ExtType` é recusado e o
+    timestamp nativo do MessagePack vira `datetime`.
+    """
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False, ext_hook=_reject_ext_type, timestamp=3)
+        # ValueError inclui ExtraData, FormatError e StackError; TypeError vem
+        # de chaves de map não hasheáveis
+        except (ValueError, TypeError, msgpack.UnpackException) as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
+
+
+class LegacyMessagePackParser(MessagePackParser):
+    """Aceita o media type antigo `application/x-msgpack`."""
+    media_type = 'application/x-msgpack'
@@ -0,0 +1,126 @@
+"""
+Partições diárias do log da API no Postgres.
+
+`core_apilog` é particionada por dia (UTC) em `added_on` (migração 0005).
+`maintain_api_log_partitions`, chamada de hora em hora pelo Celery beat:
+
+- cria as partições de hoje até `PARTITIONS_AHEAD` dias à frente; linhas que
+  tenham caído na partição default para esses dias são movidas antes do
+  ATTACH;
+- descarta com DROP TABLE as partições mais antigas que
+  `API_LOG_RETENTION_DAYS`, sem DELETE nem VACUUM da tabela inteira.
+
+Fora do Postgres (testes, desenvolvimento) a tabela não é particionada e a
+retenção cai para um DELETE comum.
+"""
+import re
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.core.logs import logger
+from apps.core.models import APILog, APILogRollup
+
+PARTITIONS_AHEAD = 3
+
+PARENT_TABLE = APILog._meta.db_table
+DEFAULT_PARTITION = f'{PARENT_TABLE}_default'
+_PARTITION_NAME = re.compile(rf'^{PARENT_TABLE}_p(\d{{8}})$')
+
+
+def partition_name(day):
+    return f'{PARENT_TABLE}_p{day:%Y%m%d}'
+
+
+def day_bounds(day):
+    start = datetime.combine(day, time.min, tzinfo=dt_timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+def is_partitioned():
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)', [PARENT_TABLE])
+        return cursor.fetchone() is not None
+
+
+def list_partitions():
+    """Partições diárias existentes, `{dia: nome}` (a default fica de fora)."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+            'WHERE i.inhparent = to_regclass(%s)', [PARENT_TABLE])
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = {}
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions[datetime.strptime(match.group(1), '%Y%m%d').date()] = name
+    return partitions
+
+
+def create_partition(day):
+    """
+    Cria a partição de `day` como tabela avulsa e a anexa à principal.
+
+    O ATTACH recusa a partição se a default tiver linhas do mesmo dia; elas
+    são movidas na mesma transação.
+    """
+    name = connection.ops.quote_name(partition_name(day))
+    parent = connection.ops.quote_name(PARENT_TABLE)
+    default = connection.ops.quote_name(DEFAULT_PARTITION)
+    start, end = day_bounds(day)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE {name} (LIKE {parent} INCLUDING DEFAULTS)')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {default} WHERE added_on >= %s AND added_on < %s RETURNING *) '
+            f'INSERT INTO {name} SELECT * FROM moved', [start, end])
+        cursor.execute(
+            f'ALTER TABLE {parent} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)',
+            [start.isoformat(), end.isoformat()])
+
+
+def drop_partition(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE {connection.ops.quote_name(name)}')
+
+
+def maintain_api_log_partitions(today=None):
+    """
+    :return: dict com as partições criadas e descartadas e as linhas removidas
+        por DELETE (partição default ou banco sem particionamento).
+    """
+    today = today or timezone.now().astimezone(dt_timezone.utc).date()
+    cutoff = today - timedelta(days=settings.API_LOG_RETENTION_DAYS)
+    cutoff_at, _ = day_bounds(cutoff)
+    result = {'created': [], 'dropped': [], 'deleted': 0}
+
+    if is_partitioned():
+        partitions = list_partitions()
+        for offset in range(PARTITIONS_AHEAD + 1):
+            day = today + timedelta(days=offset)
+            if day not in partitions:
+                create_partition(day)
+                result['created'].append(partition_name(day))
+        for day, name in sorted(partitions.items()):
+            if day < cutoff:
+                drop_partition(name)
+                result['dropped'].append(name)
+        # Só sobra na default o que chegou sem partição (ex.: linhas antigas)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {connection.ops.quote_name(DEFAULT_PARTITION)} WHERE added_on < %s', [cutoff_at])
+            result['deleted'] = cursor.rowcount
+    else:
+        result['deleted'], _ = APILog.objects.filter(added_on__lt=cutoff_at).delete()
+
+    rollup_cutoff, _ = day_bounds(today - timedelta(days=settings.API_LOG_ROLLUP_RETENTION_DAYS))
+    APILogRollup.objects.filter(hour__lt=rollup_cutoff).delete()
+
+    if result['created'] or result['dropped'] or result['deleted']:
+        logger.info("Partições do log da API: %s", result)
+    return result
@@ -0,0 +1,17 @@
+import redis
+from django.conf import settings
+
+_client = None
+
+
+def get_redis():
+    """
+    Retorna um cliente Redis compartilhado pelo processo.
+
+    O pool de conexões é criado na primeira chamada (após o fork do gunicorn),
+    reaproveitando a mesma instância de Redis usada pelo Celery.
+    """
+    global _client  # pylint: disable=global-statement
+    if _client is None:
+        _client = redis.Redis.from_url(settings.REDIS_URL)
+    return _client
@@ -0,0 +1,85 @@
+"""
+Renderers da API: JSON via orjson (padrão) e MessagePack via `Accept`.
+
+O orjson serializa nativamente UUID, datetime, enums (inclusive
+`TextChoices`) e subclasses de dict/str como `ReturnDict` e `ErrorDetail`;
+o que sobra passa por `to_builtin`, que também é usado pelo MessagePack.
+Datetimes seguem o formato do `JSONEncoder` do DRF (UTC com sufixo `Z`).
+"""
+import datetime
+import decimal
+import enum
+import uuid
+
+import msgpack
+import orjson
+from django.db.models.query import QuerySet
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def _isoformat(value):
+    representation = value.isoformat()
+    if representation.endswith('+00:00'):
+        representation = representation[:-6] + 'Z'
+    return representation
+
+
+def to_builtin(obj):
+    """Converte tipos que os encoders não conhecem (equivalente ao `default` do json)."""
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return _isoformat(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, decimal.Decimal):
+        # Mesmo comportamento do JSONEncoder do DRF
+        return float(obj) if not api_settings.COERCE_DECIMAL_TO_STRING else str(obj)
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    if isinstance(obj, QuerySet):
+        return list(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, '__getitem__') and hasattr(obj, 'keys'):
+        return dict(obj)
+    if hasattr(obj, '__iter__'):
+        return list(obj)
+    raise TypeError(f'Tipo não serializável: {type(obj).__name__}')
+
+
+class ORJSONRenderer(JSONRenderer):
+    """`JSONRenderer` do DRF com o encode feito pelo orjson."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        options = ORJSON_OPTIONS
+        # O orjson só indenta com 2 espaços; qualquer indent pedido (ex.: pela
+        # API navegável) vira 2
+        if self.get_indent(accepted_media_type or '', renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=to_builtin, option=options)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=to_builtin, use_bin_type=True)
@@ -0,0 +1,106 @@
+"""
+Agregados horários do log da API.
+
+`rollup_api_logs`, chamada de hora em hora pelo Celery beat, resume cada hora
+já encerrada de `APILog` em uma linha de `APILogRollup` por endpoint
+(método + rota): contagem, erros (5xx) e percentis de latência.
+
+Cada linha do log pesa 1/sample_rate, então contagens e percentis estimam o
+tráfego real mesmo com a amostragem por rota e status do middleware. Os
+percentis são por posição acumulada (o menor tempo cujo peso acumulado chega a
+p% do total), calculados pelo banco com funções de janela sobre uma única
+hora, que no Postgres lê uma única partição.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from apps.core.logs import logger
+from apps.core.models import APILog, APILogRollup
+
+PERCENTILES = {'p50': 0.50, 'p95': 0.95, 'p99': 0.99}
+
+ROLLUP_SQL = """
+    SELECT method, route, SUM(weight),
+           SUM(CASE WHEN status_code >= 500 THEN weight ELSE 0 END),
+           {percentiles}
+    FROM (
+        SELECT method, route, status_code, execution_time, 1.0 / sample_rate AS weight,
+               SUM(1.0 / sample_rate) OVER (
+                   PARTITION BY method, route ORDER BY execution_time ROWS UNBOUNDED PRECEDING
+               ) AS running,
+               SUM(1.0 / sample_rate) OVER (PARTITION BY method, route) AS total
+        FROM {table}
+        WHERE added_on >= %s AND added_on < %s AND sample_rate > 0
+    ) AS weighted
+    GROUP BY method, route
+""".format(
+    table=APILog._meta.db_table,
+    percentiles=', '.join(
+        f'MIN(CASE WHEN running >= {fraction} * total THEN execution_time END)'
+        for fraction in PERCENTILES.values()
+    ),
+)
+
+
+def truncate_hour(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def rollup_hour(hour):
+    """
+    (Re)calcula os agregados da hora iniciada em `hour`; idempotente.
+
+    :return: quantidade de endpoints agregados.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(ROLLUP_SQL, [
+            connection.ops.adapt_datetimefield_value(value) for value in (hour, hour + timedelta(hours=1))
+        ])
+        rows = cursor.fetchall()
+    rollups = [
+        APILogRollup(
+            hour=hour, method=method, route=route, count=round(count), error_count=round(errors),
+            **dict(zip(PERCENTILES, percentiles)),
+        )
+        for method, route, count, errors, *percentiles in rows
+    ]
+    with transaction.atomic():
+        APILogRollup.objects.filter(hour=hour).delete()
+        APILogRollup.objects.bulk_create(rollups)
+    return len(rollups)
+
+
+def rollup_api_logs(now=None):
+    """
+    Agrega as horas encerradas desde o último agregado (ou desde o log mais
+    antigo ainda retido).
+
+    Uma hora só é considerada encerrada depois de dois intervalos de flush,
+    para que os registros ainda nos buffers do middleware entrem nela.
+
+    :return: dict `{hora ISO: endpoints agregados}`.
+    """
+    now = now or timezone.now()
+    end = truncate_hour(now - timedelta(seconds=2 * settings.API_LOG_FLUSH_INTERVAL))
+    last = APILogRollup.objects.aggregate(last=Max('hour'))['last']
+    if last is not None:
+        start = last + timedelta(hours=1)
+    else:
+        oldest = APILog.objects.aggregate(oldest=Min('added_on'))['oldest']
+        if oldest is None:
+            return {}
+        start = truncate_hour(oldest)
+    start = max(start, truncate_hour(now - timedelta(days=settings.API_LOG_RETENTION_DAYS)))
+
+    result = {}
+    hour = start
+    while hour < end:
+        result[hour.isoformat()] = rollup_hour(hour)
+        hour += timedelta(hours=1)
+    if result:
+        logger.info("Log da API agregado: %s horas", len(result))
+    return result
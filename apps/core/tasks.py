@@ -0,0 +1,40 @@
+from celery import shared_task
+from django.conf import settings
+
+from apps.core.api_logs import flush_api_logs
+from apps.core.partitions import maintain_api_log_partitions
+from apps.core.rollups import rollup_api_logs
+
+
+@shared_task(
+    name="task_flush_api_logs",
+    queue="default",
+)
+def task_flush_api_logs():
+    """
+    Descarrega o stream de log da API no Redis (agendada no Celery beat).
+
+    O buffer em memória é local a cada processo do gunicorn e tem a própria
+    thread de flush; esta task só enxerga o backend `redis`.
+    """
+    if not settings.API_LOG_ENABLED or settings.API_LOG_BACKEND != 'redis':
+        return None
+    return flush_api_logs()
+
+
+@shared_task(
+    name="task_maintain_api_log_partitions",
+    queue="default",
+)
+def task_maintain_api_log_partitions():
+    """Cria as próximas partições do log da API e descarta as expiradas (agendada no Celery beat)."""
+    return maintain_api_log_partitions()
+
+
+@shared_task(
+    name="task_rollup_api_logs",
+    queue="default",
+)
+def task_rollup_api_logs():
+    """Agrega as horas encerradas do log da API (agendada no Celery beat)."""
+    return rollup_api_logs()
@@ -0,0 +1,285 @@
+import datetime
+import io
+import uuid
+
+import msgpack
+import orjson
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.test import APIClient
+
+from apps.core import api_logs
+from apps.core.models import APILog, APILogRollup
+from apps.core.parsers import MessagePackParser
+from apps.core.partitions import maintain_api_log_partitions
+from apps.core.rollups import rollup_api_logs
+from apps.core.renderers import MessagePackRenderer, ORJSONRenderer
+from apps.users.choices import CountryChoices
+
+
+@pytest.fixture
+def staff_client():
+    staff = get_user_model().objects.create_user(
+        email='staff@example.com', username='staff', password='password123', is_staff=True)
+    client = APIClient()
+    client.force_authenticate(user=staff)
+    return client
+
+
+def test_renderers_handle_native_types():
+    """UUID, datetime e TextChoices saem no mesmo formato nos dois renderers"""
+    user_id = uuid.uuid4()
+    moment = datetime.datetime(2025, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+    data = {'id': user_id, 'at': moment, 'country': CountryChoices.BRAZIL, 'tags': {'a'}}
+    expected = {'id': str(user_id), 'at': '2025-01-02T03:04:05Z', 'country': 'BR', 'tags': ['a']}
+
+    assert orjson.loads(ORJSONRenderer().render(data)) == expected
+    assert msgpack.unpackb(MessagePackRenderer().render(data)) == expected
+
+
+@pytest.mark.django_db
+def test_list_users_msgpack(staff_client):
+    """`Accept: application/msgpack` devolve a mesma listagem em MessagePack"""
+    url = reverse('users-list')
+    as_json = staff_client.get(url)
+    as_msgpack = staff_client.get(url, HTTP_ACCEPT='application/msgpack')
+
+    assert as_msgpack['Content-Type'] == 'application/msgpack'
+    assert msgpack.unpackb(as_msgpack.content) == orjson.loads(as_json.content)
+
+
+@pytest.mark.django_db
+def test_msgpack_request_body(staff_client):
+    response = staff_client.post(
+        reverse('token-introspect'), {'tokens': ['invalido']}, format='msgpack',
+        HTTP_ACCEPT='application/msgpack')
+
+    assert response.status_code == status.HTTP_200_OK
+    assert msgpack.unpackb(response.content)['results'][0]['valid'] is False
+
+
+@pytest.mark.parametrize('payload', [
+    b'\x81\x80\x01',
+    b'\x81\x91\x01\x01',
+    msgpack.packb({'tokens': msgpack.ExtType(5, b'x')}),
+    b'\xc1',
+    b'\x92\x01',
+])
+def test_invalid_msgpack_body_is_parse_error(payload):
+    """Map com chave não hasheável, ExtType e bytes inválidos viram 400, nunca 500"""
+    with pytest.raises(ParseError):
+        MessagePackParser().parse(io.BytesIO(payload))
+
+
+def test_msgpack_timestamp_becomes_datetime():
+    moment = datetime.datetime(2025, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+    payload = msgpack.packb({'at': msgpack.Timestamp.from_datetime(moment)})
+
+    assert MessagePackParser().parse(io.BytesIO(payload)) == {'at': moment}
+
+
+@pytest.mark.django_db
+def test_invalid_msgpack_body_returns_400(staff_client):
+    response = staff_client.post(reverse('token-introspect'), data=b'\x81\x80\x01', content_type='application/msgpack')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_invalid_json_body_returns_400(staff_client):
+    response = staff_client.post(
+        reverse('token-introspect'), data=b'{"tokens": [', content_type='application/json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_json_errors_keep_format(staff_client):
+    """Respostas de erro (ErrorDetail, strings lazy) continuam serializáveis"""
+    response = APIClient().get(reverse('me'))
+    body = orjson.loads(response.content)
+    assert body['status'] == status.HTTP_401_UNAUTHORIZED
+    assert isinstance(body['message'], str)
+
+
+class _Flusher:
+    """Substitui a thread de flush: os testes descarregam o buffer na mão."""
+
+    def wake(self):
+        pass
+
+
+@pytest.fixture
+def api_log(settings, monkeypatch):
+    settings.API_LOG_ENABLED = True
+    settings.API_LOG_BACKEND = 'memory'
+    settings.API_LOG_SAMPLE_RATE = 1.0
+    settings.API_LOG_SAMPLE_RULES = []
+    monkeypatch.setattr(api_logs, 'get_flusher', _Flusher)
+    monkeypatch.setattr(api_logs, '_buffers', {})
+    return settings
+
+
+@pytest.mark.django_db
+def test_api_log_is_written_outside_the_request(api_log, staff_client, django_assert_num_queries):
+    url = reverse('users-list')
+    staff_client.get(url)  # aquece o que a listagem consulta
+
+    with django_assert_num_queries(2):  # só o que a própria listagem consulta
+        staff_client.get(url, {'page_size': 1})
+    assert not APILog.objects.exists()
+
+    assert api_logs.flush_api_logs() == 2
+    log = APILog.objects.order_by('added_on').last()
+    assert log.method == 'GET'
+    assert log.path == f'{url}?page_size=1'
+    assert log.route == 'users/users-list-service/'
+    assert log.status_code == status.HTTP_200_OK
+    assert log.execution_time > 0
+    assert log.response_body.startswith('{')
+
+
+@pytest.mark.django_db
+def test_api_log_masks_secrets_and_truncates_bodies(api_log):
+    api_log.API_LOG_MAX_BODY_LENGTH = 40
+    APIClient().post(
+        reverse('login'), {'email': 'x@example.com', 'password': 'segredo', 'pad': 'a' * 100}, format='json')
+
+    api_logs.flush_api_logs()
+
+    log = APILog.objects.get()
+    assert log.status_code == status.HTTP_401_UNAUTHORIZED
+    assert 'segredo' not in log.request_body
+    # o corte em 40 bytes cai no meio da senha, que ainda assim é mascarada
+    assert log.request_body.startswith('{"email":"x@example.com","password":"***"')
+    assert log.request_body.endswith('bytes>')
+
+
+def test_summarize_body():
+    assert api_logs.summarize_body(b'', 'application/json') == ''
+    assert api_logs.summarize_body(b'\x81\xa1a\x01', 'application/msgpack') == '<application/msgpack: 4 bytes>'
+    assert api_logs.summarize_body(
+        b'{"refresh": "abc", "tokens": ["a", "b"]}', 'application/json') == '{"refresh": "***", "tokens": "***"}'
+    assert api_logs.summarize_body(b'user=a&password=b', 'application/x-www-form-urlencoded') == 'user=a&password=***'
+
+
+def test_summarize_body_masks_whole_key_names_only():
+    body = b'{"access_level": "admin", "token_generation": 2, "access": "abc", "new_password": "x"}'
+
+    assert api_logs.summarize_body(body, 'application/json') == (
+        '{"access_level": "admin", "token_generation": 2, "access": "***", "new_password": "***"}')
+    assert api_logs.summarize_body(
+        b'access_level=admin&api_key=k', 'application/x-www-form-urlencoded') == 'access_level=admin&api_key=***'
+
+
+@pytest.mark.parametrize('num_proxies, expected', [(None, '10.0.0.1'), (0, '10.0.0.1'), (1, '203.0.113.7')])
+def test_client_ip_ignores_forged_forwarded_hops(settings, rf, num_proxies, expected):
+    """Só o hop do proxy confiável vale; o que o cliente mandou no X-Forwarded-For é ignorado"""
+    settings.REST_FRAMEWORK = {**settings.REST_FRAMEWORK, 'NUM_PROXIES': num_proxies}
+    request = rf.get('/', HTTP_X_FORWARDED_FOR='1.2.3.4, 203.0.113.7', REMOTE_ADDR='10.0.0.1')
+
+    assert api_logs.get_client_ip(request) == expected
+
+
+@pytest.mark.parametrize('route, status_code, expected', [
+    ('users/me-service/', 500, 1.0),
+    ('users/me-service/', 200, 0.25),
+    ('core/task-result/<str:task_id>/', 200, 0.0),
+])
+def test_api_log_sample_rules(settings, route, status_code, expected):
+    settings.API_LOG_SAMPLE_RATE = 0.25
+    settings.API_LOG_SAMPLE_RULES = [('*', '5??', 1.0), ('core/task-result/*', '*', 0.0)]
+
+    assert api_logs.get_sample_rate(route, status_code) == expected
+
+
+@pytest.mark.django_db
+def test_api_log_skips_unsampled_requests(api_log, staff_client):
+    api_log.API_LOG_SAMPLE_RATE = 0.0
+    api_log.API_LOG_SAMPLE_RULES = [('*', '4??', 1.0)]
+
+    staff_client.get(reverse('users-list'))
+    APIClient().get(reverse('me'))
+
+    api_logs.flush_api_logs()
+    assert list(APILog.objects.values_list('status_code', flat=True)) == [status.HTTP_401_UNAUTHORIZED]
+
+
+def test_memory_api_log_buffer_is_bounded():
+    buffer = api_logs.InMemoryAPILogBuffer(size=2)
+    for i in range(3):
+        buffer.push({'i': i})
+
+    assert buffer.drain() == [{'i': 1}, {'i': 2}]
+    assert buffer.drain() == []
+
+
+HOUR = datetime.datetime(2025, 1, 2, 3, tzinfo=datetime.timezone.utc)
+
+
+def add_log(minute, execution_time, status_code=200, sample_rate=1.0, route='users/me/', method='GET'):
+    return APILog.objects.create(
+        added_on=HOUR + datetime.timedelta(minutes=minute), method=method, path=f'/{route}', route=route,
+        status_code=status_code, execution_time=execution_time, sample_rate=sample_rate,
+    )
+
+
+@pytest.mark.django_db
+def test_rollup_counts_and_percentiles_per_endpoint(settings):
+    settings.API_LOG_RETENTION_DAYS = 36500
+    for i in range(1, 101):
+        add_log(i % 60, float(i), status_code=500 if i > 98 else 200)
+    add_log(10, 7.0, method='PUT')
+    add_log(70, 1.0)  # próxima hora, ainda não encerrada
+
+    result = rollup_api_logs(now=HOUR + datetime.timedelta(hours=1, minutes=5))
+
+    assert result == {HOUR.isoformat(): 2}
+    me = APILogRollup.objects.get(hour=HOUR, method='GET')
+    assert (me.count, me.error_count) == (100, 2)
+    assert (me.p50, me.p95, me.p99) == (50.0, 95.0, 99.0)
+    assert APILogRollup.objects.get(hour=HOUR, method='PUT').count == 1
+
+
+@pytest.mark.django_db
+def test_rollup_weights_sampled_rows(settings):
+    settings.API_LOG_RETENTION_DAYS = 36500
+    # 2xx amostrados a 10%, erro registrado sempre: 10 + 1 requests reais
+    add_log(1, 10.0, sample_rate=0.1)
+    add_log(2, 500.0, status_code=500)
+
+    rollup_api_logs(now=HOUR + datetime.timedelta(hours=2))
+
+    rollup = APILogRollup.objects.get()
+    assert (rollup.count, rollup.error_count) == (11, 1)
+    assert rollup.p50 == 10.0 and rollup.p99 == 500.0
+
+
+@pytest.mark.django_db
+def test_rollup_resumes_after_last_hour(settings):
+    settings.API_LOG_RETENTION_DAYS = 36500
+    add_log(1, 1.0)
+    rollup_api_logs(now=HOUR + datetime.timedelta(hours=1, minutes=5))
+    add_log(61, 2.0)
+
+    result = rollup_api_logs(now=HOUR + datetime.timedelta(hours=2, minutes=5))
+
+    assert list(result) == [(HOUR + datetime.timedelta(hours=1)).isoformat()]
+    assert APILogRollup.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_retention_removes_expired_logs_and_rollups(settings):
+    settings.API_LOG_RETENTION_DAYS = 1
+    settings.API_LOG_ROLLUP_RETENTION_DAYS = 1
+    expired, kept = add_log(0, 1.0), add_log(24 * 60, 1.0)
+    APILogRollup.objects.create(hour=HOUR, method='GET', count=1, error_count=0, p50=1, p95=1, p99=1)
+
+    # fora do Postgres não há partições: a retenção vira DELETE
+    result = maintain_api_log_partitions(today=datetime.date(2025, 1, 4))
+
+    assert result == {'created': [], 'dropped': [], 'deleted': 1}
+    assert list(APILog.objects.values_list('pk', flat=True)) == [kept.pk]
+    assert not APILogRollup.objects.exists()
+    assert not APILog.objects.filter(pk=expired.pk).exists()
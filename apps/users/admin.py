@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
 from apps.users.models import User
+from apps.users.pagination import ApproximateCountPaginator
 
 
 class UsersAdmin(UserAdmin):
@@ -31,5 +32,9 @@ class UsersAdmin(UserAdmin):
 
     readonly_fields = ('id', 'last_login', 'date_joined')
 
+    # Evita o COUNT(*) da tabela inteira a cada acesso à listagem
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+
 
 admin.site.register(User, UsersAdmin)
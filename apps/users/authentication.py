@@ -0,0 +1,195 @@
+"""
+Autenticação JWT com resolução do usuário em cache.
+
+O `JWTAuthentication` do simplejwt faz um SELECT em `users_user` a cada
+request autenticado. Aqui o usuário é resolvido em dois níveis:
+
+1. LRU local ao worker, com TTL curto (`AUTH_USER_CACHE_LOCAL_TTL`);
+2. cache do Django no Redis (`AUTH_USER_CACHE_TTL`).
+
+As entradas são snapshots estreitos do `User` (apenas os campos usados pelas
+permissões); os demais campos ficam diferidos e, se acessados, são buscados
+sob demanda pelo ORM. A invalidação é feita pelos signals em
+`apps.users.signals` e pelas views de ativação/inativação.
+
+A geração dos tokens (`User.token_generation`) fica só no cache compartilhado,
+nunca no LRU local: cada request autenticado a lê com um GET no Redis e
+recusa tokens de gerações anteriores. Incrementá-la (`revoke_user_tokens`,
+inativação, troca de senha) revoga todos os tokens do usuário de uma vez, sem
+blacklist token a token.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.core.cache import LocalTTLCache
+from apps.users.models import User
+from apps.users.tokens import TOKEN_GENERATION_CLAIM
+
+SNAPSHOT_FIELDS = ('id', 'email', 'username', 'is_active', 'is_staff', 'is_superuser')
+
+# from_db espera os valores na ordem dos campos concretos do model
+_SNAPSHOT_ATTNAMES = [f.attname for f in User._meta.concrete_fields if f.attname in SNAPSHOT_FIELDS]
+
+_local_cache = LocalTTLCache(
+    maxsize=settings.AUTH_USER_CACHE_LOCAL_MAXSIZE,
+    ttl=settings.AUTH_USER_CACHE_LOCAL_TTL,
+)
+_stats = Counter()
+
+
+def _cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def _generation_key(user_id):
+    return f'auth:gen:{user_id}'
+
+
+def _build_snapshot(values):
+    return User.from_db('default', _SNAPSHOT_ATTNAMES, values)
+
+
+def get_cached_user(user_id):
+    """
+    Resolve o usuário pelo id passando pelos dois níveis de cache.
+
+    :return: instância de `User` com apenas `SNAPSHOT_FIELDS` carregados, ou
+        None se o usuário não existir.
+    """
+    key = _cache_key(user_id)
+
+    values = _local_cache.get(key)
+    if values is not None:
+        _stats['local_hits'] += 1
+        return _build_snapshot(values)
+
+    values = cache.get(key)
+    if values is not None:
+        _stats['shared_hits'] += 1
+        _local_cache.set(key, values)
+        return _build_snapshot(values)
+
+    _stats['misses'] += 1
+    row = User.objects.filter(id=user_id).values_list(*_SNAPSHOT_ATTNAMES, 'token_generation').first()
+    if row is None:
+        return None
+
+    # A mesma consulta já deixa a geração dos tokens no cache
+    values, generation = row[:-1], row[-1]
+    cache.set(key, values, settings.AUTH_USER_CACHE_TTL)
+    cache.set(_generation_key(user_id), generation, settings.AUTH_TOKEN_GENERATION_CACHE_TTL)
+    _local_cache.set(key, values)
+    return _build_snapshot(values)
+
+
+def get_token_generation(user_id):
+    """
+    Geração atual dos tokens do usuário: um GET no cache compartilhado e, no
+    miss, uma consulta de uma coluna.
+
+    :return: None se o usuário não existir.
+    """
+    key = _generation_key(user_id)
+    generation = cache.get(key)
+    if generation is None:
+        generation = User.objects.filter(id=user_id).values_list('token_generation', flat=True).first()
+        if generation is None:
+            return None
+        cache.set(key, generation, settings.AUTH_TOKEN_GENERATION_CACHE_TTL)
+    return generation
+
+
+def is_token_revoked(payload, generation):
+    return payload.get(TOKEN_GENERATION_CLAIM, 0) < generation
+
+
+def invalidate_cached_user(user_id):
+    key = _cache_key(user_id)
+    _local_cache.delete(key)
+    cache.delete_many([key, _generation_key(user_id)])
+
+
+def invalidate_cached_user_on_commit(user_id):
+    """
+    Invalida agora e de novo após o commit: um request concorrente pode ter
+    repovoado o cache com a linha antiga antes da transação terminar.
+    """
+    invalidate_cached_user(user_id)
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
+
+
+def invalidate_cached_users(user_ids):
+    keys = [_cache_key(user_id) for user_id in user_ids]
+    for key in keys:
+        _local_cache.delete(key)
+    cache.delete_many([*keys, *(_generation_key(user_id) for user_id in user_ids)])
+
+
+def invalidate_cached_users_on_commit(user_ids):
+    """`invalidate_cached_user_on_commit` para vários usuários, com um `delete_many` no cache compartilhado."""
+    user_ids = list(user_ids)
+    invalidate_cached_users(user_ids)
+    transaction.on_commit(lambda: invalidate_cached_users(user_ids))
+
+
+def revoke_user_tokens(user_ids):
+    """
+    Revoga todos os tokens já emitidos para os usuários (logout de todas as
+    sessões), com um único UPDATE independente do número de tokens.
+    """
+    user_ids = list(user_ids)
+    User.objects.filter(pk__in=user_ids).update(token_generation=F('token_generation') + 1)
+    invalidate_cached_users_on_commit(user_ids)
+
+
+def get_auth_cache_stats():
+    """Contadores de hits/misses do processo atual."""
+    lookups = sum(_stats.values())
+    hits = _stats['local_hits'] + _stats['shared_hits']
+    return {
+        'local_hits': _stats['local_hits'],
+        'shared_hits': _stats['shared_hits'],
+        'misses': _stats['misses'],
+        'hit_ratio': hits / lookups if lookups else 0.0,
+    }
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    `JWTAuthentication` que resolve o usuário via `get_cached_user`: em um hit
+    de cache o request autenticado não faz nenhuma consulta ao banco.
+    """
+
+    def get_user(self, validated_token):
+        user = self._resolve_user(validated_token)
+        if is_token_revoked(validated_token.payload, get_token_generation(user.pk) or 0):
+            raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+        return user
+
+    def _resolve_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # A checagem de revogação precisa do hash da senha, que não
+            # guardamos em cache.
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = get_cached_user(user_id)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
@@ -0,0 +1,271 @@
+"""
+Filtro de Bloom na frente da blacklist de refresh tokens.
+
+A grande maioria dos tokens verificados não está na blacklist; o filtro
+responde "com certeza não está" sem tocar no banco, e só um resultado
+positivo (real ou falso positivo) cai na consulta a `token_blacklist`.
+
+Para nunca gerar falso negativo:
+- todo `BlacklistedToken` salvo entra no filtro pelo signal em
+  `apps.users.signals`;
+- o filtro só é consultado depois de construído (`rebuild_blacklist_filter`);
+  se não estiver pronto, ou se uma escrita falhar, volta-se ao banco;
+- se nem a escrita nem a invalidação chegarem ao Redis, o processo que viu a
+  falha para de confiar no filtro até o próximo rebuild, e os demais deixam
+  de consultá-lo quando a marca de pronto expira
+  (`TOKEN_BLACKLIST_FILTER_READY_TTL`; a task `task_rebuild_blacklist_filter`
+  o reconstrói antes disso).
+
+Backends (`TOKEN_BLACKLIST_FILTER_BACKEND`):
+- `redis`: bitmap compartilhado entre todos os workers;
+- `memory`: bytearray local ao processo (apenas dev/testes, não enxerga
+  blacklists feitas por outros processos);
+- vazio: filtro desativado.
+"""
+import hashlib
+import math
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from apps.core.logs import logger
+from apps.core.redis_client import get_redis
+
+# Folga para transações abertas antes do início do rebuild e confirmadas depois
+REBUILD_RESCAN_MARGIN = timedelta(minutes=5)
+
+
+def filter_size(capacity, error_rate):
+    """Número de bits e de funções de hash para a capacidade e taxa de erro."""
+    num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+    num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+    return num_bits, num_hashes
+
+
+def bit_positions(value, num_bits, num_hashes):
+    """Posições do valor no filtro (double hashing de Kirsch-Mitzenmacher)."""
+    digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], 'big')
+    h2 = int.from_bytes(digest[8:], 'big') | 1
+    return [(h1 + i * h2) % num_bits for i in range(num_hashes)]
+
+
+class BloomBits:
+    """
+    Bitmap em memória na mesma ordem de bits do Redis (MSB primeiro), para
+    que o resultado de um rebuild local possa ser enviado com um único SET.
+    """
+
+    def __init__(self, num_bits):
+        self.data = bytearray(math.ceil(num_bits / 8))
+
+    def set(self, position):
+        self.data[position >> 3] |= 0x80 >> (position & 7)
+
+    def get(self, position):
+        return bool(self.data[position >> 3] & (0x80 >> (position & 7)))
+
+
+class MemoryBlacklistFilter:
+
+    def __init__(self, num_bits, num_hashes):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.trusted = True
+        self.bits = None
+
+    def is_ready(self):
+        return self.bits is not None
+
+    def add(self, jti):
+        if self.bits is None:
+            return
+        for position in bit_positions(jti, self.num_bits, self.num_hashes):
+            self.bits.set(position)
+
+    def might_contain(self, jti):
+        return all(self.bits.get(p) for p in bit_positions(jti, self.num_bits, self.num_hashes))
+
+    def load(self, bits):
+        self.bits = bits
+        self.trusted = True
+
+    def invalidate(self):
+        self.bits = None
+
+
+class RedisBlacklistFilter:
+
+    KEY = 'token_blacklist:bloom'
+    READY_KEY = 'token_blacklist:bloom:ready'
+
+    def __init__(self, num_bits, num_hashes):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.trusted = True
+
+    def is_ready(self):
+        return bool(get_redis().exists(self.READY_KEY))
+
+    def add(self, jti):
+        pipe = get_redis().pipeline(transaction=False)
+        for position in bit_positions(jti, self.num_bits, self.num_hashes):
+            pipe.setbit(self.KEY, position, 1)
+        pipe.execute()
+
+    def might_contain(self, jti):
+        pipe = get_redis().pipeline(transaction=False)
+        for position in bit_positions(jti, self.num_bits, self.num_hashes):
+            pipe.getbit(self.KEY, position)
+        return all(pipe.execute())
+
+    def load(self, bits):
+        # Troca atômica: o filtro antigo continua válido até o RENAME
+        tmp_key = f'{self.KEY}:rebuild'
+        pipe = get_redis().pipeline(transaction=True)
+        pipe.set(tmp_key, bytes(bits.data))
+        pipe.rename(tmp_key, self.KEY)
+        pipe.set(self.READY_KEY, 1, ex=settings.TOKEN_BLACKLIST_FILTER_READY_TTL or None)
+        pipe.execute()
+        self.trusted = True
+
+    def invalidate(self):
+        get_redis().delete(self.READY_KEY)
+
+
+_FILTER_CLASSES = {
+    'memory': MemoryBlacklistFilter,
+    'redis': RedisBlacklistFilter,
+}
+_filters = {}
+
+
+def get_blacklist_filter():
+    backend = settings.TOKEN_BLACKLIST_FILTER_BACKEND
+    if not backend:
+        return None
+    if backend not in _filters:
+        num_bits, num_hashes = filter_size(
+            settings.TOKEN_BLACKLIST_FILTER_CAPACITY,
+            settings.TOKEN_BLACKLIST_FILTER_ERROR_RATE,
+        )
+        _filters[backend] = _FILTER_CLASSES[backend](num_bits, num_hashes)
+    return _filters[backend]
+
+
+def might_be_blacklisted(jti):
+    """
+    False apenas quando o filtro garante que o jti não está na blacklist;
+    em qualquer dúvida (filtro desativado, não construído ou Redis fora do
+    ar) retorna True para que o banco seja consultado.
+    """
+    bloom = get_blacklist_filter()
+    if bloom is None or not bloom.trusted:
+        return True
+    try:
+        return not bloom.is_ready() or bloom.might_contain(jti)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.warning("Filtro da blacklist indisponível, consultando o banco: %s", e)
+        return True
+
+
+def add_to_blacklist_filter(jti):
+    bloom = get_blacklist_filter()
+    if bloom is None:
+        return
+    try:
+        bloom.add(jti)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        # Sem essa escrita o filtro daria falso negativo para o jti: desliga o
+        # filtro até o próximo rebuild.
+        logger.error("Falha ao adicionar jti ao filtro da blacklist: %s", e)
+        try:
+            bloom.invalidate()
+        except Exception:  # pylint: disable=broad-exception-caught
+            # A marca de pronto continua no Redis: este processo vai ao banco
+            # até o próximo rebuild, os demais até ela expirar
+            bloom.trusted = False
+            logger.error("Falha ao invalidar o filtro da blacklist; filtro desconsiderado até o próximo rebuild")
+
+
+def rebuild_blacklist_filter(chunk_size=5000):
+    """
+    Reconstrói o filtro a partir de todos os `BlacklistedToken`.
+
+    Também é a forma de "limpar" o filtro: bits de tokens já removidos pela
+    poda não podem ser apagados de um Bloom filter.
+
+    :return: quantidade de jtis inseridos.
+    """
+    bloom = get_blacklist_filter()
+    if bloom is None:
+        return 0
+
+    # Tokens gravados durante o rebuild caem no bitmap antigo, que será
+    # substituído, e podem ficar fora da leitura abaixo mesmo com id menor que
+    # a marca d'água (ids são alocados antes do commit, fora de ordem). Depois
+    # da troca, tudo que foi gravado desde o início do rebuild (com folga para
+    # transações ainda abertas) ou acima da marca d'água é reaplicado.
+    started = timezone.now() - REBUILD_RESCAN_MARGIN
+    watermark = BlacklistedToken.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+    bits = BloomBits(bloom.num_bits)
+    total = 0
+    jtis = BlacklistedToken.objects.filter(id__lte=watermark).values_list('token__jti', flat=True)
+    for jti in jtis.iterator(chunk_size=chunk_size):
+        for position in bit_positions(jti, bloom.num_bits, bloom.num_hashes):
+            bits.set(position)
+        total += 1
+    bloom.load(bits)
+
+    recent = BlacklistedToken.objects.filter(Q(id__gt=watermark) | Q(blacklisted_at__gte=started))
+    for token_id, jti in recent.values_list('id', 'token__jti').iterator(chunk_size=chunk_size):
+        bloom.add(jti)
+        total += token_id > watermark
+    return total
+
+
+def prune_expired_tokens(chunk_size=1000):
+    """
+    Remove `OutstandingToken`/`BlacklistedToken` já expirados.
+
+    Percorre os ids por keyset (`id > último id`) e apaga um lote por
+    transação, de modo que nenhum lock fique aberto por muito tempo.
+
+    :return: dict com as linhas removidas por tabela e a duração da execução.
+    """
+    started = time.monotonic()
+    now = timezone.now()
+    removed = {'outstanding_tokens': 0, 'blacklisted_tokens': 0, 'chunks': 0}
+
+    last_id = 0
+    while True:
+        ids = list(
+            OutstandingToken.objects
+            .filter(expires_at__lt=now, id__gt=last_id)
+            .order_by('id')
+            .values_list('id', flat=True)[:chunk_size]
+        )
+        if not ids:
+            break
+        last_id = ids[-1]
+
+        with transaction.atomic():
+            blacklisted, _ = BlacklistedToken.objects.filter(token_id__in=ids).delete()
+            outstanding, _ = OutstandingToken.objects.filter(id__in=ids).delete()
+        removed['blacklisted_tokens'] += blacklisted
+        removed['outstanding_tokens'] += outstanding
+        removed['chunks'] += 1
+
+    if removed['blacklisted_tokens'] and get_blacklist_filter() is not None:
+        # Bits de jtis removidos só saem do filtro com um rebuild
+        rebuild_blacklist_filter()
+
+    removed['elapsed_seconds'] = round(time.monotonic() - started, 3)
+    logger.info("Tokens expirados removidos: %s", removed)
+    return removed
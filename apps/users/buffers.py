@@ -0,0 +1,174 @@
+"""
+Buffer write-behind dos efeitos colaterais do login.
+
+Quando `LOGIN_WRITE_BEHIND` está ativo, o `LoginView` não grava mais
+`last_login` nem o `OutstandingToken` do refresh na hora: os dois vão para
+um buffer (Redis ou memória do processo) e são persistidos em lote por
+`flush_login_buffer`, chamado pela task periódica do Celery beat, pelo
+próprio request quando o buffer passa de `LOGIN_WRITE_BEHIND_MAX_STALENESS`
+segundos e pelo hook `worker_exit` do gunicorn.
+"""
+import json
+import threading
+import time
+from datetime import datetime
+
+from django.conf import settings
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from apps.core.logs import logger
+from apps.core.redis_client import get_redis
+from apps.users.models import User
+
+FLUSH_BATCH_SIZE = 500
+
+
+class InMemoryLoginBuffer:
+    """Buffer local ao processo (um por worker do gunicorn)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_logins = {}
+        self._tokens = []
+        self._oldest = None
+
+    def push_last_login(self, user_id, at):
+        with self._lock:
+            self._last_logins[str(user_id)] = at.isoformat()
+            self._touch()
+
+    def push_outstanding_token(self, record):
+        with self._lock:
+            self._tokens.append(json.dumps(record))
+            self._touch()
+
+    def oldest(self):
+        return self._oldest
+
+    def drain(self):
+        with self._lock:
+            last_logins, tokens = self._last_logins, self._tokens
+            self._last_logins, self._tokens, self._oldest = {}, [], None
+        return last_logins, tokens
+
+    def _touch(self):
+        if self._oldest is None:
+            self._oldest = time.time()
+
+
+class RedisLoginBuffer:
+    """Buffer compartilhado entre workers, drenado pela task do beat."""
+
+    LAST_LOGIN_KEY = 'login_buffer:last_login'
+    TOKENS_KEY = 'login_buffer:outstanding_tokens'
+    OLDEST_KEY = 'login_buffer:oldest'
+
+    def push_last_login(self, user_id, at):
+        pipe = get_redis().pipeline()
+        pipe.hset(self.LAST_LOGIN_KEY, str(user_id), at.isoformat())
+        pipe.set(self.OLDEST_KEY, time.time(), nx=True)
+        pipe.execute()
+
+    def push_outstanding_token(self, record):
+        pipe = get_redis().pipeline()
+        pipe.rpush(self.TOKENS_KEY, json.dumps(record))
+        pipe.set(self.OLDEST_KEY, time.time(), nx=True)
+        pipe.execute()
+
+    def oldest(self):
+        value = get_redis().get(self.OLDEST_KEY)
+        return float(value) if value is not None else None
+
+    def drain(self):
+        # MULTI/EXEC: leitura e limpeza atômicas, nenhum registro é perdido
+        # entre o HGETALL e o DELETE.
+        pipe = get_redis().pipeline(transaction=True)
+        pipe.hgetall(self.LAST_LOGIN_KEY)
+        pipe.lrange(self.TOKENS_KEY, 0, -1)
+        pipe.delete(self.LAST_LOGIN_KEY, self.TOKENS_KEY, self.OLDEST_KEY)
+        raw_last_logins, tokens, _ = pipe.execute()
+        last_logins = {key.decode(): value.decode() for key, value in raw_last_logins.items()}
+        return last_logins, tokens
+
+
+_BUFFER_CLASSES = {
+    'memory': InMemoryLoginBuffer,
+    'redis': RedisLoginBuffer,
+}
+_buffers = {}
+
+
+def get_login_buffer():
+    backend = settings.LOGIN_WRITE_BEHIND_BACKEND
+    if backend not in _buffers:
+        _buffers[backend] = _BUFFER_CLASSES[backend]()
+    return _buffers[backend]
+
+
+def record_last_login(user, at):
+    get_login_buffer().push_last_login(user.id, at)
+    flush_if_stale()
+
+
+def record_outstanding_token(user, jti, token, created_at, expires_at):
+    get_login_buffer().push_outstanding_token({
+        'user_id': str(user.id),
+        'jti': jti,
+        'token': token,
+        'created_at': created_at.isoformat(),
+        'expires_at': expires_at.isoformat(),
+    })
+    flush_if_stale()
+
+
+def flush_if_stale():
+    """
+    Garante a staleness máxima mesmo sem o beat (ex.: buffer em memória, que
+    a task do Celery não enxerga): o primeiro request após o limite descarrega.
+    """
+    oldest = get_login_buffer().oldest()
+    if oldest is not None and time.time() - oldest >= settings.LOGIN_WRITE_BEHIND_MAX_STALENESS:
+        flush_login_buffer()
+
+
+def flush_login_buffer():
+    """
+    Persiste em lote o que estiver no buffer.
+
+    :return: dict com a quantidade de last_login atualizados e tokens criados.
+    """
+    last_logins, tokens = get_login_buffer().drain()
+
+    users = [
+        User(id=user_id, last_login=datetime.fromisoformat(at))
+        for user_id, at in last_logins.items()
+    ]
+    # bulk_update não passa pelo pre_save, então o auto_now de last_login
+    # não sobrescreve o horário real do login.
+    User.objects.bulk_update(users, ['last_login'], batch_size=FLUSH_BATCH_SIZE)
+
+    records = [json.loads(raw) for raw in tokens]
+    # Usuários removidos entre o login e o flush ficam com user=None, como
+    # faria o on_delete=SET_NULL do OutstandingToken.
+    existing_ids = {
+        str(user_id) for user_id in User.objects.filter(
+            id__in={record['user_id'] for record in records}).values_list('id', flat=True)
+    } if records else set()
+    outstanding = []
+    for record in records:
+        outstanding.append(OutstandingToken(
+            user_id=record['user_id'] if record['user_id'] in existing_ids else None,
+            jti=record['jti'],
+            token=record['token'],
+            created_at=datetime.fromisoformat(record['created_at']),
+            expires_at=datetime.fromisoformat(record['expires_at']),
+        ))
+    # ignore_conflicts: um logout antes do flush já cria o OutstandingToken
+    # via get_or_create no blacklist().
+    OutstandingToken.objects.bulk_create(
+        outstanding, batch_size=FLUSH_BATCH_SIZE, ignore_conflicts=True)
+
+    result = {'last_logins': len(users), 'outstanding_tokens': len(outstanding)}
+    if users or outstanding:
+        logger.info("Login buffer descarregado: %s", result)
+    return result
@@ -0,0 +1,99 @@
+"""
+Ativação/inativação em massa de usuários.
+
+O alvo é uma lista de ids ou um filtro da listagem (`apps.users.filters`).
+A alteração é feita por `queryset.update()` condicionado a `is_active` ainda
+diferente do desejado, de modo que linhas já no estado pedido não são
+reescritas e o número de linhas afetadas é exatamente o de alteradas:
+
+- ids: um UPDATE para a lista inteira e um COUNT para separar inalterados de
+  inexistentes;
+- filtro: em lotes de `chunk_size` (SELECT dos ids + UPDATE), porque os ids
+  alterados são necessários para invalidar o cache da autenticação.
+
+O `update()` não dispara signals: `updated_at`, `version`, a geração dos
+tokens (na inativação) e o snapshot da autenticação são atualizados aqui.
+
+Como no `InactivateUser`, ninguém altera a própria conta em massa e só
+superusers alteram superusers: essas linhas (`protected_users`) ficam de fora
+e são contadas em `skipped`.
+"""
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from apps.users.authentication import invalidate_cached_users_on_commit
+from apps.users.filters import filter_users
+from apps.users.models import User
+
+
+def _set_active(queryset, active):
+    changes = {'is_active': active, 'updated_at': timezone.now(), 'version': F('version') + 1}
+    if not active:
+        # Revoga os tokens já emitidos, como o InactivateUser
+        changes['token_generation'] = F('token_generation') + 1
+    return queryset.exclude(is_active=active).update(**changes)
+
+
+def _without(queryset, protected):
+    return queryset if protected is None else queryset.exclude(protected)
+
+
+def _count(queryset, protected):
+    """:return: (total, protegidos) em uma única consulta."""
+    if protected is None:
+        return queryset.count(), 0
+    counts = queryset.aggregate(total=Count('pk'), protected=Count('pk', filter=protected))
+    return counts['total'], counts['protected']
+
+
+def protected_users(actor_id, actor_is_superuser):
+    """Usuários que o autor da alteração em massa não pode alterar."""
+    protected = Q(pk=actor_id)
+    if not actor_is_superuser:
+        protected |= Q(is_superuser=True)
+    return protected
+
+
+def set_active_by_ids(ids, active, protected=None):
+    """
+    :param ids: ids já validados (UUIDs), sem repetição.
+    :param protected: `Q` das linhas que não podem ser alteradas (`protected_users`).
+    :return: relatório `{changed, unchanged, skipped, missing}`.
+    """
+    with transaction.atomic():
+        changed = _set_active(_without(User.objects.filter(pk__in=ids), protected), active)
+        found, skipped = _count(User.objects.filter(pk__in=ids), protected)
+        # Ids inexistentes não estão no cache; invalidar todos evita um SELECT
+        invalidate_cached_users_on_commit(ids)
+    return {'changed': changed, 'unchanged': found - skipped - changed, 'skipped': skipped, 'missing': len(ids) - found}
+
+
+def count_matching(filters):
+    return filter_users(User.objects.all(), filters).count()
+
+
+def set_active_by_filter(filters, active, chunk_size, progress=None, protected=None):
+    """
+    :param filters: parâmetros aceitos por `filter_users` (ex.: `{'organization': 'ACME'}`).
+    :param progress: chamada com o relatório parcial após cada lote.
+    :param protected: `Q` das linhas que não podem ser alteradas (`protected_users`).
+    :return: relatório `{changed, unchanged, skipped, missing}` (`missing` é sempre 0).
+    """
+    report = {'changed': 0, 'unchanged': 0, 'skipped': 0, 'missing': 0}
+    # Contado antes: o próprio UPDATE pode tirar linhas do filtro (ex.: is_active)
+    total, report['skipped'] = _count(filter_users(User.objects.all(), filters), protected)
+    matching = _without(filter_users(User.objects.all(), filters), protected)
+    pending = matching.exclude(is_active=active).order_by('pk').values_list('pk', flat=True)
+    while True:
+        with transaction.atomic():
+            pks = list(pending[:chunk_size])
+            if not pks:
+                break
+            # Repete o filtro: uma linha pode ter mudado entre o SELECT e o UPDATE
+            report['changed'] += _set_active(matching.filter(pk__in=pks), active)
+            invalidate_cached_users_on_commit(pks)
+        if progress is not None:
+            progress(report)
+    report['unchanged'] = max(total - report['skipped'] - report['changed'], 0)
+    return report
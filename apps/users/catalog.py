@@ -0,0 +1,102 @@
+"""
+Catálogo de choices (`/users/choices/`) pré-renderizado.
+
+Os enums só mudam em deploy, então cada combinação de tipo (`language`,
+`country`, `currency`, `timezone` e o pacote `all`), idioma dos rótulos e
+formato (JSON/MessagePack) é renderizada para bytes uma única vez, no import,
+junto com um ETag forte que é o hash do próprio conteúdo. A view só escolhe a
+entrada: sem serializer, sem ORM e sem montar dicts por request.
+
+Sem idioma pedido os rótulos são os definidos em `apps.users.choices`, como
+sempre foram; com `?lang=`/`Accept-Language` passam pelo `gettext` do idioma
+(o que não tiver tradução fica como está).
+"""
+import hashlib
+
+from django.conf import settings
+from django.utils import translation
+
+from apps.core.renderers import MessagePackRenderer, ORJSONRenderer
+from apps.users.choices import CountryChoices, CurrencyChoices, LanguageChoices, TimezoneChoices
+
+CHOICE_TYPES = {
+    'language': LanguageChoices,
+    'country': CountryChoices,
+    'currency': CurrencyChoices,
+    'timezone': TimezoneChoices,
+}
+ALL_TYPES = 'all'
+DEFAULT_TYPE = 'language'
+
+# Idioma padrão do projeto + os idiomas que o próprio usuário pode escolher
+CATALOG_LANGUAGES = tuple(dict.fromkeys(
+    [settings.LANGUAGE_CODE.lower(), *(choice.value.lower() for choice in LanguageChoices)]))
+
+RENDERERS = (ORJSONRenderer, MessagePackRenderer)
+
+
+class CatalogEntry:
+    __slots__ = ('body', 'etag', 'content_type')
+
+    def __init__(self, body, content_type):
+        self.body = body
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self.content_type = content_type
+
+
+def _choices_data(choices_class):
+    # override(None) desativa as traduções: o gettext devolve o próprio rótulo
+    return [{'value': choice.value, 'label': translation.gettext(choice.label)} for choice in choices_class]
+
+
+def build_catalog():
+    """
+    :return: dados e entradas renderizadas, indexados por (tipo, idioma[, formato]);
+        idioma None são os rótulos originais.
+    """
+    data, entries = {}, {}
+    for language in (None, *CATALOG_LANGUAGES):
+        with translation.override(language):
+            by_type = {name: _choices_data(choices_class) for name, choices_class in CHOICE_TYPES.items()}
+        by_type[ALL_TYPES] = dict(by_type)
+        for name, payload in by_type.items():
+            data[name, language] = payload
+            for renderer_class in RENDERERS:
+                renderer = renderer_class()
+                entries[name, language, renderer.format] = CatalogEntry(
+                    renderer.render(payload), renderer.media_type)
+    return data, entries
+
+
+_data, _entries = build_catalog()
+
+
+def resolve_language(request):
+    """`?lang=` ou `Accept-Language`, reduzidos a um idioma do catálogo (None sem correspondência)."""
+    requested = request.query_params.get('lang')
+    candidates = [requested] if requested else [
+        # ordem do cabeçalho; os pesos q= são ignorados
+        part.split(';')[0].strip() for part in request.headers.get('Accept-Language', '').split(',')
+    ]
+    for candidate in candidates:
+        candidate = candidate.lower()
+        if candidate in CATALOG_LANGUAGES:
+            return candidate
+        if candidate.split('-')[0] in CATALOG_LANGUAGES:
+            return candidate.split('-')[0]
+    return None
+
+
+def resolve_type(request):
+    choice_type = request.query_params.get('type', DEFAULT_TYPE).lower()
+    # Tipos desconhecidos sempre caíram no de idiomas
+    return choice_type if choice_type in CHOICE_TYPES or choice_type == ALL_TYPES else DEFAULT_TYPE
+
+
+def get_catalog_data(choice_type, language):
+    return _data[choice_type, language]
+
+
+def get_catalog_entry(choice_type, language, media_format):
+    """:return: `CatalogEntry` ou None se o formato não foi pré-renderizado."""
+    return _entries.get((choice_type, language, media_format))
@@ -0,0 +1,131 @@
+"""
+Caminho rápido (somente leitura) para `UserRetrieveSerializer` e `UserSerializer`.
+
+O `ModelSerializer` refaz a introspecção do model a cada instância e chama
+`to_representation` campo a campo, o que domina a latência da listagem em
+páginas grandes. Aqui os campos de cada serializer são resolvidos uma única
+vez e viram uma função "achatada" que monta o dict direto de uma linha do
+`.values()`:
+
+- campos cujo valor do banco já é a representação final (texto, booleano,
+  inteiro, choices de texto) são copiados;
+- UUIDs viram `str`;
+- os demais usam o próprio `to_representation` do campo do DRF, de modo que
+  a saída é idêntica byte a byte à do serializer;
+- M2M (`groups`, `user_permissions`) são carregados com uma consulta por
+  relação para a página inteira, na ordenação padrão do model relacionado.
+"""
+from collections import defaultdict
+
+from rest_framework import fields as drf_fields
+
+from apps.users.serializers import UserRetrieveSerializer, UserSerializer
+
+PASSTHROUGH_FIELDS = (
+    drf_fields.CharField,
+    drf_fields.EmailField,
+    drf_fields.BooleanField,
+    drf_fields.IntegerField,
+)
+
+
+def _converter(field):
+    """:return: None quando o valor do banco pode ser copiado como está."""
+    field_type = type(field)  # tipo exato: subclasses podem mudar a representação
+    if field_type in PASSTHROUGH_FIELDS:
+        return None
+    if field_type is drf_fields.ChoiceField and all(isinstance(key, str) for key in field.choices):
+        return None
+    if field_type is drf_fields.UUIDField and field.uuid_format == 'hex_verbose':
+        return str
+    return field.to_representation
+
+
+class CompiledSerializer:
+
+    def __init__(self, serializer_class, fields=None):
+        serializer = serializer_class(fields=fields)
+        opts = serializer_class.Meta.model._meta
+        self.pk_attname = opts.pk.attname
+        self.columns = [self.pk_attname]
+        self.m2m = []
+        namespace = {}
+        items = []
+
+        for index, (name, field) in enumerate(serializer.fields.items()):
+            if field.write_only:
+                continue
+            model_field = opts.get_field(field.source)
+            if model_field.many_to_many:
+                self.m2m.append((name, model_field))
+                items.append(f'{name!r}: related[{name!r}].get(row[{self.pk_attname!r}], [])')
+                continue
+
+            attname = model_field.attname
+            if attname not in self.columns:
+                self.columns.append(attname)
+            converter = _converter(field)
+            if converter is None:
+                items.append(f'{name!r}: row[{attname!r}]')
+            else:
+                namespace[f'_c{index}'] = converter
+                items.append(
+                    f'{name!r}: None if row[{attname!r}] is None else _c{index}(row[{attname!r}])')
+
+        source = 'def row_to_dict(row, related):\n    return {' + ', '.join(items) + '}\n'
+        exec(source, namespace)  # pylint: disable=exec-used
+        self.row_to_dict = namespace['row_to_dict']
+
+    def _load_related(self, pks):
+        related = {}
+        for name, model_field in self.m2m:
+            through = model_field.remote_field.through
+            source, target = model_field.m2m_field_name(), model_field.m2m_reverse_field_name()
+            # Mesma ordem do `instance.<m2m>.all()` usado pelo DRF
+            ordering = [
+                f'-{target}__{order[1:]}' if order.startswith('-') else f'{target}__{order}'
+                for order in model_field.related_model._meta.ordering
+            ]
+            by_owner = defaultdict(list)
+            links = through.objects.filter(**{f'{source}__in': pks}).order_by(*ordering)
+            for owner_pk, target_pk in links.values_list(f'{source}_id', f'{target}_id'):
+                by_owner[owner_pk].append(target_pk)
+            related[name] = by_owner
+        return related
+
+    def many(self, rows):
+        """Serializa linhas de `.values(*self.columns)`."""
+        rows = list(rows)
+        related = self._load_related([row[self.pk_attname] for row in rows]) if self.m2m else None
+        return [self.row_to_dict(row, related) for row in rows]
+
+    def one(self, instance):
+        """Serializa uma instância já carregada (ex.: o `request.user`)."""
+        row = {attname: getattr(instance, attname) for attname in self.columns}
+        related = {
+            name: {instance.pk: [obj.pk for obj in getattr(instance, name).all()]}
+            for name, _model_field in self.m2m
+        }
+        return self.row_to_dict(row, related)
+
+
+# Combinações de `?fields=` vêm do cliente: o cache é limitado
+MAX_COMPILED = 256
+_compiled = {}
+
+
+def compiled_serializer(serializer_class, fields=None):
+    """Versão compilada do serializer, opcionalmente restrita a `fields`."""
+    # A ordem da saída é a do serializer, não a dos campos pedidos
+    key = (serializer_class, tuple(sorted(fields)) if fields is not None else None)
+    compiled = _compiled.get(key)
+    if compiled is None:
+        compiled = CompiledSerializer(serializer_class, fields)
+        if len(_compiled) < MAX_COMPILED:
+            _compiled[key] = compiled
+    return compiled
+
+
+# Versões completas compiladas já no import
+for _serializer_class in (UserRetrieveSerializer, UserSerializer):
+    compiled_serializer(_serializer_class)
@@ -0,0 +1,111 @@
+"""
+Requisições condicionais (ETag/Last-Modified) dos recursos de usuário.
+
+O ETag é forte e tem duas partes, `"<versão>-<variante>"`:
+
+- versão: `<User.version>.<hash de (id, updated_at)>`, muda a cada save do
+  usuário e carrega o inteiro usado no `UPDATE ... WHERE version = %s`;
+- variante: hash do formato da resposta (json/msgpack) e do `?fields=`, já
+  que cada representação precisa de um ETag próprio.
+
+`If-None-Match`/`If-Modified-Since` são respondidos com 304 depois de ler
+apenas `version` e `updated_at`, sem serializar nada. `If-Match` compara só a
+versão: o ETag de qualquer representação do usuário serve para condicionar
+uma escrita.
+
+Toda escrita condicionada à versão (`User.update_if_version`) que perde para
+outra escrita responde 412 (`PreconditionFailed`), com ou sem `If-Match`: a
+versão esperada é então a lida no próprio request.
+"""
+import hashlib
+
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from apps.users.models import User
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'O usuário foi alterado desde a última leitura. Busque a versão atual e tente novamente.'
+    default_code = 'precondition_failed'
+
+
+def current_validators(pk):
+    """`(version, updated_at)` do usuário em uma consulta de duas colunas (None se não existir)."""
+    return User.objects.filter(pk=pk).values_list('version', 'updated_at').first()
+
+
+def user_version(pk, version, updated_at):
+    digest = hashlib.sha256(f'{pk}:{updated_at.isoformat()}'.encode()).hexdigest()[:12]
+    return f'{version}.{digest}'
+
+
+def representation_variant(request, fields=None):
+    renderer = getattr(request, 'accepted_renderer', None)
+    media_format = renderer.format if renderer else ''
+    return hashlib.sha256(f'{media_format}:{",".join(fields or ())}'.encode()).hexdigest()[:8]
+
+
+def make_etag(pk, version, updated_at, variant):
+    return f'"{user_version(pk, version, updated_at)}-{variant}"'
+
+
+def user_etag(user, variant):
+    return make_etag(user.pk, user.version, user.updated_at, variant)
+
+
+def is_conditional(request):
+    return 'HTTP_IF_NONE_MATCH' in request.META or 'HTTP_IF_MODIFIED_SINCE' in request.META
+
+
+def none_match_satisfied(if_none_match, etag):
+    """True se o `If-None-Match` (lista, `W/` ou `*`) casa com `etag`."""
+    # Comparação fraca, como pede a RFC 9110 para If-None-Match
+    etags = {candidate.removeprefix('W/') for candidate in parse_etags(if_none_match)}
+    return '*' in etags or etag in etags
+
+
+def is_not_modified(request, etag, updated_at):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        return none_match_satisfied(if_none_match, etag)
+    since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE'))
+    return since is not None and int(updated_at.timestamp()) <= since
+
+
+def check_if_match(request, user):
+    """
+    Valida o `If-Match` contra a versão carregada de `user`.
+
+    :return: `user.version` se o cabeçalho foi enviado e bate, None sem cabeçalho.
+    :raises PreconditionFailed: se nenhum ETag do cabeçalho bate.
+    """
+    if_match = request.META.get('HTTP_IF_MATCH')
+    if if_match is None:
+        return None
+    etags = parse_etags(if_match)
+    if '*' in etags:
+        return user.version
+    version = user_version(user.pk, user.version, user.updated_at)
+    # Comparação forte: ETags fracos nunca satisfazem If-Match
+    if not any(candidate.strip('"').split('-')[0] == version
+               for candidate in etags if not candidate.startswith('W/')):
+        raise PreconditionFailed()
+    return user.version
+
+
+def set_validators(response, etag, updated_at):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(updated_at.timestamp())
+    # O cliente pode guardar a resposta, mas revalida antes de cada uso
+    response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ['Accept', 'Authorization'])
+    return response
+
+
+def not_modified_response(etag, updated_at):
+    return set_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag, updated_at)
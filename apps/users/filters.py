@@ -0,0 +1,82 @@
+"""
+Filtros da listagem de usuários.
+
+- `?search=`: cada palavra precisa aparecer (icontains) no email, nome ou
+  sobrenome. No Postgres o `UPPER(col) LIKE UPPER('%termo%')` gerado pelo
+  icontains usa os índices GIN `gin_trgm_ops` sobre `UPPER(col)`; no SQLite
+  a mesma consulta roda sem índice.
+- filtros exatos em `is_active`, `is_staff`, `country`, `language` e
+  `organization`, cada um com um índice `(campo, date_joined, id)` que atende
+  ao filtro e à ordenação da listagem.
+"""
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+from apps.users.models import User
+
+SEARCH_FIELDS = ('email', 'first_name', 'last_name')
+BOOLEAN_FILTERS = ('is_active', 'is_staff')
+CHOICE_FILTERS = ('country', 'language')
+TEXT_FILTERS = ('organization',)
+FILTER_FIELDS = BOOLEAN_FILTERS + CHOICE_FILTERS + TEXT_FILTERS
+MAX_SEARCH_TERMS = 5
+
+TRUE_VALUES = {'true', '1', 'yes'}
+FALSE_VALUES = {'false', '0', 'no'}
+
+
+def parse_filters(params):
+    """
+    Valida os filtros exatos da query string.
+
+    :return: dict pronto para `queryset.filter(**filters)`.
+    """
+    filters, errors = {}, {}
+    for field in BOOLEAN_FILTERS:
+        value = params.get(field)
+        if value is None:
+            continue
+        if value.lower() in TRUE_VALUES:
+            filters[field] = True
+        elif value.lower() in FALSE_VALUES:
+            filters[field] = False
+        else:
+            errors[field] = 'Use true ou false.'
+
+    for field in CHOICE_FILTERS:
+        value = params.get(field)
+        if value is None:
+            continue
+        if value not in dict(User._meta.get_field(field).choices):
+            errors[field] = f'Valor inválido: {value}.'
+        else:
+            filters[field] = value
+
+    for field in TEXT_FILTERS:
+        value = params.get(field)
+        if value is not None:
+            filters[field] = value
+
+    if errors:
+        raise ValidationError(errors)
+    return filters
+
+
+def search_q(search):
+    terms = search.split()[:MAX_SEARCH_TERMS]
+    query = Q()
+    for term in terms:
+        term_q = Q()
+        for field in SEARCH_FIELDS:
+            term_q |= Q(**{f'{field}__icontains': term})
+        query &= term_q
+    return query
+
+
+def filter_users(queryset, params):
+    """Aplica `?search=` e os filtros exatos ao queryset de usuários."""
+    queryset = queryset.filter(**parse_filters(params))
+    search = params.get('search', '').strip()
+    if search:
+        queryset = queryset.filter(search_q(search))
+    return queryset
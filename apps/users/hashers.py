@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class ConfigurablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 com o número de iterações vindo de
+    `PASSWORD_PBKDF2_ITERATIONS`, para ajustar o custo ao hardware sem
+    deploy de código (valor recomendado por `calibrate_password_hashers`).
+
+    Mantém o algoritmo `pbkdf2_sha256`: hashes existentes continuam válidos e
+    são atualizados no próximo login quando o número de iterações muda.
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS or PBKDF2PasswordHasher.iterations
@@ -0,0 +1,189 @@
+"""
+Pool dedicado e limitado para hash de senhas.
+
+O PBKDF2 (e os demais hashers) é o trabalho mais caro do serviço; rodando
+inline, alguns logins simultâneos ocupam todos os workers do gunicorn e
+travam endpoints baratos como o `MeView`. Aqui o hash roda em um pool de
+`PASSWORD_HASHING_WORKERS` threads (o hashlib libera o GIL durante o
+PBKDF2) com no máximo `PASSWORD_HASHING_QUEUE_SIZE` tarefas esperando. Com
+a fila cheia o request é recusado na hora com 503 e `Retry-After`.
+
+O request continua bloqueado esperando o próprio hash; o isolamento vem de a
+capacidade (workers + fila) ficar abaixo de `GUNICORN_THREADS`, de modo que
+logins simultâneos nunca ocupam todas as threads de request do processo.
+
+Só código puramente de CPU roda no pool: nenhuma consulta ao banco é feita
+fora da thread do request.
+
+Hashes desatualizados (hasher ou custo diferente do configurado) são
+refeitos fora do request pela task `task_rehash_password`; a senha vai
+cifrada (Fernet com chave derivada do SECRET_KEY) e com validade curta.
+"""
+import base64
+import hashlib
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from cryptography.fernet import Fernet
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from apps.core.logs import logger
+
+LATENCY_SAMPLES = 1000
+
+
+class HashingCapacityExceeded(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Serviço temporariamente sobrecarregado, tente novamente em instantes.'
+    default_code = 'hashing_capacity_exceeded'
+
+    def __init__(self, wait):
+        super().__init__()
+        # O handler do DRF transforma `wait` no header Retry-After
+        self.wait = wait
+
+
+class HashingPool:
+
+    def __init__(self, workers, queue_size, timeout, retry_after):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hashing')
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._running = 0
+        self._rejected = 0
+        self._completed = 0
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    def run(self, fn, *args):
+        """Executa `fn(*args)` no pool e espera o resultado."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashingCapacityExceeded(self.retry_after)
+
+        with self._lock:
+            self._in_flight += 1
+        future = self._executor.submit(self._execute, fn, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise HashingCapacityExceeded(self.retry_after)
+
+    def _execute(self, fn, *args):
+        with self._lock:
+            self._running += 1
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self._running -= 1
+                self._in_flight -= 1
+                self._completed += 1
+                self._latencies.append(elapsed_ms)
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            in_flight, running = self._in_flight, self._running
+            rejected, completed = self._rejected, self._completed
+        return {
+            'workers': self.workers,
+            'capacity': self.capacity,
+            'running': running,
+            'queue_depth': in_flight - running,
+            'completed': completed,
+            'rejected': rejected,
+            'latency_ms': {
+                'avg': round(sum(latencies) / len(latencies), 2) if latencies else None,
+                'p50': round(latencies[len(latencies) // 2], 2) if latencies else None,
+                'p99': round(latencies[int(len(latencies) * 0.99)], 2) if latencies else None,
+                'max': round(latencies[-1], 2) if latencies else None,
+            },
+        }
+
+
+_pools = {}
+
+
+def get_hashing_pool():
+    config = (
+        settings.PASSWORD_HASHING_WORKERS,
+        settings.PASSWORD_HASHING_QUEUE_SIZE,
+        settings.PASSWORD_HASHING_TIMEOUT,
+        settings.PASSWORD_HASHING_RETRY_AFTER,
+    )
+    if config not in _pools:
+        pool = _pools[config] = HashingPool(*config)
+        if pool.capacity >= settings.GUNICORN_THREADS:
+            # Todas as threads de request poderiam ficar presas em hashes: o
+            # 503 nunca dispararia e o pool não isolaria o resto da API
+            logger.warning(
+                "Capacidade do pool de hash (%s) não é menor que GUNICORN_THREADS (%s)",
+                pool.capacity, settings.GUNICORN_THREADS)
+    return _pools[config]
+
+
+def check_password(user, raw_password):
+    """
+    Equivalente a `user.check_password`, com o hash feito no pool.
+
+    Mantém o upgrade transparente de hashes desatualizados do Django; com
+    `PASSWORD_REHASH_ASYNC` ele é feito pelo Celery, sem atrasar a resposta.
+    """
+    is_correct, must_update = get_hashing_pool().run(hashers.verify_password, raw_password, user.password)
+    if is_correct and must_update:
+        if settings.PASSWORD_REHASH_ASYNC:
+            schedule_rehash(user, raw_password)
+        else:
+            set_password(user, raw_password)
+            # Como no check_password do Django: a senha é a mesma, então o
+            # save não é uma troca de senha (nem revoga os tokens)
+            user._password = None  # pylint: disable=protected-access
+            user.save(update_fields=['password'])
+    return is_correct
+
+
+def set_password(user, raw_password):
+    """Equivalente a `user.set_password`, com o hash feito no pool."""
+    user.password = get_hashing_pool().run(hashers.make_password, raw_password)
+    # Mesmo efeito do AbstractBaseUser.set_password: os validadores de senha
+    # recebem o password_changed no próximo save().
+    user._password = raw_password  # pylint: disable=protected-access
+
+
+def _fernet():
+    key = hashlib.sha256(f'password-rehash:{settings.SECRET_KEY}'.encode()).digest()
+    return Fernet(base64.urlsafe_b64encode(key))
+
+
+def seal_password(raw_password):
+    return _fernet().encrypt(raw_password.encode()).decode()
+
+
+def unseal_password(sealed):
+    """Levanta `cryptography.fernet.InvalidToken` se inválido ou expirado."""
+    return _fernet().decrypt(sealed.encode(), ttl=settings.PASSWORD_REHASH_TTL).decode()
+
+
+def schedule_rehash(user, raw_password):
+    # Import tardio: tasks -> models -> hashing
+    from apps.users.tasks import task_rehash_password  # pylint: disable=import-outside-toplevel
+
+    try:
+        task_rehash_password.delay(str(user.pk), user.password, seal_password(raw_password))
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        # O upgrade é oportunista: fica para o próximo login
+        logger.warning("Não foi possível agendar o rehash da senha do usuário %s: %s", user.pk, e)
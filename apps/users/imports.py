@@ -0,0 +1,240 @@
+"""
+Importação em massa de usuários a partir de CSV/XLSX.
+
+O arquivo é lido em streaming (csv.DictReader ou openpyxl em modo
+read-only) e processado em lotes de `IMPORT_CHUNK_SIZE` linhas:
+
+1. validação de cada linha (e-mail, força da senha via
+   `User.check_password_strength`, choices) e de duplicidade contra o
+   próprio arquivo e contra o banco (um `email__in`/`username__in` por lote);
+2. hash das senhas em paralelo em um pool de processos;
+3. `bulk_create` do lote em uma transação.
+
+Linhas inválidas não interrompem a importação: vão para o relatório de
+erros, com o número da linha no arquivo.
+"""
+import csv
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+
+from apps.users.models import User
+
+REQUIRED_COLUMNS = ('email', 'password')
+OPTIONAL_COLUMNS = (
+    'username', 'first_name', 'last_name', 'language', 'timezone', 'currency',
+    'country', 'organization', 'address', 'state', 'zip_code', 'phone_number',
+)
+CHOICE_COLUMNS = {
+    name: {value for value, _label in User._meta.get_field(name).choices}
+    for name in ('language', 'timezone', 'currency', 'country')
+}
+MAX_LENGTHS = {
+    name: User._meta.get_field(name).max_length for name in OPTIONAL_COLUMNS + ('email',)
+}
+
+
+class ImportFormatError(ValueError):
+    """Arquivo ilegível ou sem as colunas obrigatórias."""
+
+
+def detect_format(filename):
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.xlsx', '.xlsm'):
+        return 'xlsx'
+    raise ImportFormatError(f'Formato não suportado: {extension or filename}. Use CSV ou XLSX.')
+
+
+def iter_rows(path, file_format):
+    """
+    Gera `(número da linha, dict da linha)` sem carregar o arquivo inteiro.
+    """
+    if file_format == 'csv':
+        with open(path, newline='', encoding='utf-8-sig') as csv_file:
+            reader = csv.DictReader(csv_file)
+            _check_columns(reader.fieldnames or [])
+            for line, row in enumerate(reader, start=2):
+                yield line, row
+        return
+
+    try:
+        workbook = load_workbook(path, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError) as e:
+        # KeyError: zip válido sem as partes de uma planilha
+        raise ImportFormatError('Arquivo XLSX inválido ou corrompido.') from e
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else '' for cell in next(rows, [])]
+        _check_columns(header)
+        for line, values in enumerate(rows, start=2):
+            if any(value is not None for value in values):
+                yield line, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def _check_columns(header):
+    missing = [column for column in REQUIRED_COLUMNS if column not in header]
+    if missing:
+        raise ImportFormatError(f'Colunas obrigatórias ausentes: {", ".join(missing)}')
+
+
+def _clean(value):
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+def validate_row(row):
+    """:return: tupla (dados limpos, lista de erros)."""
+    data = {column: _clean(row.get(column)) for column in REQUIRED_COLUMNS + OPTIONAL_COLUMNS}
+    # Sem o campo a planilha segue o padrão da API: username = e-mail
+    data['username'] = data['username'] or data['email']
+    data['email'] = data['email'].lower()
+    errors = []
+
+    try:
+        validate_email(data['email'])
+    except ValidationError:
+        errors.append('E-mail inválido.')
+
+    # a coluna de senha não é removida de `data`: o hash é feito no pool
+    password_error = User.check_password_strength(data['password'])
+    if password_error:
+        errors.append(password_error)
+
+    for column, allowed in CHOICE_COLUMNS.items():
+        if data[column] and data[column] not in allowed:
+            errors.append(f'{column} inválido: {data[column]}.')
+
+    for column in OPTIONAL_COLUMNS + ('email',):
+        max_length = MAX_LENGTHS[column]
+        if len(data[column]) > max_length:
+            errors.append(f'{column} deve ter no máximo {max_length} caracteres.')
+
+    return data, errors
+
+
+def _init_hashing_worker():
+    # Processos criados por spawn/forkserver precisam configurar o Django
+    import django  # pylint: disable=import-outside-toplevel
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    django.setup()
+
+
+def hashing_executor(workers):
+    """
+    Pool de processos para os hashes. Dentro de um worker do Celery (processo
+    daemon, que não pode ter filhos) usa threads; o hashlib libera o GIL
+    durante o PBKDF2, então o hash continua paralelo.
+    """
+    if multiprocessing.current_process().daemon:
+        return ThreadPoolExecutor(max_workers=workers)
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_hashing_worker)
+
+
+def import_users(rows, chunk_size=500, workers=2, max_reported_errors=1000, progress=None):
+    """
+    Importa os usuários de `rows` (iterável de `(linha, dict)`).
+
+    :param progress: callable opcional chamado com o relatório parcial ao
+        fim de cada lote.
+    :return: dict com linhas processadas, usuários criados e erros por linha.
+    """
+    report = {'processed': 0, 'created': 0, 'failed': 0, 'errors': [], 'errors_truncated': False}
+    seen_emails, seen_usernames = set(), set()
+    rows = iter(rows)
+
+    def add_error(line, email, errors):
+        report['failed'] += 1
+        if len(report['errors']) < max_reported_errors:
+            report['errors'].append({'row': line, 'email': email, 'errors': errors})
+        else:
+            report['errors_truncated'] = True
+
+    with hashing_executor(workers) as executor:
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+
+            valid = []
+            for line, row in chunk:
+                data, errors = validate_row(row)
+                if data['email'] in seen_emails:
+                    errors.append('E-mail repetido no arquivo.')
+                if data['username'] in seen_usernames:
+                    errors.append('Username repetido no arquivo.')
+                seen_emails.add(data['email'])
+                seen_usernames.add(data['username'])
+                if errors:
+                    add_error(line, data['email'], errors)
+                else:
+                    valid.append((line, data))
+
+            existing_emails = set(User.objects.filter(
+                email__in=[data['email'] for _line, data in valid]).values_list('email', flat=True))
+            existing_usernames = set(User.objects.filter(
+                username__in=[data['username'] for _line, data in valid]).values_list('username', flat=True))
+            to_create = []
+            for line, data in valid:
+                errors = []
+                if data['email'] in existing_emails:
+                    errors.append('Usuário com este email já existe.')
+                if data['username'] in existing_usernames:
+                    errors.append('Usuário com este username já existe.')
+                if errors:
+                    add_error(line, data['email'], errors)
+                else:
+                    to_create.append((line, data))
+
+            hashes = executor.map(make_password, [data['password'] for _line, data in to_create])
+            users = []
+            for (line, data), encoded in zip(to_create, hashes):
+                # Colunas vazias ficam com o default do model
+                fields = {column: data[column] for column in OPTIONAL_COLUMNS if data[column]}
+                users.append((line, User(email=data['email'], password=encoded, **fields)))
+
+            report['created'] += _insert(users, add_error)
+            report['processed'] += len(chunk)
+            if progress:
+                progress(report)
+
+    return report
+
+
+def _insert(users, add_error):
+    """Insere o lote; em conflito (import concorrente) cai para linha a linha."""
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create([user for _line, user in users])
+        return len(users)
+    except IntegrityError:
+        created = 0
+        for line, user in users:
+            try:
+                with transaction.atomic():
+                    user.save(force_insert=True)
+                created += 1
+            except IntegrityError:
+                add_error(line, user.email, ['Usuário com este email ou username já existe.'])
+        return created
+
+
+def write_error_report(errors, stream):
+    """Escreve o relatório de erros em CSV (linha, email, erros)."""
+    writer = csv.writer(stream)
+    writer.writerow(['row', 'email', 'errors'])
+    for error in errors:
+        writer.writerow([error['row'], error['email'], ' | '.join(error['errors'])])
@@ -0,0 +1,92 @@
+"""
+Introspecção de tokens em lote.
+
+Valida assinatura e expiração de cada token em memória e resolve todos os
+usuários com um único `id__in` e a blacklist com uma única consulta,
+independentemente da quantidade de tokens recebidos.
+"""
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenBackendError, TokenBackendExpiredToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from apps.users.authentication import is_token_revoked
+from apps.users.blacklist import might_be_blacklisted
+from apps.users.keys import get_token_backend
+from apps.users.models import User
+
+TOKEN_TYPES = ('access', 'refresh')
+
+
+def _decode(raw_token):
+    """
+    :return: tupla (payload, erro); apenas um dos dois é preenchido.
+    """
+    try:
+        payload = get_token_backend().decode(raw_token, verify=True)
+    except TokenBackendExpiredToken:
+        return None, _('Token is expired')
+    except TokenBackendError:
+        return None, _('Token is invalid')
+
+    if payload.get(api_settings.TOKEN_TYPE_CLAIM) not in TOKEN_TYPES:
+        return None, _('Token has wrong type')
+    if api_settings.USER_ID_CLAIM not in payload:
+        return None, _('Token contained no recognizable user identification')
+    return payload, None
+
+
+def introspect_tokens(raw_tokens):
+    """
+    :param raw_tokens: lista de access/refresh tokens serializados.
+    :return: lista de resultados, na mesma ordem dos tokens recebidos.
+    """
+    decoded = [_decode(raw_token) for raw_token in raw_tokens]
+    payloads = [payload for payload, _error in decoded if payload]
+
+    user_ids = {payload[api_settings.USER_ID_CLAIM] for payload in payloads}
+    users = {
+        str(user.id): user
+        for user in User.objects.filter(id__in=user_ids).only(
+            'id', 'is_active', 'is_staff', 'is_superuser', 'token_generation')
+    } if user_ids else {}
+
+    # Só vão ao banco os refresh tokens que o filtro de Bloom não descarta
+    candidate_jtis = {
+        payload[api_settings.JTI_CLAIM] for payload in payloads
+        if payload[api_settings.TOKEN_TYPE_CLAIM] == 'refresh'
+        and might_be_blacklisted(payload[api_settings.JTI_CLAIM])
+    }
+    blacklisted = set(
+        BlacklistedToken.objects.filter(token__jti__in=candidate_jtis).values_list('token__jti', flat=True)
+    ) if candidate_jtis else set()
+
+    results = []
+    for payload, error in decoded:
+        if error:
+            results.append({'valid': False, 'error': str(error)})
+            continue
+
+        user = users.get(str(payload[api_settings.USER_ID_CLAIM]))
+        is_blacklisted = payload[api_settings.JTI_CLAIM] in blacklisted
+        is_revoked = bool(user) and is_token_revoked(payload, user.token_generation)
+        result = {
+            'valid': bool(user and user.is_active and not is_blacklisted and not is_revoked),
+            'token_type': payload[api_settings.TOKEN_TYPE_CLAIM],
+            'expires_at': datetime_from_epoch(payload['exp']).isoformat(),
+            'user_id': payload[api_settings.USER_ID_CLAIM],
+            'is_active': user.is_active if user else None,
+            'access_level': user.get_user_access_level() if user else None,
+            'blacklisted': is_blacklisted,
+        }
+        if user is None:
+            result['error'] = str(_('User not found'))
+        elif not user.is_active:
+            result['error'] = str(_('User is inactive'))
+        elif is_blacklisted:
+            result['error'] = str(_('Token is blacklisted'))
+        elif is_revoked:
+            result['error'] = str(_('Token has been revoked'))
+        results.append(result)
+    return results
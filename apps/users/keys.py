@@ -0,0 +1,179 @@
+"""
+Chaves de assinatura dos JWT.
+
+Com `JWT_ALGORITHM` HS* os tokens continuam assinados com o `SECRET_KEY`
+pelo backend padrão do simplejwt. Com RS256 ou EdDSA, as chaves privadas
+ficam em `JWT_KEYS_DIR` (um arquivo `<kid>.pem` por chave):
+
+- apenas `JWT_ACTIVE_KID` assina tokens novos (o `kid` vai no header);
+- todas as chaves do diretório verificam tokens e são publicadas no
+  `/.well-known/jwks.json`, o que permite a rotação com sobreposição;
+- para aposentar uma chave, substitua o `<kid>.pem` privado pela chave
+  pública até o último token assinado por ela expirar, e então remova-o.
+
+Ordem de uma rotação: gere a nova chave (`generate_jwt_key`), faça deploy para
+publicá-la no JWKS, espere o `JWKS_MAX_AGE` e só então troque o
+`JWT_ACTIVE_KID`.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.translation import gettext_lazy as _
+from jwt import ExpiredSignatureError, InvalidTokenError
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError, TokenBackendExpiredToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.state import token_backend as default_token_backend
+
+ASYMMETRIC_ALGORITHMS = {
+    'RS256': rsa.RSAPublicKey,
+    'EdDSA': ed25519.Ed25519PublicKey,
+}
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str
+    algorithm: str
+    public_key: Any
+    private_key: Optional[Any] = None
+
+    def to_jwk(self):
+        if self.algorithm == 'RS256':
+            jwk = RSAAlgorithm.to_jwk(self.public_key, as_dict=True)
+        else:
+            jwk = OKPAlgorithm.to_jwk(self.public_key, as_dict=True)
+        jwk.update({'kid': self.kid, 'alg': self.algorithm, 'use': 'sig'})
+        return jwk
+
+
+def _load_key_file(path):
+    data = path.read_bytes()
+    try:
+        private_key = load_pem_private_key(data, password=None)
+    except ValueError:
+        return None, load_pem_public_key(data)
+    return private_key, private_key.public_key()
+
+
+def load_signing_keys(keys_dir):
+    """Carrega todas as chaves `<kid>.pem` do diretório."""
+    keys = {}
+    for path in sorted(Path(keys_dir).glob('*.pem')):
+        private_key, public_key = _load_key_file(path)
+        algorithm = next(
+            (alg for alg, key_type in ASYMMETRIC_ALGORITHMS.items() if isinstance(public_key, key_type)),
+            None,
+        )
+        if algorithm is None:
+            raise ImproperlyConfigured(f'Tipo de chave não suportado em {path}: use RSA ou Ed25519.')
+        keys[path.stem] = SigningKey(path.stem, algorithm, public_key, private_key)
+    return keys
+
+
+class KeyRingTokenBackend(TokenBackend):
+    """
+    `TokenBackend` com várias chaves: assina com a chave ativa e verifica
+    com a chave indicada pelo `kid` do header do token.
+    """
+
+    def __init__(self, keys, active_kid, **kwargs):
+        active = keys.get(active_kid)
+        if active is None or active.private_key is None:
+            raise ImproperlyConfigured(
+                f'JWT_ACTIVE_KID "{active_kid}" precisa ter uma chave privada em JWT_KEYS_DIR.')
+        super().__init__(active.algorithm, **kwargs)
+        self.keys = keys
+        self.active_key = active
+
+    def encode(self, payload):
+        jwt_payload = payload.copy()
+        if self.audience is not None:
+            jwt_payload['aud'] = self.audience
+        if self.issuer is not None:
+            jwt_payload['iss'] = self.issuer
+
+        return jwt.encode(
+            jwt_payload,
+            self.active_key.private_key,
+            algorithm=self.active_key.algorithm,
+            headers={'kid': self.active_key.kid},
+            json_encoder=self.json_encoder,
+        )
+
+    def decode(self, token, verify=True):
+        try:
+            kid = jwt.get_unverified_header(token).get('kid')
+        except InvalidTokenError as ex:
+            raise TokenBackendError(_('Token is invalid')) from ex
+
+        key = self.keys.get(kid)
+        if key is None:
+            raise TokenBackendError(_('Token is invalid'))
+
+        try:
+            # O algoritmo vem da chave, nunca do header do token
+            return jwt.decode(
+                token,
+                key.public_key,
+                algorithms=[key.algorithm],
+                audience=self.audience,
+                issuer=self.issuer,
+                leeway=self.get_leeway(),
+                options={
+                    'verify_aud': self.audience is not None,
+                    'verify_signature': verify,
+                },
+            )
+        except ExpiredSignatureError as ex:
+            raise TokenBackendExpiredToken(_('Token is expired')) from ex
+        except InvalidTokenError as ex:
+            raise TokenBackendError(_('Token is invalid')) from ex
+
+
+_backend = None
+_jwks = None
+
+
+def is_asymmetric():
+    return settings.JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS
+
+
+def get_token_backend():
+    """Backend usado pelos tokens de `apps.users.tokens`."""
+    global _backend  # pylint: disable=global-statement
+    if not is_asymmetric():
+        return default_token_backend
+    if _backend is None:
+        _backend = KeyRingTokenBackend(
+            load_signing_keys(settings.JWT_KEYS_DIR),
+            settings.JWT_ACTIVE_KID,
+            audience=api_settings.AUDIENCE,
+            issuer=api_settings.ISSUER,
+            leeway=api_settings.LEEWAY,
+            json_encoder=api_settings.JSON_ENCODER,
+        )
+    return _backend
+
+
+def get_jwks():
+    """
+    Documento JWKS já serializado e seu ETag, calculados uma vez por processo.
+
+    :return: tupla (bytes do JSON, etag).
+    """
+    global _jwks  # pylint: disable=global-statement
+    if _jwks is None:
+        keys = get_token_backend().keys.values() if is_asymmetric() else []
+        body = json.dumps({'keys': [key.to_jwk() for key in keys]}, separators=(',', ':')).encode()
+        _jwks = body, f'"{hashlib.sha256(body).hexdigest()}"'
+    return _jwks
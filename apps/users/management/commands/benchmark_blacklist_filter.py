@@ -0,0 +1,87 @@
+import statistics
+import time
+from datetime import timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from apps.users.blacklist import BloomBits, MemoryBlacklistFilter, bit_positions, filter_size
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara a latência da checagem da blacklist com e sem o filtro de Bloom. '
+        'Os tokens semeados ficam em uma transação desfeita ao final; o filtro usado '
+        'é em memória (no backend redis soma-se um round-trip com os GETBIT em pipeline).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tokens', type=int, default=100_000,
+                            help='Quantidade de tokens na blacklist.')
+        parser.add_argument('--lookups', type=int, default=5000,
+                            help='Quantidade de checagens de tokens não blacklistados.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            blacklisted = self._seed(options['tokens'])
+            bloom = self._build_filter(blacklisted)
+            probes = [uuid4().hex for _ in range(options['lookups'])]
+
+            db_times = self._measure(probes, self._check_db)
+            filter_times = self._measure(probes, lambda jti: self._check_filter(bloom, jti))
+            false_positives = sum(bloom.might_contain(jti) for jti in probes)
+
+            transaction.set_rollback(True)
+
+        self._report('sem filtro', db_times)
+        self._report('com filtro', filter_times)
+        self.stdout.write(f'falsos positivos: {false_positives}/{len(probes)}')
+
+    @staticmethod
+    def _seed(count):
+        expires_at = timezone.now() + timedelta(days=1)
+        outstanding = OutstandingToken.objects.bulk_create(
+            [OutstandingToken(jti=uuid4().hex, token='', expires_at=expires_at) for _ in range(count)],
+            batch_size=1000,
+        )
+        BlacklistedToken.objects.bulk_create(
+            [BlacklistedToken(token=token) for token in outstanding], batch_size=1000)
+        return [token.jti for token in outstanding]
+
+    @staticmethod
+    def _build_filter(jtis):
+        num_bits, num_hashes = filter_size(
+            settings.TOKEN_BLACKLIST_FILTER_CAPACITY, settings.TOKEN_BLACKLIST_FILTER_ERROR_RATE)
+        bloom = MemoryBlacklistFilter(num_bits, num_hashes)
+        bits = BloomBits(num_bits)
+        for jti in jtis:
+            for position in bit_positions(jti, num_bits, num_hashes):
+                bits.set(position)
+        bloom.load(bits)
+        return bloom
+
+    @staticmethod
+    def _check_db(jti):
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    def _check_filter(self, bloom, jti):
+        return bloom.might_contain(jti) and self._check_db(jti)
+
+    @staticmethod
+    def _measure(probes, check):
+        times = []
+        for jti in probes:
+            start = time.perf_counter()
+            check(jti)
+            times.append((time.perf_counter() - start) * 1_000_000)
+        return times
+
+    def _report(self, label, times):
+        p99 = statistics.quantiles(times, n=100)[98]
+        self.stdout.write(
+            f'{label:>11}: média {statistics.mean(times):9.1f} µs | '
+            f'p50 {statistics.median(times):9.1f} µs | p99 {p99:9.1f} µs')
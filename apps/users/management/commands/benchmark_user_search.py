@@ -0,0 +1,125 @@
+import statistics
+import time
+from datetime import timedelta
+from uuid import uuid4
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.http import QueryDict
+from django.utils import timezone
+
+from apps.users.filters import filter_users
+from apps.users.models import User
+from apps.users.pagination import KEYSET_ORDERING
+
+FIRST_NAMES = ['Ana', 'Bruno', 'Carla', 'Davi', 'Eva', 'Fábio', 'Gabriela', 'Heitor']
+COUNTRIES = ['BR', 'US', 'CA']
+LANGUAGES = ['EN', 'ES', 'PT']
+
+QUERIES = [
+    'search=silva',
+    'search=bench1234',
+    'search=ana+sobrenome42',
+    'is_active=false',
+    'is_staff=true',
+    'country=CA',
+    'language=ES&is_active=true',
+    'organization=Org+7',
+]
+
+PG_SEED = """
+    INSERT INTO users_user (
+        id, password, is_superuser, username, first_name, last_name, email, is_staff, is_active,
+        date_joined, last_login, updated_at, language, timezone, currency, country, organization,
+        version, token_generation
+    )
+    SELECT
+        gen_random_uuid(), '', false, 'bench' || i,
+        (%(first_names)s::text[])[1 + i %% %(num_first_names)s],
+        CASE WHEN i %% 97 = 0 THEN 'Silva' ELSE 'Sobrenome' || (i %% 50000) END,
+        'bench' || i || '@example.com',
+        i %% 100 = 0, i %% 10 <> 0,
+        now() - make_interval(secs => i), now(), now(),
+        (%(languages)s::text[])[1 + i %% 3], 'UTC+0', 'USD',
+        (%(countries)s::text[])[1 + i %% 3],
+        'Org ' || (i %% 1000),
+        1, 0
+    FROM generate_series(1, %(rows)s) AS i
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede a listagem de usuários com `?search=` e filtros exatos em uma tabela semeada '
+        '(desfeita ao final). No Postgres compara com os índices desligados na sessão.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2_000_000,
+                            help='Usuários semeados (no SQLite use poucas centenas de milhares).')
+        parser.add_argument('--runs', type=int, default=10,
+                            help='Execuções de cada consulta.')
+
+    def handle(self, *args, **options):
+        postgres = connection.vendor == 'postgresql'
+        with transaction.atomic():
+            started = time.perf_counter()
+            self._seed(options['rows'], postgres)
+            self.stdout.write(f'{options["rows"]} usuários semeados em {time.perf_counter() - started:.1f}s')
+
+            for query in QUERIES:
+                indexed = self._measure(query, options['runs'])
+                line = f'{query:>28}: {statistics.median(indexed):9.2f} ms'
+                if postgres:
+                    with connection.cursor() as cursor:
+                        cursor.execute('SET LOCAL enable_indexscan = off')
+                        cursor.execute('SET LOCAL enable_bitmapscan = off')
+                    seq_scan = self._measure(query, options['runs'])
+                    with connection.cursor() as cursor:
+                        cursor.execute('RESET enable_indexscan')
+                        cursor.execute('RESET enable_bitmapscan')
+                    line += f' | sem índices {statistics.median(seq_scan):9.2f} ms'
+                self.stdout.write(line)
+
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def _seed(rows, postgres):
+        if postgres:
+            with connection.cursor() as cursor:
+                cursor.execute(PG_SEED, {
+                    'first_names': FIRST_NAMES,
+                    'num_first_names': len(FIRST_NAMES),
+                    'languages': LANGUAGES,
+                    'countries': COUNTRIES,
+                    'rows': rows,
+                })
+                cursor.execute('ANALYZE users_user')
+            return
+
+        now = timezone.now()
+        batch = []
+        for i in range(1, rows + 1):
+            batch.append(User(
+                id=uuid4(), password='', username=f'bench{i}',
+                first_name=FIRST_NAMES[i % len(FIRST_NAMES)],
+                last_name='Silva' if i % 97 == 0 else f'Sobrenome{i % 50000}',
+                email=f'bench{i}@example.com', is_staff=i % 100 == 0, is_active=i % 10 != 0,
+                date_joined=now - timedelta(seconds=i), language=LANGUAGES[i % 3],
+                country=COUNTRIES[i % 3], organization=f'Org {i % 1000}',
+            ))
+            if len(batch) == 10_000:
+                User.objects.bulk_create(batch)
+                batch = []
+        User.objects.bulk_create(batch)
+
+    @staticmethod
+    def _measure(query, runs):
+        """Primeira página (20 linhas) da listagem filtrada, em ms."""
+        params = QueryDict(query)
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            list(filter_users(User.objects.order_by(*KEYSET_ORDERING), params)[:20])
+            times.append((time.perf_counter() - start) * 1000)
+        return times
@@ -0,0 +1,65 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from apps.users.compiled import compiled_serializer
+from apps.users.models import User
+from apps.users.pagination import KEYSET_ORDERING
+from apps.users.serializers import UserRetrieveSerializer, UserSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara o ModelSerializer do DRF com o serializer compilado ao montar e renderizar '
+        'páginas de usuários (consulta incluída). Os usuários semeados ficam em uma transação '
+        'desfeita ao final.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--runs', type=int, default=50)
+
+    def handle(self, *args, **options):
+        page_size = options['page_size']
+        with transaction.atomic():
+            User.objects.bulk_create([
+                User(email=f'bench{i}@example.com', username=f'bench{i}', password='',
+                     first_name=f'Nome{i}', last_name='Sobrenome', organization=f'Org {i % 10}')
+                for i in range(page_size)
+            ])
+            for serializer_class in (UserRetrieveSerializer, UserSerializer):
+                drf_times = self._measure(
+                    options['runs'], lambda cls=serializer_class: self._drf_page(cls, page_size))
+                compiled_times = self._measure(
+                    options['runs'], lambda cls=serializer_class: self._compiled_page(cls, page_size))
+                self._report(serializer_class.__name__, drf_times, compiled_times)
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def _drf_page(serializer_class, page_size):
+        columns = serializer_class.only_columns(serializer_class.allowed_fields())
+        queryset = User.objects.order_by(*KEYSET_ORDERING).only(*columns)[:page_size]
+        return JSONRenderer().render(serializer_class(queryset, many=True).data)
+
+    @staticmethod
+    def _compiled_page(serializer_class, page_size):
+        compiled = compiled_serializer(serializer_class)
+        rows = User.objects.order_by(*KEYSET_ORDERING).values(*compiled.columns)[:page_size]
+        return JSONRenderer().render(compiled.many(rows))
+
+    @staticmethod
+    def _measure(runs, build_page):
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            build_page()
+            times.append((time.perf_counter() - start) * 1000)
+        return times
+
+    def _report(self, label, drf_times, compiled_times):
+        drf, compiled = statistics.median(drf_times), statistics.median(compiled_times)
+        self.stdout.write(
+            f'{label:>22}: DRF {drf:8.2f} ms | compilado {compiled:8.2f} ms | {drf / compiled:5.1f}x')
@@ -0,0 +1,101 @@
+import math
+import statistics
+import time
+
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand
+
+SAMPLE_PASSWORD = 'Calibr4tion!Password'
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede o custo dos hashers de PASSWORD_HASHERS neste host e recomenda os '
+        'parâmetros (iterações, rounds, time_cost, work_factor) para a latência alvo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target-ms', type=float, default=250,
+                            help='Latência alvo de um hash, em milissegundos.')
+        parser.add_argument('--samples', type=int, default=5,
+                            help='Hashes medidos por configuração (usa a mediana).')
+
+    def handle(self, *args, **options):
+        target = options['target_ms']
+        self.samples = options['samples']
+        self.stdout.write(f'Latência alvo: {target:.0f} ms por hash\n')
+
+        for configured in get_hashers():
+            # Instância nova: a calibração altera atributos de custo
+            hasher = configured.__class__()
+            name = f'{hasher.algorithm} ({hasher.__class__.__name__})'
+            if hasher.library:
+                try:
+                    hasher._load_library()  # pylint: disable=protected-access
+                except ValueError:
+                    self.stdout.write(f'{name}: biblioteca não instalada, ignorado')
+                    continue
+
+            calibrate = getattr(self, f'_calibrate_{hasher.algorithm}', None)
+            if calibrate is None:
+                self.stdout.write(f'{name}: sem parâmetro de custo ajustável, ignorado')
+                continue
+            self.stdout.write(f'{name}: {calibrate(hasher, target)}')
+
+    def _measure(self, encode):
+        times = []
+        for _ in range(self.samples):
+            start = time.perf_counter()
+            encode()
+            times.append((time.perf_counter() - start) * 1000)
+        return statistics.median(times)
+
+    def _report(self, param, current, current_ms, recommended, recommended_ms):
+        return (f'{param} atual={current} ({current_ms:.0f} ms) -> '
+                f'recomendado={recommended} ({recommended_ms:.0f} ms)')
+
+    def _calibrate_linear(self, hasher, target, param, measure, step):
+        """Custo linear no parâmetro (PBKDF2, Argon2 time_cost)."""
+        current = getattr(hasher, param)
+        current_ms = measure(current)
+        recommended = max(step, round(current * target / current_ms / step) * step)
+        return self._report(param, current, current_ms, recommended, measure(recommended))
+
+    def _calibrate_log2(self, hasher, target, param, measure):
+        """Custo exponencial no parâmetro (bcrypt rounds, scrypt work_factor)."""
+        current = getattr(hasher, param)
+        current_ms = measure(current)
+        recommended = max(1, current + round(math.log2(target / current_ms)))
+        return self._report(param, current, current_ms, recommended, measure(recommended))
+
+    def _calibrate_pbkdf2(self, hasher, target, step=10_000):
+        def measure(iterations):
+            return self._measure(lambda: hasher.encode(SAMPLE_PASSWORD, hasher.salt(), iterations=iterations))
+        return self._calibrate_linear(hasher, target, 'iterations', measure, step)
+
+    def _calibrate_pbkdf2_sha256(self, hasher, target):
+        result = self._calibrate_pbkdf2(hasher, target)
+        return f'{result}\n    defina PASSWORD_PBKDF2_ITERATIONS com o valor recomendado'
+
+    def _calibrate_pbkdf2_sha1(self, hasher, target):
+        return self._calibrate_pbkdf2(hasher, target)
+
+    def _calibrate_argon2(self, hasher, target):
+        def measure(time_cost):
+            hasher.time_cost = time_cost
+            return self._measure(lambda: hasher.encode(SAMPLE_PASSWORD, hasher.salt()))
+        return self._calibrate_linear(hasher, target, 'time_cost', measure, step=1)
+
+    def _calibrate_bcrypt_sha256(self, hasher, target):
+        def measure(rounds):
+            hasher.rounds = rounds
+            return self._measure(lambda: hasher.encode(SAMPLE_PASSWORD, hasher.salt()))
+        return self._calibrate_log2(hasher, target, 'rounds', measure)
+
+    def _calibrate_scrypt(self, hasher, target):
+        # work_factor é o N do scrypt (potência de 2): calibra pelo expoente
+        def measure(log_n):
+            return self._measure(lambda: hasher.encode(SAMPLE_PASSWORD, hasher.salt(), n=2 ** log_n))
+        hasher.log_work_factor = int(math.log2(hasher.work_factor))
+        result = self._calibrate_log2(hasher, target, 'log_work_factor', measure)
+        return f'{result}\n    work_factor = 2 ** log_work_factor'
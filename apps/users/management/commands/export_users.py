@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.users.exports import EXPORT_FORMATS, stream_export
+
+
+class Command(BaseCommand):
+    help = 'Exporta o cadastro de usuários em CSV, NDJSON ou XLSX.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', dest='file_format', choices=list(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', help='Arquivo de saída (padrão: stdout; obrigatório para xlsx).')
+        parser.add_argument('--chunk-size', type=int, default=settings.EXPORT_CHUNK_SIZE,
+                            help='Linhas lidas por vez do cursor do banco.')
+
+    def handle(self, *args, **options):
+        chunks = stream_export(options['file_format'], options['chunk_size'])
+        if not options['output']:
+            if options['file_format'] == 'xlsx':
+                raise CommandError('Use --output para exportar em xlsx.')
+            for chunk in chunks:
+                self.stdout.write(chunk.decode(), ending='')
+            return
+
+        with open(options['output'], 'wb') as output:
+            for chunk in chunks:
+                output.write(chunk)
+        self.stdout.write(self.style.SUCCESS(f'Usuários exportados para {options["output"]}.'))
@@ -0,0 +1,42 @@
+import os
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera uma chave privada de assinatura dos JWT em JWT_KEYS_DIR/<kid>.pem. '
+        'A chave passa a ser publicada no JWKS no próximo deploy; só defina '
+        'JWT_ACTIVE_KID para ela depois de JWKS_MAX_AGE segundos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kid', help='Identificador da chave (header "kid" dos tokens).')
+        parser.add_argument('--algorithm', choices=['RS256', 'EdDSA'], default='RS256')
+
+    def handle(self, *args, **options):
+        keys_dir = Path(settings.JWT_KEYS_DIR)
+        path = keys_dir / f"{options['kid']}.pem"
+        if path.exists():
+            raise CommandError(f'A chave {path} já existe.')
+
+        if options['algorithm'] == 'RS256':
+            private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        else:
+            private_key = ed25519.Ed25519PrivateKey.generate()
+
+        pem = private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.PKCS8,
+            encryption_algorithm=serialization.NoEncryption(),
+        )
+        keys_dir.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'wb') as key_file:
+            key_file.write(pem)
+
+        self.stdout.write(self.style.SUCCESS(f'Chave {options["algorithm"]} gerada em {path}.'))
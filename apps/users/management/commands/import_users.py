@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.users.imports import ImportFormatError, detect_format, import_users, iter_rows, write_error_report
+
+
+class Command(BaseCommand):
+    help = 'Importa usuários de um arquivo CSV ou XLSX (colunas obrigatórias: email, password).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Arquivo .csv ou .xlsx.')
+        parser.add_argument('--chunk-size', type=int, default=settings.IMPORT_CHUNK_SIZE,
+                            help='Linhas validadas e inseridas por lote.')
+        parser.add_argument('--workers', type=int, default=settings.IMPORT_HASHING_WORKERS,
+                            help='Processos usados no hash das senhas.')
+        parser.add_argument('--report', help='Grava o relatório de erros por linha neste CSV.')
+
+    def handle(self, *args, **options):
+        def progress(report):
+            self.stdout.write(f'{report["processed"]} linhas processadas, {report["created"]} usuários criados...')
+
+        try:
+            report = import_users(
+                iter_rows(options['path'], detect_format(options['path'])),
+                chunk_size=options['chunk_size'],
+                workers=options['workers'],
+                max_reported_errors=float('inf'),
+                progress=progress,
+            )
+        except (ImportFormatError, OSError) as e:
+            raise CommandError(str(e)) from e
+
+        if options['report']:
+            with open(options['report'], 'w', newline='', encoding='utf-8') as report_file:
+                write_error_report(report['errors'], report_file)
+        else:
+            for error in report['errors']:
+                self.stderr.write(f'Linha {error["row"]} ({error["email"]}): {" ".join(error["errors"])}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{report["created"]} usuários criados, {report["failed"]} linhas com erro.'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.users.blacklist import get_blacklist_filter, rebuild_blacklist_filter
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o filtro de Bloom da blacklist de refresh tokens a partir do banco.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000,
+                            help='Linhas lidas por vez do cursor do banco.')
+
+    def handle(self, *args, **options):
+        bloom = get_blacklist_filter()
+        if bloom is None:
+            raise CommandError('TOKEN_BLACKLIST_FILTER_BACKEND não está configurado.')
+
+        total = rebuild_blacklist_filter(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Filtro reconstruído com {total} tokens '
+            f'({bloom.num_bits} bits, {bloom.num_hashes} hashes).'))
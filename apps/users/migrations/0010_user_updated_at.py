@@ -0,0 +1,20 @@
+# Generated by Django 5.1.10 on 2026-10-18 18:30
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_user_search_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=timezone.now, verbose_name='Atualizado em'),
+            preserve_default=False,
+        ),
+    ]
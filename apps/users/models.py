@@ -4,9 +4,12 @@ from string import ascii_letters, digits
 from uuid import uuid4
 
 from django.db import models
+from django.db.models import F
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth.models import Group, Permission
+from django.utils import timezone
 
+from apps.users import hashing
 from apps.users.choices import LanguageChoices, TimezoneChoices, CurrencyChoices, CountryChoices
 
 
@@ -15,6 +18,14 @@ class User(AbstractUser):
     email = models.EmailField(unique=True, verbose_name='Email')
     last_login = models.DateTimeField(
         auto_now=True, verbose_name='Último Acesso')
+    # Versão da linha: base do ETag/Last-Modified dos recursos de usuário
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
+    # Controle de concorrência otimista: incrementada a cada escrita (ver save
+    # e update_if_version) e exposta no ETag dos recursos de usuário
+    version = models.PositiveIntegerField(default=1, editable=False, verbose_name='Versão')
+    # Incrementada para revogar de uma vez todos os tokens emitidos (claim
+    # `token_generation` dos JWT, ver apps.users.authentication)
+    token_generation = models.PositiveIntegerField(default=0, editable=False, verbose_name='Geração dos tokens')
     first_name = models.CharField(max_length=30, verbose_name='Nome')
     last_name = models.CharField(max_length=30, verbose_name='Sobrenome')
     is_active = models.BooleanField(default=True, verbose_name='Ativo')
@@ -108,6 +119,69 @@ class User(AbstractUser):
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username', 'first_name', 'last_name']
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # paginação por cursor da listagem (apps.users.pagination)
+            models.Index(fields=['date_joined', 'id'], name='users_user_joined_id_idx'),
+            # filtros exatos da listagem (apps.users.filters), já na ordem da paginação
+            *[
+                models.Index(fields=[field, 'date_joined', 'id'], name=f'users_user_{field}_idx')
+                for field in ('is_active', 'is_staff', 'country', 'language', 'organization')
+            ],
+            # `?search=` (icontains) usa índices GIN de trigramas sobre
+            # UPPER(email/first_name/last_name), só no Postgres e fora do
+            # estado dos models: ver a migração 0009_user_search_filter_indexes
+        ]
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        # O auto_now só é gravado se o campo estiver em update_fields. O login
+        # (apenas last_login) não muda nenhuma representação e fica de fora.
+        # Contadores incrementados no banco (F): um save a partir de uma
+        # instância desatualizada não pode reutilizar a versão gravada por
+        # outro request (ex.: update_if_version) nem desfazer uma revogação.
+        incremented = []
+        if update_fields is None or not set(update_fields) <= {'last_login'}:
+            if not self._state.adding:
+                self.version = F('version') + 1
+                incremented.append('version')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'updated_at', 'version'}
+        # Troca de senha (set_password desde o último save) revoga os tokens
+        if self._password is not None and not self._state.adding:
+            self.token_generation = F('token_generation') + 1
+            incremented.append('token_generation')
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'token_generation'}
+        super().save(*args, **kwargs)
+        # O valor gravado só é lido do banco se for acessado (campo diferido)
+        for name in incremented:
+            delattr(self, name)
+
+    def update_if_version(self, changes, expected_version):
+        """
+        Grava `changes` com um único `UPDATE ... WHERE id = %s AND version = %s`,
+        sem reescrever as demais colunas.
+
+        Não dispara `pre_save`/`post_save`: quem chama invalida o que depender
+        deles (ex.: o snapshot da autenticação).
+
+        :return: False se a versão no banco não é mais `expected_version`.
+        """
+        updated_at = timezone.now()
+        updated = type(self).objects.filter(pk=self.pk, version=expected_version).update(
+            **changes, version=expected_version + 1, updated_at=updated_at)
+        if not updated:
+            return False
+        for name, value in changes.items():
+            if hasattr(value, 'resolve_expression'):
+                # ex.: F('token_generation') + 1; lido do banco se acessado
+                delattr(self, name)
+            else:
+                setattr(self, name, value)
+        self.version, self.updated_at = expected_version + 1, updated_at
+        return True
+
     def get_user_access_level(self):
         if not self.is_superuser:
             if not self.is_staff:
@@ -146,7 +220,7 @@ class User(AbstractUser):
         if self.check_password_strength(current_password):
             check_password = self.check_password_strength(new_password)
             if not check_password:
-                self.set_password(new_password)
+                hashing.set_password(self, new_password)
                 self.save()
                 return True, 'Senha alterada com sucesso! Faça login com sua nova senha!'
             return False, check_password
@@ -155,7 +229,7 @@ class User(AbstractUser):
     def reset_password(self) -> str:
         """Gera e define uma nova senha para o usuário."""
         new_password = self._generate_secure_password()
-        self.set_password(new_password)
+        hashing.set_password(self, new_password)
         self.save()
         return new_password
 
@@ -0,0 +1,216 @@
+"""
+Paginação da listagem de usuários.
+
+`EstimatedCountPagination` mantém a paginação por página, mas só faz o
+COUNT exato até `PAGINATION_EXACT_COUNT_THRESHOLD` linhas (com LIMIT, o custo
+é limitado). Acima disso usa a estimativa do planner (`pg_class.reltuples`)
+quando a consulta não tem filtros, ou um COUNT guardado em cache por
+`PAGINATION_COUNT_CACHE_TTL` segundos; a resposta indica `count_approximate`.
+
+`KeysetPagination` navega por `(date_joined, id)` a partir de um cursor
+opaco: cada página é um range scan no índice `users_user_joined_id_idx`
+seguido de LIMIT, sem OFFSET nem COUNT(*), então a página 1000 custa o
+mesmo que a primeira.
+"""
+import base64
+import hashlib
+import json
+from datetime import datetime
+from functools import cached_property
+from uuid import UUID
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+KEYSET_ORDERING = ('date_joined', 'id')
+
+
+def planner_estimate(queryset):
+    """Linhas estimadas pelo Postgres para a tabela, ou None."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)',
+            [queryset.model._meta.db_table])
+        row = cursor.fetchone()
+    # -1 enquanto a tabela nunca passou por VACUUM/ANALYZE
+    return row[0] if row and row[0] >= 0 else None
+
+
+def cached_count(queryset):
+    sql, params = queryset.query.sql_with_params()
+    key = 'count:' + hashlib.sha256(f'{queryset.db}:{sql}:{params}'.encode()).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout=settings.PAGINATION_COUNT_CACHE_TTL)
+    return count
+
+
+def count_with_threshold(queryset):
+    """
+    :return: tupla (contagem, aproximada?).
+    """
+    threshold = settings.PAGINATION_EXACT_COUNT_THRESHOLD
+    # COUNT sobre um LIMIT: para no threshold em vez de varrer a tabela toda
+    bounded = queryset.order_by()[:threshold + 1].count()
+    if bounded <= threshold:
+        return bounded, False
+
+    estimate = None if queryset.query.has_filters() else planner_estimate(queryset)
+    if estimate is None or estimate <= threshold:
+        # Estatísticas defasadas ou consulta filtrada: COUNT real em cache
+        return cached_count(queryset), True
+    return estimate, True
+
+
+class ApproximateCountPaginator(Paginator):
+    """`Paginator` com contagem exata só até o threshold (API e admin)."""
+
+    @cached_property
+    def _count(self):
+        if not hasattr(self.object_list, 'query'):
+            return len(self.object_list), False
+        return count_with_threshold(self.object_list)
+
+    @cached_property
+    def count(self):
+        return self._count[0]
+
+    @property
+    def approximate(self):
+        return self._count[1]
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    django_paginator_class = ApproximateCountPaginator
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data['count_approximate'] = self.page.paginator.approximate
+        return response
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_approximate'] = {'type': 'boolean'}
+        return response_schema
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def __init__(self):
+        self.page_size = api_settings.PAGE_SIZE
+        self.base_url = None
+        self.next_position = None
+        self.previous_position = None
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+
+        if position is not None:
+            joined, pk = position
+            # O `date_joined >=/<=` redundante vira condição de índice e
+            # garante o seek; o OR sozinho faria o banco varrer desde o início
+            if reverse:
+                queryset = queryset.filter(date_joined__lte=joined).filter(
+                    Q(date_joined__lt=joined) | Q(date_joined=joined, id__lt=pk))
+            else:
+                queryset = queryset.filter(date_joined__gte=joined).filter(
+                    Q(date_joined__gt=joined) | Q(date_joined=joined, id__gt=pk))
+
+        ordering = [f'-{field}' for field in KEYSET_ORDERING] if reverse else list(KEYSET_ORDERING)
+        # Uma linha a mais indica se existe outra página na mesma direção
+        results = list(queryset.order_by(*ordering)[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+
+        first = self.get_position(results[0]) if results else None
+        last = self.get_position(results[-1]) if results else None
+        if reverse:
+            # A próxima página começa depois da última linha desta, não no
+            # cursor recebido: o `>` estrito pularia a linha da fronteira
+            self.next_position = last if results else position
+            self.previous_position = first if has_more else None
+        else:
+            self.next_position = last if has_more else None
+            self.previous_position = first if position is not None and results else None
+        return results
+
+    @staticmethod
+    def get_position(row):
+        """`(date_joined, id)` de uma instância ou de uma linha do `.values()`."""
+        if isinstance(row, dict):
+            return tuple(row[field] for field in KEYSET_ORDERING)
+        return tuple(getattr(row, field) for field in KEYSET_ORDERING)
+
+    def decode_cursor(self, request):
+        """:return: tupla ((date_joined, id) ou None, reverse)."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            return (datetime.fromisoformat(data['d']), UUID(data['i'])), bool(data.get('r'))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position, reverse):
+        joined, pk = position
+        data = {'d': joined.isoformat(), 'i': str(pk)}
+        if reverse:
+            data['r'] = 1
+        encoded = base64.urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode())
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded.decode().rstrip('='))
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -1,7 +1,13 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
 
+from apps.users.authentication import SNAPSHOT_FIELDS, invalidate_cached_user_on_commit
+from apps.users.conditional import PreconditionFailed
+from apps.users.filters import FILTER_FIELDS, parse_filters
+from apps.users.hashing import set_password
 from apps.users.models import User
+from apps.users.utils import get_user_loader
 
 
 class UserCreateSerializer(serializers.ModelSerializer):
@@ -30,7 +36,7 @@ class UserCreateSerializer(serializers.ModelSerializer):
         if error:
             raise serializers.ValidationError({'password': error})
 
-        user.set_password(password)  # salva senha de forma criptografada
+        set_password(user, password)  # salva senha de forma criptografada (no pool de hashing)
         user.save()
         return user
 
@@ -40,7 +46,59 @@ class UserLoginSerializer(serializers.Serializer):
     password = serializers.CharField(required=True, write_only=True)
 
 
-class UserRetrieveSerializer(serializers.ModelSerializer):
+class SparseFieldsetMixin:
+    """
+    Suporte a `?fields=id,email` em serializers de leitura.
+
+    Os campos pedidos são validados contra os campos do próprio serializer e
+    `only_columns` devolve as colunas correspondentes para o `.only()` do
+    queryset, assim a projeção do SQL acompanha a resposta.
+    """
+    fields_query_param = 'fields'
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def allowed_fields(cls):
+        # Calculado uma vez por classe: instanciar o serializer custa a
+        # introspecção do model inteira
+        if '_allowed_fields' not in cls.__dict__:
+            cls._allowed_fields = tuple(cls().fields)
+        return cls._allowed_fields
+
+    @classmethod
+    def parse_fields(cls, request):
+        """
+        :return: lista de campos pedidos em `?fields=`, ou None sem o parâmetro.
+        """
+        raw = request.query_params.get(cls.fields_query_param)
+        if raw is None:
+            return None
+        requested = list(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+        allowed = cls.allowed_fields()
+        unknown = [name for name in requested if name not in allowed]
+        if unknown or not requested:
+            raise serializers.ValidationError({
+                cls.fields_query_param: f'Campos inválidos: {", ".join(unknown) or "nenhum"}. '
+                                        f'Permitidos: {", ".join(allowed)}.'
+            })
+        return requested
+
+    @classmethod
+    def only_columns(cls, fields):
+        """Campos concretos do model entre `fields` (M2M não entram no `.only()`)."""
+        opts = cls.Meta.model._meta
+        return [
+            name for name in fields
+            if getattr(opts.get_field(name), 'concrete', False) and not opts.get_field(name).many_to_many
+        ]
+
+
+class UserRetrieveSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = [
@@ -64,6 +122,10 @@ class UserRetrieveSerializer(serializers.ModelSerializer):
 
 
 class UserUpdateSerializer(serializers.ModelSerializer):
+    version = serializers.IntegerField(
+        required=False, min_value=1,
+        help_text="Versão lida do usuário; se ele mudou desde então, 412 (o If-Match tem o mesmo efeito).")
+
     class Meta:
         model = User
         fields = [
@@ -80,19 +142,32 @@ class UserUpdateSerializer(serializers.ModelSerializer):
             'state',
             'zip_code',
             'phone_number',
+            'version',
         ]
+        extra_kwargs = {
+            # A unicidade é checada em validate_email; o UniqueValidator
+            # automático repetiria a mesma consulta
+            'email': {'validators': []},
+        }
 
     def validate_email(self, value):
         user_id = self.context.get('id')
+        try:
+            # O email é único: se já é o do próprio usuário, ninguém mais o tem
+            if get_user_loader(self.context.get('request')).get(user_id).email == value:
+                return value
+        except ObjectDoesNotExist:
+            pass  # o validate responde
         if User.objects.exclude(id=user_id).filter(email=value).exists():
             raise serializers.ValidationError("Usuário com este email já existe.")
         return value
 
     def validate(self, attrs):
-        # Recupera o usuário alvo pelo id passado no contexto
+        # Recupera o usuário alvo pelo id passado no contexto (já carregado
+        # pela view no loader do request)
         id = self.context.get('id')
         try:
-            user = User.objects.get(id=id)
+            user = get_user_loader(self.context.get('request')).get(id)
         except ObjectDoesNotExist:
             raise serializers.ValidationError({'detail': 'User not found'})
 
@@ -104,6 +179,27 @@ class UserUpdateSerializer(serializers.ModelSerializer):
         attrs['user'] = user
         return attrs
 
+    def update(self, instance, validated_data):
+        """
+        Grava só os campos alterados, em um único UPDATE condicionado à versão
+        esperada: a do If-Match (contexto `version`), a do campo `version` ou,
+        sem nenhuma das duas, a lida neste request.
+        """
+        validated_data.pop('user', None)
+        versions = {validated_data.pop('version', None), self.context.get('version')} - {None}
+        expected = versions.pop() if versions else instance.version
+        if versions or expected != instance.version:
+            raise PreconditionFailed()
+
+        changes = {name: value for name, value in validated_data.items() if getattr(instance, name) != value}
+        if not changes:
+            return instance
+        if not instance.update_if_version(changes, expected):
+            raise PreconditionFailed()
+        if changes.keys() & SNAPSHOT_FIELDS:
+            invalidate_cached_user_on_commit(instance.pk)
+        return instance
+
 
 class UserInactivateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -134,7 +230,7 @@ class UserActivateSerializer(serializers.ModelSerializer):
         # Recupera o id do contexto
         id = self.context.get('id')
         try:
-            user = User.objects.get(id=id)
+            user = get_user_loader(self.context.get('request')).get(id)
         except ObjectDoesNotExist:
             raise serializers.ValidationError({'detail': ['User not found']})
 
@@ -147,11 +243,53 @@ class UserActivateSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = User
-        exclude = ['id', 'password', 'last_login', 'is_active', 'date_joined']
+        exclude = ['id', 'password', 'last_login', 'is_active', 'date_joined', 'token_generation']
 
 
 class LogoutSerializer(serializers.Serializer):
-    refresh = serializers.CharField(help_text="Token de refresh a ser invalidado.")
\ No newline at end of file
+    refresh = serializers.CharField(help_text="Token de refresh a ser invalidado.")
+
+
+class TokenIntrospectSerializer(serializers.Serializer):
+    tokens = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+        max_length=settings.TOKEN_INTROSPECT_MAX_TOKENS,
+        help_text="Access ou refresh tokens a serem validados.",
+    )
+
+
+class UserBulkActivationSerializer(serializers.Serializer):
+    action = serializers.ChoiceField(choices=['activate', 'inactivate'])
+    ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        required=False,
+        allow_empty=False,
+        max_length=settings.BULK_ACTIVATION_MAX_IDS,
+        help_text="Ids dos usuários alvo.",
+    )
+    filters = serializers.DictField(
+        child=serializers.CharField(),
+        required=False,
+        allow_empty=False,
+        help_text=f"Filtros da listagem ({', '.join(('search', *FILTER_FIELDS))}), alternativa a `ids`.",
+    )
+
+    def validate_filters(self, value):
+        unknown = set(value) - {'search', *FILTER_FIELDS}
+        if unknown:
+            raise serializers.ValidationError(f"Filtros desconhecidos: {', '.join(sorted(unknown))}.")
+        # Valores vazios já são recusados pelo CharField (allow_blank=False)
+        parse_filters(value)
+        return value
+
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filters' in attrs):
+            raise serializers.ValidationError({'detail': 'Informe `ids` ou `filters`.'})
+        if 'ids' in attrs:
+            attrs['ids'] = list(dict.fromkeys(attrs['ids']))
+        attrs['active'] = attrs['action'] == 'activate'
+        return attrs
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from apps.users.authentication import invalidate_cached_user, invalidate_cached_user_on_commit
+from apps.users.blacklist import add_to_blacklist_filter
+from apps.users.models import User
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_snapshot_on_save(sender, instance, update_fields=None, **kwargs):
+    # O login grava apenas last_login, que não faz parte do snapshot
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_cached_user_on_commit(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_user_snapshot_on_delete(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def add_blacklisted_token_to_filter(sender, instance, created, **kwargs):
+    if created:
+        add_to_blacklist_filter(instance.token.jti)
@@ -1,6 +1,16 @@
+import os
+
 from celery import shared_task
+from cryptography.fernet import InvalidToken
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
 from django.core.mail import send_mail
 
+from apps.users.blacklist import get_blacklist_filter, prune_expired_tokens, rebuild_blacklist_filter
+from apps.users.buffers import flush_login_buffer
+from apps.users.bulk import protected_users, set_active_by_filter, set_active_by_ids
+from apps.users.hashing import unseal_password
+from apps.users.imports import import_users, iter_rows
 from apps.users.models import User
 from apps.core.logs import logger
 from config.settings import DEFAULT_FROM_EMAIL
@@ -30,4 +40,138 @@ def task_send_password_reset_email(user_id, new_password):
         logger.info("E-mail de nova senha enviado para: " + user.email)
 
     except Exception as e:
-        logger.error("[task_send_password_reset_email] Erro ao enviar e-mail: " + str(e))
\ No newline at end of file
+        logger.error("[task_send_password_reset_email] Erro ao enviar e-mail: " + str(e))
+
+
+@shared_task(
+    name="task_reset_password",
+    queue="queue_send_password_reset_email",
+)
+def task_reset_password(user_id):
+    """Redefine a senha fora do request (pool de hash cheio) e envia o e-mail."""
+    try:
+        user = User.objects.get(pk=user_id)
+    except User.DoesNotExist:
+        logger.warning("[task_reset_password] Usuário %s não encontrado", user_id)
+        return
+    task_send_password_reset_email(user.id, user.reset_password())
+
+
+@shared_task(
+    name="task_flush_login_buffer",
+    queue="default",
+)
+def task_flush_login_buffer():
+    """Descarrega o buffer write-behind do login (agendada no Celery beat)."""
+    if not settings.LOGIN_WRITE_BEHIND:
+        return None
+    return flush_login_buffer()
+
+
+@shared_task(
+    name="task_prune_expired_tokens",
+    queue="default",
+)
+def task_prune_expired_tokens():
+    """Remove tokens expirados da blacklist (agendada no Celery beat)."""
+    return prune_expired_tokens(chunk_size=settings.TOKEN_PRUNE_CHUNK_SIZE)
+
+
+@shared_task(
+    name="task_rebuild_blacklist_filter",
+    queue="default",
+)
+def task_rebuild_blacklist_filter():
+    """Reconstrói o filtro da blacklist e renova sua marca de pronto (agendada no Celery beat)."""
+    if get_blacklist_filter() is None:
+        return None
+    return rebuild_blacklist_filter()
+
+
+@shared_task(
+    name="task_rehash_password",
+    queue="default",
+)
+def task_rehash_password(user_id, old_encoded, sealed_password):
+    """
+    Refaz o hash da senha com o hasher/custo atual, fora do request de login.
+
+    O UPDATE é condicional ao hash antigo: se a senha mudou nesse meio-tempo,
+    nada é sobrescrito.
+    """
+    try:
+        raw_password = unseal_password(sealed_password)
+    except InvalidToken:
+        logger.warning("[task_rehash_password] Senha cifrada inválida ou expirada para %s", user_id)
+        return False
+
+    updated = User.objects.filter(pk=user_id, password=old_encoded).update(
+        password=make_password(raw_password))
+    return bool(updated)
+
+
+@shared_task(
+    bind=True,
+    name="task_import_users",
+    queue="default",
+)
+def task_import_users(self, path, file_format):
+    """
+    Importa usuários de um arquivo salvo em IMPORT_UPLOAD_DIR.
+
+    O progresso fica no estado PROGRESS da task e pode ser consultado em
+    `core/task-result/<task_id>/`; o relatório final é o resultado da task.
+    """
+    def progress(report):
+        # Executada inline (apply/eager) não há quem consulte o progresso
+        if self.request.id and not self.request.is_eager:
+            self.update_state(state='PROGRESS', meta=report)
+
+    logger.info("[task_import_users] Iniciando importação de %s", path)
+    try:
+        report = import_users(
+            iter_rows(path, file_format),
+            chunk_size=settings.IMPORT_CHUNK_SIZE,
+            workers=settings.IMPORT_HASHING_WORKERS,
+            max_reported_errors=settings.IMPORT_MAX_REPORTED_ERRORS,
+            progress=progress,
+        )
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+    logger.info("[task_import_users] %s usuários criados, %s linhas com erro", report['created'], report['failed'])
+    return report
+
+
+@shared_task(
+    bind=True,
+    name="task_bulk_set_active",
+    queue="default",
+)
+def task_bulk_set_active(self, active, ids=None, filters=None, actor_id=None, actor_is_superuser=False):
+    """
+    Ativa/inativa em massa os usuários de `ids` ou de `filters`, em lotes.
+
+    `actor_id`/`actor_is_superuser` identificam quem pediu a alteração: a
+    própria conta e, para quem não é superuser, os superusers ficam de fora.
+
+    O progresso fica no estado PROGRESS da task; o relatório
+    `{changed, unchanged, skipped, missing}` é o resultado.
+    """
+    def progress(report):
+        if self.request.id and not self.request.is_eager:
+            self.update_state(state='PROGRESS', meta=report)
+
+    chunk_size = settings.BULK_ACTIVATION_CHUNK_SIZE
+    protected = protected_users(actor_id, actor_is_superuser) if actor_id is not None else None
+    if ids is not None:
+        report = {'changed': 0, 'unchanged': 0, 'skipped': 0, 'missing': 0}
+        for start in range(0, len(ids), chunk_size):
+            chunk_report = set_active_by_ids(ids[start:start + chunk_size], active, protected=protected)
+            for key, value in chunk_report.items():
+                report[key] += value
+            progress(report)
+    else:
+        report = set_active_by_filter(filters, active, chunk_size, progress=progress, protected=protected)
+    logger.info("[task_bulk_set_active] active=%s: %s", active, report)
+    return report
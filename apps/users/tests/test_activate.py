@@ -78,3 +78,15 @@ def test_activate_user_already_activated(userActive):
 
     userActive.refresh_from_db()
     assert userActive.is_active  # Remains active
+
+
+@pytest.mark.django_db
+def test_activate_user_loads_user_once(userInactive, userActive, django_assert_num_queries):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(userActive).access_token}')
+    client.get('/users/choices/')  # aquece o cache de autenticação
+
+    with django_assert_num_queries(2):  # SELECT do usuário + UPDATE
+        response = client.put(f'/users/user-activate-service/{userInactive.id}/')
+
+    assert response.status_code == status.HTTP_200_OK
@@ -0,0 +1,65 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.users.authentication import get_auth_cache_stats
+
+
+@pytest.fixture
+def user():
+    return get_user_model().objects.create_user(
+        email='testuser1@example.com',
+        username='testuser1',
+        password='password123',
+        is_active=True
+    )
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    return client
+
+
+@pytest.mark.django_db
+def test_cache_hit_makes_no_queries(client, django_assert_num_queries):
+    """Após o primeiro request, a autenticação não consulta o banco"""
+    url = reverse('choices-list')
+
+    with django_assert_num_queries(1):
+        assert client.get(url).status_code == status.HTTP_200_OK
+
+    before = get_auth_cache_stats()
+    with django_assert_num_queries(0):
+        assert client.get(url).status_code == status.HTTP_200_OK
+
+    after = get_auth_cache_stats()
+    assert after['local_hits'] == before['local_hits'] + 1
+
+
+@pytest.mark.django_db
+def test_inactivation_invalidates_cache(client, user):
+    """Inativar o usuário invalida o snapshot em cache"""
+    url = reverse('choices-list')
+    assert client.get(url).status_code == status.HTTP_200_OK
+
+    user.is_active = False
+    user.save()
+
+    assert client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_me_returns_full_profile(client, user):
+    """MeView continua retornando o perfil completo a partir do snapshot"""
+    client.get(reverse('choices-list'))
+
+    response = client.get(reverse('me'))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['email'] == user.email
+    assert response.data['country'] == user.country
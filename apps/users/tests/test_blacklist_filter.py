@@ -0,0 +1,131 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from apps.users import blacklist, tasks
+from apps.users.blacklist import get_blacklist_filter, might_be_blacklisted
+from apps.users.tokens import UserRefreshToken
+
+
+@pytest.fixture
+def bloom(settings):
+    settings.TOKEN_BLACKLIST_FILTER_BACKEND = 'memory'
+    settings.TOKEN_BLACKLIST_FILTER_CAPACITY = 1000
+    yield get_blacklist_filter()
+    get_blacklist_filter().invalidate()
+
+
+@pytest.fixture
+def user():
+    return get_user_model().objects.create_user(
+        email='testuser1@example.com',
+        username='testuser1',
+        password='password123',
+        is_active=True
+    )
+
+
+@pytest.mark.django_db
+def test_filter_not_built_falls_back_to_db(bloom, user):
+    """Sem rebuild o filtro não é consultado e o banco decide"""
+    token = UserRefreshToken.for_user(user)
+    token.blacklist()
+
+    assert might_be_blacklisted(token['jti'])
+    with pytest.raises(TokenError):
+        UserRefreshToken(str(token))
+
+
+@pytest.mark.django_db
+def test_filter_skips_db_for_unknown_tokens(bloom, user, django_assert_num_queries):
+    """Token fora da blacklist é aceito sem consultar o banco"""
+    call_command('rebuild_blacklist_filter')
+    token = UserRefreshToken.for_user(user)
+
+    with django_assert_num_queries(0):
+        UserRefreshToken(str(token))
+
+
+@pytest.mark.django_db
+def test_logout_adds_token_to_filter(bloom, user):
+    """Logout coloca o jti no filtro e o token passa a ser recusado"""
+    call_command('rebuild_blacklist_filter')
+    refresh = UserRefreshToken.for_user(user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    response = client.post('/users/logout-servive/', {'refresh': str(refresh)}, format='json')
+
+    assert response.status_code == status.HTTP_205_RESET_CONTENT
+    assert bloom.might_contain(refresh['jti'])
+    with pytest.raises(TokenError):
+        UserRefreshToken(str(refresh))
+
+
+@pytest.mark.django_db
+def test_rebuild_keeps_tokens_committed_out_of_order(bloom, user, monkeypatch):
+    """Token com id abaixo da marca d'água gravado durante o rebuild continua no filtro"""
+    call_command('rebuild_blacklist_filter')
+    early = UserRefreshToken.for_user(user)
+    late = UserRefreshToken.for_user(user)
+    BlacklistedToken.objects.create(id=10, token=OutstandingToken.objects.get(jti=early['jti']))
+
+    load = bloom.load
+
+    def load_after_late_commit(bits):
+        # Confirmado depois da leitura do rebuild, mas com id menor
+        BlacklistedToken.objects.create(id=1, token=OutstandingToken.objects.get(jti=late['jti']))
+        load(bits)
+
+    monkeypatch.setattr(bloom, 'load', load_after_late_commit)
+    call_command('rebuild_blacklist_filter')
+
+    assert might_be_blacklisted(early['jti'])
+    assert might_be_blacklisted(late['jti'])
+
+
+@pytest.mark.django_db
+def test_filter_untrusted_after_failed_write_and_invalidate(bloom, user, monkeypatch):
+    """Sem escrita nem invalidação (Redis fora) o processo volta ao banco até o próximo rebuild"""
+    call_command('rebuild_blacklist_filter')
+    token = UserRefreshToken.for_user(user)
+
+    def redis_down(*args):
+        raise ConnectionError('Redis fora do ar')
+
+    monkeypatch.setattr(bloom, 'add', redis_down)
+    monkeypatch.setattr(bloom, 'invalidate', redis_down)
+    token.blacklist()
+    monkeypatch.undo()
+
+    assert bloom.is_ready()
+    assert might_be_blacklisted(token['jti'])
+    with pytest.raises(TokenError):
+        UserRefreshToken(str(token))
+
+    tasks.task_rebuild_blacklist_filter.apply()
+    assert bloom.trusted
+    assert might_be_blacklisted(token['jti'])
+
+
+def test_redis_ready_flag_expires(settings, monkeypatch):
+    """A marca de pronto no Redis tem validade: um jti perdido não fica de fora para sempre"""
+    settings.TOKEN_BLACKLIST_FILTER_READY_TTL = 600
+    calls = []
+
+    class Pipeline:
+        def __getattr__(self, name):
+            return lambda *args, **kwargs: calls.append((name, args, kwargs))
+
+    class FakeRedis:
+        def pipeline(self, transaction=True):
+            return Pipeline()
+
+    monkeypatch.setattr(blacklist, 'get_redis', FakeRedis)
+    blacklist.RedisBlacklistFilter(64, 2).load(blacklist.BloomBits(64))
+
+    assert ('set', (blacklist.RedisBlacklistFilter.READY_KEY, 1), {'ex': 600}) in calls
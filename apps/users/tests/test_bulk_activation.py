@@ -0,0 +1,190 @@
+import uuid
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.users import views_bulk
+
+User = get_user_model()
+
+
+@pytest.fixture
+def staff():
+    return User.objects.create_user(
+        email='staff@example.com', username='staff', password='password123', is_staff=True)
+
+
+@pytest.fixture
+def staff_client(staff):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(staff).access_token}')
+    return client
+
+
+@pytest.fixture
+def acme_users():
+    return [
+        User.objects.create_user(
+            email=f'acme{i}@example.com', username=f'acme{i}', password='password123',
+            organization='ACME', is_active=i != 0,
+        )
+        for i in range(4)
+    ]
+
+
+def bulk(client, **data):
+    return client.post(reverse('users-bulk-activation'), data, format='json')
+
+
+@pytest.mark.django_db
+def test_bulk_inactivate_by_ids(staff_client, acme_users, django_assert_num_queries):
+    ids = [str(user.id) for user in acme_users[:3]] + [str(uuid.uuid4())]
+    staff_client.get(reverse('choices-list'))  # aquece o cache de autenticação
+
+    # UPDATE + COUNT (o SAVEPOINT do atomic conta como consulta)
+    with django_assert_num_queries(4):
+        response = bulk(staff_client, action='inactivate', ids=ids)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {'changed': 2, 'unchanged': 1, 'skipped': 0, 'missing': 1}
+    assert not User.objects.filter(pk__in=ids, is_active=True).exists()
+    assert User.objects.get(pk=acme_users[3].pk).is_active
+
+
+@pytest.mark.django_db
+def test_bulk_bumps_version_and_updated_at(staff_client, acme_users):
+    user = acme_users[1]
+
+    bulk(staff_client, action='inactivate', ids=[str(user.id)])
+
+    updated = User.objects.get(pk=user.pk)
+    assert updated.version == user.version + 1
+    assert updated.updated_at > user.updated_at
+
+
+@pytest.mark.django_db
+def test_bulk_activate_by_filter(staff_client, acme_users, settings):
+    settings.BULK_ACTIVATION_CHUNK_SIZE = 1
+    User.objects.filter(pk__in=[user.pk for user in acme_users[:2]]).update(is_active=False)
+
+    response = bulk(staff_client, action='activate', filters={'organization': 'ACME'})
+
+    assert response.data == {'changed': 2, 'unchanged': 2, 'skipped': 0, 'missing': 0}
+    assert User.objects.filter(organization='ACME', is_active=True).count() == 4
+
+
+@pytest.mark.django_db
+def test_bulk_filter_on_the_changed_field(staff_client, acme_users):
+    response = bulk(staff_client, action='inactivate', filters={'organization': 'ACME', 'is_active': 'true'})
+
+    assert response.data == {'changed': 3, 'unchanged': 0, 'skipped': 0, 'missing': 0}
+
+
+@pytest.mark.django_db
+def test_bulk_inactivation_revokes_cached_authentication(acme_users, staff_client):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(acme_users[1]).access_token}')
+    assert client.get(reverse('choices-list')).status_code == status.HTTP_200_OK
+
+    bulk(staff_client, action='inactivate', filters={'organization': 'ACME'})
+
+    assert client.get(reverse('choices-list')).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_large_bulk_becomes_task(staff_client, acme_users, settings, monkeypatch):
+    settings.BULK_ACTIVATION_INLINE_LIMIT = 2
+    settings.BULK_ACTIVATION_CHUNK_SIZE = 2
+    results = []
+
+    def run_eagerly(*args, **kwargs):
+        result = views_bulk.task_bulk_set_active.apply(args=args, kwargs=kwargs)
+        results.append(result)
+        return result
+
+    monkeypatch.setattr(views_bulk.task_bulk_set_active, 'delay', run_eagerly)
+
+    response = bulk(staff_client, action='inactivate', ids=[str(user.id) for user in acme_users])
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.data['status_url'] == f'/core/task-result/{response.data["task_id"]}/'
+    assert results[0].result == {'changed': 3, 'unchanged': 1, 'skipped': 0, 'missing': 0}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('data', [
+    {'action': 'inactivate'},
+    {'action': 'inactivate', 'ids': [], 'filters': {'organization': 'ACME'}},
+    {'action': 'inactivate', 'filters': {}},
+    {'action': 'inactivate', 'filters': {'password': 'x'}},
+    {'action': 'inactivate', 'filters': {'country': 'XX'}},
+    {'action': 'delete', 'ids': [str(uuid.uuid4())]},
+])
+def test_bulk_rejects_invalid_requests(staff_client, acme_users, data):
+    response = staff_client.post(reverse('users-bulk-activation'), data, format='json')
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert User.objects.filter(organization='ACME', is_active=True).count() == 3
+
+
+@pytest.mark.django_db
+def test_bulk_requires_staff(acme_users):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(acme_users[1]).access_token}')
+
+    response = bulk(client, action='inactivate', ids=[str(acme_users[2].id)])
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.fixture
+def acme_superuser():
+    return User.objects.create_superuser(
+        email='root@example.com', username='root', password='password123', organization='ACME')
+
+
+@pytest.mark.django_db
+def test_staff_cannot_bulk_inactivate_superusers_or_self(staff, staff_client, acme_users, acme_superuser):
+    staff.organization = 'ACME'
+    staff.save()
+
+    by_ids = bulk(staff_client, action='inactivate', ids=[str(acme_superuser.id), str(staff.id)])
+    by_filter = bulk(staff_client, action='inactivate', filters={'organization': 'ACME'})
+
+    assert by_ids.data == {'changed': 0, 'unchanged': 0, 'skipped': 2, 'missing': 0}
+    assert by_filter.data == {'changed': 3, 'unchanged': 1, 'skipped': 2, 'missing': 0}
+    assert User.objects.get(pk=acme_superuser.pk).is_active
+    assert User.objects.get(pk=staff.pk).is_active
+
+
+@pytest.mark.django_db
+def test_superuser_can_bulk_inactivate_superusers_but_not_self(acme_users, acme_superuser):
+    other = User.objects.create_superuser(email='other@example.com', username='other', password='password123')
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(acme_superuser).access_token}')
+
+    response = bulk(client, action='inactivate', ids=[str(other.id), str(acme_superuser.id)])
+
+    assert response.data == {'changed': 1, 'unchanged': 0, 'skipped': 1, 'missing': 0}
+    assert not User.objects.get(pk=other.pk).is_active
+
+
+@pytest.mark.django_db
+def test_bulk_task_skips_protected_users(staff, staff_client, acme_users, acme_superuser, settings, monkeypatch):
+    settings.BULK_ACTIVATION_INLINE_LIMIT = 1
+    results = []
+
+    def run_eagerly(*args, **kwargs):
+        results.append(views_bulk.task_bulk_set_active.apply(args=args, kwargs=kwargs))
+        return results[-1]
+
+    monkeypatch.setattr(views_bulk.task_bulk_set_active, 'delay', run_eagerly)
+
+    bulk(staff_client, action='inactivate', ids=[str(acme_superuser.id), str(acme_users[1].id)])
+
+    assert results[0].result == {'changed': 1, 'unchanged': 0, 'skipped': 1, 'missing': 0}
+    assert User.objects.get(pk=acme_superuser.pk).is_active
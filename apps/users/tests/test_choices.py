@@ -0,0 +1,99 @@
+import msgpack
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.users.choices import CountryChoices, LanguageChoices
+
+
+@pytest.fixture
+def client():
+    user = get_user_model().objects.create_user(
+        email='user@example.com', username='user', password='password123')
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    # aquece o cache de autenticação para não contar a consulta do usuário
+    client.get(reverse('choices-list'))
+    return client
+
+
+@pytest.mark.django_db
+def test_choices_by_type(client):
+    response = client.get(reverse('choices-list'), {'type': 'country'})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [{'value': c.value, 'label': c.label} for c in CountryChoices]
+    assert response['Cache-Control'].startswith('private, max-age=')
+    assert 'Accept-Language' in response['Vary']
+
+
+@pytest.mark.django_db
+def test_unknown_type_falls_back_to_language(client):
+    response = client.get(reverse('choices-list'), {'type': 'unknown'})
+
+    assert response.json() == [{'value': c.value, 'label': c.label} for c in LanguageChoices]
+
+
+@pytest.mark.django_db
+def test_choices_all_bundle(client):
+    response = client.get(reverse('choices-list'), {'type': 'all'})
+
+    assert set(response.json()) == {'language', 'country', 'currency', 'timezone'}
+
+
+@pytest.mark.django_db
+def test_choices_served_without_queries(client, django_assert_num_queries):
+    with django_assert_num_queries(0):
+        assert client.get(reverse('choices-list'), {'type': 'all'}).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_choices_if_none_match(client):
+    etag = client.get(reverse('choices-list'), {'type': 'currency'})['ETag']
+
+    response = client.get(reverse('choices-list'), {'type': 'currency'}, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b''
+    assert client.get(reverse('choices-list'), {'type': 'timezone'})['ETag'] != etag
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('header', ['"outro", {etag}', 'W/{etag}', '*'])
+def test_choices_if_none_match_lists_and_weak_etags(client, header):
+    etag = client.get(reverse('choices-list'), {'type': 'currency'})['ETag']
+
+    response = client.get(reverse('choices-list'), {'type': 'currency'}, HTTP_IF_NONE_MATCH=header.format(etag=etag))
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+def test_choices_msgpack(client):
+    response = client.get(reverse('choices-list'), {'type': 'all'}, HTTP_ACCEPT='application/msgpack')
+
+    assert response['Content-Type'] == 'application/msgpack'
+    assert msgpack.unpackb(response.content)['country'] == [
+        {'value': c.value, 'label': c.label} for c in CountryChoices]
+
+
+@pytest.mark.django_db
+def test_choices_language_variant(client):
+    by_header = client.get(reverse('choices-list'), HTTP_ACCEPT_LANGUAGE='es-AR,es;q=0.9')
+    by_param = client.get(reverse('choices-list'), {'lang': 'es'})
+    unknown = client.get(reverse('choices-list'), HTTP_ACCEPT_LANGUAGE='de')
+    default = client.get(reverse('choices-list'))
+
+    assert by_header['ETag'] == by_param['ETag'] != default['ETag']
+    assert unknown['ETag'] == default['ETag']
+
+
+@pytest.mark.django_db
+def test_choices_translated_labels(client):
+    response = client.get(reverse('choices-list'), {'lang': 'pt-br'})
+
+    # rótulos de idiomas vêm traduzidos pelo catálogo do próprio Django
+    assert {'value': 'PT', 'label': 'Português'} in response.json()
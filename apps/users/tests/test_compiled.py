@@ -0,0 +1,76 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from apps.users import views
+from apps.users.compiled import compiled_serializer
+from apps.users.serializers import UserRetrieveSerializer, UserSerializer
+
+
+@pytest.fixture
+def users():
+    User = get_user_model()
+    ana = User.objects.create_user(
+        email='ana@example.com', username='ana', password='password123', first_name='Ána',
+        last_name='Silva', organization='ACME', phone_number='+55 11 99999-0000', is_staff=True)
+    bruno = User.objects.create_user(
+        email='bruno@example.com', username='bruno', password='password123', is_active=False,
+        language='PT', country='US')
+    ana.groups.add(*[Group.objects.create(name=name) for name in ('b', 'a')])
+    ana.user_permissions.add(*Permission.objects.order_by('-id')[:3])
+    return [ana, bruno]
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('serializer_class', [UserRetrieveSerializer, UserSerializer])
+@pytest.mark.parametrize('fields', [None, ['email'], ['last_name', 'email', 'is_staff']])
+def test_compiled_output_is_byte_identical(users, serializer_class, fields):
+    """A saída compilada é idêntica à do DRF, na listagem e em uma instância"""
+    compiled = compiled_serializer(serializer_class, fields)
+    queryset = get_user_model().objects.order_by('email')
+
+    expected = serializer_class(queryset, many=True, fields=fields).data
+    assert render(compiled.many(queryset.values(*compiled.columns))) == render(expected)
+
+    for user in users:
+        assert render(compiled.one(user)) == render(serializer_class(user, fields=fields).data)
+
+
+@pytest.mark.django_db
+def test_compiled_list_loads_m2m_once(users, django_assert_num_queries):
+    compiled = compiled_serializer(UserSerializer)
+    rows = list(get_user_model().objects.values(*compiled.columns))
+
+    # uma consulta por relação M2M, independentemente do número de linhas
+    with django_assert_num_queries(2):
+        compiled.many(rows)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params', [{}, {'pagination': 'cursor'}, {'fields': 'email'}])
+def test_list_users_uses_compiled_serializer(users, settings, monkeypatch, params):
+    """A listagem passa pelo serializer compilado, com a mesma resposta do DRF"""
+    calls = []
+
+    def spy(*args):
+        calls.append(args)
+        return compiled_serializer(*args)
+
+    monkeypatch.setattr(views, 'compiled_serializer', spy)
+    client = APIClient()
+    client.force_authenticate(user=users[0])
+
+    settings.COMPILED_SERIALIZERS = False
+    expected = client.get(reverse('users-list'), params).content
+    assert not calls
+
+    settings.COMPILED_SERIALIZERS = True
+    assert client.get(reverse('users-list'), params).content == expected
+    assert calls
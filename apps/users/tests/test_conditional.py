@@ -0,0 +1,235 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.users.serializers import UserInactivateSerializer
+
+
+@pytest.fixture
+def user():
+    return get_user_model().objects.create_user(
+        email='user@example.com',
+        username='user',
+        password='password123',
+        first_name='Usuário',
+        last_name='Teste',
+    )
+
+
+@pytest.fixture
+def client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    return client
+
+
+def update(client, user, etag=None, **data):
+    headers = {'HTTP_IF_MATCH': etag} if etag else {}
+    return client.put(reverse('user-update'), {'id': str(user.id), **data}, format='json', **headers)
+
+
+@pytest.mark.django_db
+def test_me_returns_validators(client):
+    response = client.get(reverse('me'))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response['ETag'].startswith('"')
+    assert 'Last-Modified' in response
+    assert response['Cache-Control'] == 'private, no-cache'
+    assert 'Accept' in response['Vary']
+
+
+@pytest.mark.django_db
+def test_me_if_none_match_returns_304_with_single_lookup(client, django_assert_num_queries):
+    etag = client.get(reverse('me'))['ETag']
+
+    with django_assert_num_queries(1):
+        response = client.get(reverse('me'), HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b''
+    assert response['ETag'] == etag
+
+
+@pytest.mark.django_db
+def test_me_if_modified_since_returns_304(client):
+    last_modified = client.get(reverse('me'))['Last-Modified']
+
+    response = client.get(reverse('me'), HTTP_IF_MODIFIED_SINCE=last_modified)
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+def test_etag_changes_after_update(client, user):
+    etag = client.get(reverse('me'))['ETag']
+    user.first_name = 'Outro'
+    user.save(update_fields=['first_name'])
+
+    response = client.get(reverse('me'), HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response['ETag'] != etag
+    assert response.data['first_name'] == 'Outro'
+
+
+@pytest.mark.django_db
+def test_login_does_not_change_etag(client, user):
+    etag = client.get(reverse('me'))['ETag']
+    user.save(update_fields=['last_login'])
+
+    assert client.get(reverse('me'), HTTP_IF_NONE_MATCH=etag).status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+def test_etag_depends_on_representation(client):
+    json_etag = client.get(reverse('me'))['ETag']
+    msgpack_etag = client.get(reverse('me'), HTTP_ACCEPT='application/msgpack')['ETag']
+    sparse_etag = client.get(reverse('me'), {'fields': 'email'})['ETag']
+
+    assert len({json_etag, msgpack_etag, sparse_etag}) == 3
+    response = client.get(reverse('me'), HTTP_ACCEPT='application/msgpack', HTTP_IF_NONE_MATCH=json_etag)
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_update_with_current_etag(client, user):
+    etag = client.get(reverse('me'), {'fields': 'email'})['ETag']
+
+    # qualquer representação serve para condicionar a escrita
+    response = update(client, user, etag, first_name='Novo')
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response['ETag'] != etag
+
+
+@pytest.mark.django_db
+def test_update_with_stale_etag_returns_412(client, user):
+    etag = client.get(reverse('me'))['ETag']
+    assert update(client, user, etag, first_name='Primeiro').status_code == status.HTTP_200_OK
+
+    response = update(client, user, etag, first_name='Segundo')
+
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+    user.refresh_from_db()
+    assert user.first_name == 'Primeiro'
+
+
+@pytest.mark.django_db
+def test_update_rejects_weak_etag(client, user):
+    etag = client.get(reverse('me'))['ETag']
+
+    response = update(client, user, f'W/{etag}', first_name='Novo')
+
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+
+
+@pytest.mark.django_db
+def test_update_writes_only_changed_fields(client, user):
+    client.get(reverse('me'))  # aquece o cache de autenticação
+
+    with CaptureQueriesContext(connection) as queries:
+        response = update(client, user, first_name='Novo', last_name=user.last_name)
+
+    assert response.status_code == status.HTTP_200_OK
+    [statement] = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+    assert '"first_name"' in statement and '"version"' in statement
+    assert '"last_name"' not in statement and '"password"' not in statement
+    assert response.data['version'] == user.version + 1
+
+
+@pytest.mark.django_db
+def test_update_without_changes_does_not_write(client, user):
+    client.get(reverse('me'))
+
+    with CaptureQueriesContext(connection) as queries:
+        response = update(client, user, first_name=user.first_name)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert not [query for query in queries if query['sql'].startswith('UPDATE')]
+    assert response.data['version'] == user.version
+
+
+@pytest.mark.django_db
+def test_update_with_stale_version_field_returns_412(client, user):
+    assert update(client, user, first_name='Primeiro', version=user.version).status_code == status.HTTP_200_OK
+
+    response = update(client, user, first_name='Segundo', version=user.version)
+
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+
+
+@pytest.mark.django_db
+def test_update_if_version_detects_concurrent_write(user):
+    stale = get_user_model().objects.get(pk=user.pk)
+    user.first_name = 'Admin 1'
+    user.save()
+
+    assert not stale.update_if_version({'first_name': 'Admin 2'}, stale.version)
+    user.refresh_from_db()
+    assert user.first_name == 'Admin 1'
+
+
+@pytest.mark.django_db
+def test_update_email_refreshes_auth_snapshot(client, user):
+    client.get(reverse('me'))
+
+    update(client, user, email='novo@example.com')
+
+    assert client.get(reverse('me'), {'fields': 'email'}).data['email'] == 'novo@example.com'
+
+
+@pytest.mark.django_db
+def test_me_sparse_body_matches_etag_with_stale_auth_snapshot(client, user):
+    """Snapshot atrasado no cache local (escrita em outro worker) não vai para o corpo"""
+    client.get(reverse('me'))
+    # UPDATE sem signals: o cache local deste processo não é invalidado
+    get_user_model().objects.filter(pk=user.pk).update(email='outro@example.com', version=F('version') + 1)
+    user.refresh_from_db()
+
+    response = client.get(reverse('me'), {'fields': 'email'})
+
+    assert response.data == {'email': 'outro@example.com'}
+    assert response['ETag'].startswith(f'"{user.version}.')
+
+
+@pytest.mark.django_db
+def test_stale_save_does_not_reuse_version(user):
+    """Um save a partir de uma instância desatualizada ainda avança a versão no banco"""
+    stale = get_user_model().objects.get(pk=user.pk)
+    assert user.update_if_version({'first_name': 'Admin 1'}, user.version)
+    seen_by_client = user.version
+
+    stale.last_name = 'Admin 2'
+    stale.save()
+
+    assert stale.version == seen_by_client + 1
+    assert not user.update_if_version({'first_name': 'Cliente'}, seen_by_client)
+
+
+@pytest.mark.django_db
+def test_inactivate_does_not_overwrite_concurrent_update(user, monkeypatch):
+    admin = get_user_model().objects.create_superuser(
+        email='admin@example.com', username='admin', password='password123')
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    original_validate = UserInactivateSerializer.validate
+
+    def concurrent_write(serializer, attrs):
+        attrs = original_validate(serializer, attrs)
+        # outra escrita entre a leitura do alvo e o UPDATE
+        get_user_model().objects.get(pk=user.pk).save()
+        return attrs
+
+    monkeypatch.setattr(UserInactivateSerializer, 'validate', concurrent_write)
+
+    response = client.delete(reverse('user-inactivate'), {'id': str(user.id)}, format='json')
+
+    assert response.status_code == status.HTTP_412_PRECONDITION_FAILED
+    assert get_user_model().objects.get(pk=user.pk).is_active
@@ -0,0 +1,128 @@
+import csv
+import io
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from openpyxl import load_workbook
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.users.exports import EXPORT_FIELDS
+
+
+@pytest.fixture
+def staff_client():
+    staff = get_user_model().objects.create_user(
+        email='staff@example.com', username='staff', password='password123', is_staff=True)
+    client = APIClient()
+    client.force_authenticate(user=staff)
+    return client
+
+
+@pytest.fixture
+def users():
+    return [
+        get_user_model().objects.create_user(
+            email=f'user{i}@example.com', username=f'user{i}', password='password123', first_name=f'Nome{i}')
+        for i in range(5)
+    ]
+
+
+def download(client, file_format):
+    response = client.get(reverse('users-export'), {'file_format': file_format})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.streaming
+    return b''.join(response.streaming_content)
+
+
+@pytest.mark.django_db
+def test_export_csv(staff_client, users, settings):
+    """Exporta todas as linhas, mesmo com o cursor lendo em lotes pequenos"""
+    settings.EXPORT_CHUNK_SIZE = 2
+    rows = list(csv.DictReader(io.StringIO(download(staff_client, 'csv').decode())))
+
+    assert len(rows) == 6
+    assert tuple(rows[0]) == EXPORT_FIELDS
+    assert 'password' not in rows[0]
+    assert {row['email'] for row in rows} >= {user.email for user in users}
+
+
+@pytest.mark.django_db
+def test_export_ndjson(staff_client, users):
+    lines = download(staff_client, 'ndjson').decode().splitlines()
+    rows = [json.loads(line) for line in lines]
+
+    assert len(rows) == 6
+    assert rows[1]['id'] == str(users[0].id)
+    assert rows[1]['first_name'] == 'Nome0'
+
+
+@pytest.mark.django_db
+def test_export_xlsx(staff_client, users):
+    sheet = load_workbook(io.BytesIO(download(staff_client, 'xlsx')), read_only=True).active
+    rows = list(sheet.iter_rows(values_only=True))
+
+    assert rows[0] == EXPORT_FIELDS
+    assert len(rows) == 7
+    assert rows[-1][1] == users[-1].email
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('file_format', ['csv', 'xlsx'])
+def test_export_escapes_formulas(staff_client, file_format):
+    """Campos iniciados por =, +, - ou @ saem como texto, nunca como fórmula; números e telefones ficam intactos"""
+    get_user_model().objects.create_user(
+        email='formula@example.com', username='formula', password='password123',
+        first_name='=HYPERLINK("http://evil")', last_name='+cmd|\' /C calc\'!A0', organization='-2+3',
+        address='@SUM(A1)', state='-2', phone_number='+55 (11) 91234-5678')
+    content = download(staff_client, file_format)
+    if file_format == 'csv':
+        row = list(csv.DictReader(io.StringIO(content.decode())))[-1]
+    else:
+        rows = load_workbook(io.BytesIO(content), read_only=True).active.iter_rows(values_only=True)
+        row = dict(zip(EXPORT_FIELDS, list(rows)[-1]))
+
+    assert row['first_name'] == '\'=HYPERLINK("http://evil")'
+    assert row['last_name'] == "'+cmd|' /C calc'!A0"
+    assert row['organization'] == "'-2+3"
+    assert row['address'] == "'@SUM(A1)"
+    assert row['state'] == '-2'
+    assert row['phone_number'] == '+55 (11) 91234-5678'
+    assert row['email'] == 'formula@example.com'
+
+
+@pytest.mark.django_db
+def test_export_ndjson_keeps_values(staff_client):
+    get_user_model().objects.create_user(
+        email='formula@example.com', username='formula', password='password123',
+        first_name='=1+1', phone_number='+55 (11) 91234-5678')
+
+    row = json.loads(download(staff_client, 'ndjson').decode().splitlines()[-1])
+
+    assert row['first_name'] == '=1+1'
+    assert row['phone_number'] == '+55 (11) 91234-5678'
+
+
+@pytest.mark.django_db
+def test_export_rejects_unknown_format(staff_client):
+    response = staff_client.get(reverse('users-export'), {'file_format': 'pdf'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_export_requires_staff(users):
+    client = APIClient()
+    client.force_authenticate(user=users[0])
+    response = client.get(reverse('users-export'))
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_export_command(users):
+    out = StringIO()
+    call_command('export_users', '--format', 'ndjson', stdout=out)
+    assert len(out.getvalue().splitlines()) == 5
@@ -0,0 +1,87 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.users.views import RetrieveUser
+
+
+@pytest.fixture
+def staff():
+    return get_user_model().objects.create_user(
+        email='staff@example.com',
+        username='staff',
+        password='password123',
+        first_name='Equipe',
+        is_staff=True,
+    )
+
+
+@pytest.fixture
+def client(staff):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(staff).access_token}')
+    return client
+
+
+def select_sql(queries):
+    return [query['sql'] for query in queries if 'FROM "users_user"' in query['sql']]
+
+
+@pytest.mark.django_db
+def test_list_users_sparse_fields(client):
+    """A resposta e o SELECT trazem só os campos pedidos"""
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse('users-list'), {'fields': 'id,email'})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert list(response.data['results'][0]) == ['id', 'email']
+    listing = select_sql(queries)[-1]
+    assert '"email"' in listing
+    assert '"first_name"' not in listing
+    assert '"password"' not in listing
+
+
+@pytest.mark.django_db
+def test_list_users_default_projection_skips_password(client):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse('users-list'))
+
+    assert 'first_name' in response.data['results'][0]
+    assert '"password"' not in select_sql(queries)[-1]
+
+
+@pytest.mark.django_db
+def test_list_users_rejects_unknown_fields(client):
+    response = client.get(reverse('users-list'), {'fields': 'id,password'})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'password' in str(response.data)
+
+
+@pytest.mark.django_db
+def test_me_sparse_fields_single_query(client, django_assert_num_queries):
+    """Corpo e validadores saem da mesma consulta, só com as colunas pedidas"""
+    client.get(reverse('me'))
+
+    with django_assert_num_queries(1):
+        response = client.get(reverse('me'), {'fields': 'email,username'})
+    assert response.data == {'email': 'staff@example.com', 'username': 'staff'}
+
+    with django_assert_num_queries(1):
+        response = client.get(reverse('me'), {'fields': 'first_name'})
+    assert response.data == {'first_name': 'Equipe'}
+
+
+@pytest.mark.django_db
+def test_retrieve_user_sparse_fields(staff):
+    request = APIRequestFactory().get('/', {'fields': 'email'})
+    force_authenticate(request, user=staff)
+
+    response = RetrieveUser.as_view()(request, id=str(staff.id))
+
+    assert response.data == {'email': 'staff@example.com'}
@@ -0,0 +1,182 @@
+import threading
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.users import tasks
+from apps.users.hashing import HashingCapacityExceeded, get_hashing_pool, seal_password
+
+
+@pytest.fixture
+def user():
+    return get_user_model().objects.create_user(
+        email='testuser1@example.com',
+        username='testuser1',
+        password='password123',
+        is_active=True
+    )
+
+
+@pytest.fixture
+def saturated_pool(settings):
+    """Pool de um worker, sem fila, ocupado por uma tarefa bloqueada"""
+    settings.PASSWORD_HASHING_WORKERS = 1
+    settings.PASSWORD_HASHING_QUEUE_SIZE = 0
+    settings.PASSWORD_HASHING_RETRY_AFTER = 3
+    pool = get_hashing_pool()
+    release = threading.Event()
+    worker = threading.Thread(target=pool.run, args=(release.wait,))
+    worker.start()
+    while pool.stats()['running'] == 0:
+        release.wait(0.01)
+    yield pool
+    release.set()
+    worker.join()
+
+
+def test_default_pool_leaves_request_threads_free(settings):
+    """Com os padrões, logins simultâneos em todas as threads do gunicorn esbarram no limite"""
+    pool = get_hashing_pool()
+    assert pool.capacity < settings.GUNICORN_THREADS
+
+    release = threading.Event()
+    results = []
+
+    def request_thread():
+        try:
+            results.append(pool.run(release.wait, 5))
+        except HashingCapacityExceeded:
+            results.append('503')
+
+    threads = [threading.Thread(target=request_thread) for _ in range(settings.GUNICORN_THREADS)]
+    for thread in threads:
+        thread.start()
+    while pool.stats()['running'] < pool.capacity or len(results) < settings.GUNICORN_THREADS - pool.capacity:
+        release.wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results.count('503') == settings.GUNICORN_THREADS - pool.capacity
+
+
+@pytest.mark.django_db
+def test_login_rejected_when_pool_is_full(saturated_pool, user):
+    """Com a fila de hashing cheia o login responde 503 com Retry-After"""
+    response = APIClient().post(
+        reverse('login'), {'email': user.email, 'password': 'password123'}, format='json')
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response['Retry-After'] == '3'
+    assert saturated_pool.stats()['rejected'] == 1
+
+
+@pytest.mark.django_db
+def test_recover_password_with_pool_full_is_indistinguishable(saturated_pool, user, monkeypatch):
+    """Email cadastrado recebe a mesma resposta de um desconhecido e a redefinição vai para o Celery"""
+    queued = []
+    monkeypatch.setattr(tasks.task_reset_password, 'delay', queued.append)
+    client = APIClient()
+
+    known = client.post(reverse('recover_password'), {'email': user.email}, format='json')
+    unknown = client.post(reverse('recover_password'), {'email': 'nobody@example.com'}, format='json')
+
+    assert known.status_code == unknown.status_code == status.HTTP_200_OK
+    assert known.data == unknown.data
+    assert queued == [user.id]
+
+
+@pytest.mark.django_db
+def test_reset_password_task(user, mailoutbox):
+    old_encoded = user.password
+    tasks.task_reset_password.apply(args=[str(user.id)])
+
+    user.refresh_from_db()
+    assert user.password != old_encoded
+    assert mailoutbox[0].to == [user.email]
+
+
+@pytest.mark.django_db
+def test_hashing_metrics(user):
+    """Login pelo pool e métricas de latência expostas para a equipe"""
+    client = APIClient()
+    response = client.post(reverse('login'), {'email': user.email, 'password': 'password123'}, format='json')
+    assert response.status_code == status.HTTP_200_OK
+
+    user.is_staff = True
+    user.save()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+    metrics = client.get(reverse('metrics')).data['password_hashing']
+
+    assert metrics['completed'] >= 1
+    assert metrics['queue_depth'] == 0
+    assert metrics['latency_ms']['max'] is not None
+
+
+@pytest.mark.django_db
+def test_outdated_hash_upgraded_by_task(settings, user, monkeypatch):
+    """Login com hash desatualizado agenda o rehash em vez de fazê-lo no request"""
+    settings.PASSWORD_PBKDF2_ITERATIONS = 1000
+    user.set_password('password123')
+    user.save()
+    settings.PASSWORD_PBKDF2_ITERATIONS = 2000
+
+    scheduled = []
+    monkeypatch.setattr(tasks.task_rehash_password, 'delay', lambda *args: scheduled.append(args))
+    response = APIClient().post(
+        reverse('login'), {'email': user.email, 'password': 'password123'}, format='json')
+
+    assert response.status_code == status.HTTP_200_OK
+    user.refresh_from_db()
+    assert identify_hasher(user.password).decode(user.password)['iterations'] == 1000
+
+    assert tasks.task_rehash_password(*scheduled[0]) is True
+    user.refresh_from_db()
+    assert identify_hasher(user.password).decode(user.password)['iterations'] == 2000
+    assert user.check_password('password123')
+
+
+@pytest.mark.django_db
+def test_inline_rehash_keeps_tokens(settings, user):
+    """O upgrade do hash no próprio login não é troca de senha: não revoga os tokens"""
+    settings.PASSWORD_REHASH_ASYNC = False
+    user.password = make_password('password123', hasher='pbkdf2_sha1')
+    user.save()
+
+    response = APIClient().post(
+        reverse('login'), {'email': user.email, 'password': 'password123'}, format='json')
+
+    assert response.status_code == status.HTTP_200_OK
+    user.refresh_from_db()
+    assert identify_hasher(user.password).algorithm == 'pbkdf2_sha256'
+    assert user.token_generation == 0
+
+
+@pytest.mark.django_db
+def test_rehash_skipped_when_password_changed(user, monkeypatch):
+    """O rehash não sobrescreve uma senha alterada depois do login"""
+    old_encoded = user.password
+    user.set_password('Changed123!')
+    user.save()
+
+    assert tasks.task_rehash_password(str(user.pk), old_encoded, seal_password('password123')) is False
+    user.refresh_from_db()
+    assert user.check_password('Changed123!')
+
+
+def test_calibrate_password_hashers(settings):
+    """O comando recomenda o número de iterações para a latência alvo"""
+    settings.PASSWORD_HASHERS = ['apps.users.hashers.ConfigurablePBKDF2PasswordHasher']
+    settings.PASSWORD_PBKDF2_ITERATIONS = 20_000
+    out = StringIO()
+
+    call_command('calibrate_password_hashers', samples=1, target_ms=5, stdout=out)
+
+    assert 'iterations atual=20000' in out.getvalue()
+    assert 'PASSWORD_PBKDF2_ITERATIONS' in out.getvalue()
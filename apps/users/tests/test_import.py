@@ -0,0 +1,166 @@
+import csv
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from openpyxl import Workbook
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.users import views_bulk
+
+HEADER = ['email', 'password', 'first_name', 'last_name', 'country']
+ROWS = [
+    ['ana@example.com', 'Senha@123', 'Ana', 'Silva', 'BR'],
+    ['bruno@example.com', 'fraca', 'Bruno', 'Souza', 'BR'],
+    ['ana@example.com', 'Senha@123', 'Ana', 'Repetida', 'BR'],
+    ['existente@example.com', 'Senha@123', 'Já', 'Existe', 'BR'],
+    ['carla@example.com', 'Senha@123', 'Carla', 'Lima', 'XX'],
+    ['davi@example.com', 'Senha@123', 'Davi', 'Costa', ''],
+]
+
+
+@pytest.fixture(autouse=True)
+def fast_hasher(settings):
+    settings.PASSWORD_PBKDF2_ITERATIONS = 1000
+
+
+@pytest.fixture
+def existing_user():
+    return get_user_model().objects.create_user(
+        email='existente@example.com', username='existente@example.com', password='password123')
+
+
+@pytest.fixture
+def staff_client():
+    staff = get_user_model().objects.create_user(
+        email='staff@example.com', username='staff', password='password123', is_staff=True)
+    client = APIClient()
+    client.force_authenticate(user=staff)
+    return client
+
+
+def write_csv(path):
+    with open(path, 'w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(HEADER)
+        writer.writerows(ROWS)
+    return path
+
+
+def write_xlsx(path):
+    workbook = Workbook()
+    workbook.active.append(HEADER)
+    for row in ROWS:
+        workbook.active.append(row)
+    workbook.save(path)
+    return path
+
+
+def assert_imported(errors_by_row):
+    User = get_user_model()
+    ana = User.objects.get(email='ana@example.com')
+    assert ana.username == 'ana@example.com'
+    assert ana.check_password('Senha@123')
+    assert User.objects.get(email='davi@example.com').country == 'BR'
+    assert not User.objects.filter(email__in=['bruno@example.com', 'carla@example.com']).exists()
+    assert sorted(errors_by_row) == [3, 4, 5, 6]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('writer, name', [(write_csv, 'users.csv'), (write_xlsx, 'users.xlsx')])
+def test_import_command(tmp_path, existing_user, writer, name):
+    """O comando importa as linhas válidas e grava um relatório das inválidas"""
+    path = writer(tmp_path / name)
+    report_path = tmp_path / 'errors.csv'
+    out = StringIO()
+
+    call_command('import_users', str(path), '--workers', '1', '--chunk-size', '2',
+                 '--report', str(report_path), stdout=out)
+
+    with open(report_path, newline='', encoding='utf-8') as report_file:
+        errors = {int(row['row']): row['errors'] for row in csv.DictReader(report_file)}
+    assert_imported(errors)
+    assert 'repetido no arquivo' in errors[4]
+    assert 'já existe' in errors[5]
+    assert '2 usuários criados, 4 linhas com erro' in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_import_endpoint_runs_task(tmp_path, settings, monkeypatch, staff_client, existing_user):
+    """O upload dispara a task, que deixa o relatório como resultado"""
+    settings.IMPORT_UPLOAD_DIR = str(tmp_path / 'uploads')
+    results = []
+
+    def run_eagerly(*args):
+        result = views_bulk.task_import_users.apply(args=args)
+        results.append(result)
+        return result
+
+    monkeypatch.setattr(views_bulk.task_import_users, 'delay', run_eagerly)
+    upload = SimpleUploadedFile('users.csv', write_csv(tmp_path / 'users.csv').read_bytes())
+
+    response = staff_client.post(reverse('users-import'), {'file': upload}, format='multipart')
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.data['status_url'] == f'/core/task-result/{response.data["task_id"]}/'
+    report = results[0].result
+    assert report['created'] == 2
+    assert_imported([error['row'] for error in report['errors']])
+    assert not list((tmp_path / 'uploads').iterdir())
+
+
+@pytest.mark.django_db
+def test_import_endpoint_rejects_missing_columns(tmp_path, settings, staff_client):
+    settings.IMPORT_UPLOAD_DIR = str(tmp_path)
+    upload = SimpleUploadedFile('users.csv', b'email,first_name\nana@example.com,Ana\n')
+
+    response = staff_client.post(reverse('users-import'), {'file': upload}, format='multipart')
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'password' in response.data['file']
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('content', [b'isto nao e um zip', b'PK\x03\x04corrompido'])
+def test_import_endpoint_rejects_corrupt_xlsx(tmp_path, settings, staff_client, content):
+    settings.IMPORT_UPLOAD_DIR = str(tmp_path)
+    upload = SimpleUploadedFile('users.xlsx', content)
+
+    response = staff_client.post(reverse('users-import'), {'file': upload}, format='multipart')
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'XLSX' in response.data['file']
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.django_db
+def test_import_endpoint_removes_upload_when_task_not_queued(tmp_path, settings, monkeypatch, staff_client):
+    """Sem broker a task não assume o arquivo, e ele não fica para trás"""
+    settings.IMPORT_UPLOAD_DIR = str(tmp_path / 'uploads')
+
+    def broker_down(*args):
+        raise ConnectionError('broker fora do ar')
+
+    monkeypatch.setattr(views_bulk.task_import_users, 'delay', broker_down)
+    upload = SimpleUploadedFile('users.csv', write_csv(tmp_path / 'users.csv').read_bytes())
+
+    response = staff_client.post(reverse('users-import'), {'file': upload}, format='multipart')
+
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert not list((tmp_path / 'uploads').iterdir())
+
+
+@pytest.mark.django_db
+def test_import_endpoint_requires_staff(existing_user):
+    client = APIClient()
+    client.force_authenticate(user=existing_user)
+    upload = SimpleUploadedFile('users.csv', b'email,password\n')
+
+    response = client.post(reverse('users-import'), {'file': upload}, format='multipart')
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -46,3 +46,15 @@ def test_inactivate_user(userActive):
 
     userActive.refresh_from_db()
     assert not userActive.is_active
+
+
+@pytest.mark.django_db
+def test_inactivate_user_loads_user_once(userActive, django_assert_num_queries):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(userActive).access_token}')
+    client.get('/users/choices/')  # aquece o cache de autenticação
+
+    with django_assert_num_queries(2):  # SELECT do usuário + UPDATE
+        response = client.delete('/users/user-inactivate-service/', data={'id': str(userActive.id)}, format='json')
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
@@ -0,0 +1,76 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.users.tokens import UserRefreshToken
+
+User = get_user_model()
+
+
+@pytest.fixture
+def staff():
+    return User.objects.create_user(
+        email='staff@example.com',
+        username='staff',
+        password='password123',
+        is_staff=True,
+    )
+
+
+@pytest.fixture
+def users():
+    return [
+        User.objects.create_user(
+            email=f'user{i}@example.com',
+            username=f'user{i}',
+            password='password123',
+            is_active=i != 2,
+        )
+        for i in range(3)
+    ]
+
+
+@pytest.fixture
+def client(staff):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {UserRefreshToken.for_user(staff).access_token}')
+    # aquece o cache de autenticação para não contar a consulta do staff
+    client.get(reverse('choices-list'))
+    return client
+
+
+@pytest.mark.django_db
+def test_introspect_batch(client, users, django_assert_num_queries):
+    """Valida vários tokens com uma consulta de usuários e uma de blacklist"""
+    blacklisted = UserRefreshToken.for_user(users[1])
+    blacklisted.blacklist()
+    tokens = [
+        str(UserRefreshToken.for_user(users[0]).access_token),
+        str(blacklisted),
+        str(UserRefreshToken.for_user(users[2]).access_token),
+        'not-a-token',
+    ]
+
+    with django_assert_num_queries(2):
+        response = client.post(reverse('token-introspect'), {'tokens': tokens}, format='json')
+
+    assert response.status_code == status.HTTP_200_OK
+    valid, revoked, inactive, invalid = response.data['results']
+    assert valid['valid'] and valid['user_id'] == str(users[0].id)
+    assert valid['access_level'] == 'common_user'
+    assert revoked['token_type'] == 'refresh' and revoked['blacklisted'] and not revoked['valid']
+    assert inactive['is_active'] is False and not inactive['valid']
+    assert invalid == {'valid': False, 'error': 'Token is invalid'}
+
+
+@pytest.mark.django_db
+def test_introspect_requires_staff(users):
+    """Usuário comum não pode usar a introspecção"""
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {UserRefreshToken.for_user(users[0]).access_token}')
+
+    response = client.post(reverse('token-introspect'), {'tokens': ['x']}, format='json')
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,85 @@
+import jwt
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.users import keys
+from apps.users.tokens import UserRefreshToken
+
+
+@pytest.fixture
+def key_ring(settings, tmp_path, monkeypatch):
+    settings.JWT_KEYS_DIR = str(tmp_path)
+    settings.JWT_ALGORITHM = 'RS256'
+    settings.JWT_ACTIVE_KID = 'new'
+    call_command('generate_jwt_key', 'old', algorithm='EdDSA')
+    call_command('generate_jwt_key', 'new', algorithm='RS256')
+    monkeypatch.setattr(keys, '_backend', None)
+    monkeypatch.setattr(keys, '_jwks', None)
+    return keys.get_token_backend()
+
+
+@pytest.fixture
+def user():
+    return get_user_model().objects.create_user(
+        email='testuser1@example.com',
+        username='testuser1',
+        password='password123',
+        is_active=True
+    )
+
+
+def test_jwks_publishes_all_keys(key_ring):
+    """O JWKS publica todas as chaves, com ETag e Cache-Control"""
+    client = APIClient()
+
+    response = client.get(reverse('jwks'))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert {key['kid']: key['alg'] for key in response.json()['keys']} == {'old': 'EdDSA', 'new': 'RS256'}
+    assert 'max-age' in response['Cache-Control']
+
+    cached = client.get(reverse('jwks'), HTTP_IF_NONE_MATCH=response['ETag'])
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.parametrize('header', ['"outro", {etag}', 'W/{etag}', '*'])
+def test_jwks_if_none_match_lists_and_weak_etags(key_ring, header):
+    client = APIClient()
+    etag = client.get(reverse('jwks'))['ETag']
+
+    response = client.get(reverse('jwks'), HTTP_IF_NONE_MATCH=header.format(etag=etag))
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+@pytest.mark.django_db
+def test_tokens_verifiable_with_jwks(key_ring, user):
+    """Um serviço externo valida o token só com o JWKS"""
+    access = str(UserRefreshToken.for_user(user).access_token)
+    jwks = APIClient().get(reverse('jwks')).json()
+
+    kid = jwt.get_unverified_header(access)['kid']
+    public_key = jwt.PyJWKSet.from_dict(jwks)[kid].key
+    payload = jwt.decode(access, public_key, algorithms=['RS256'])
+
+    assert kid == 'new'
+    assert payload['user_id'] == str(user.id)
+
+
+@pytest.mark.django_db
+def test_tokens_from_previous_key_still_accepted(key_ring, settings, monkeypatch, user):
+    """Durante a rotação, tokens assinados pela chave anterior continuam válidos"""
+    settings.JWT_ACTIVE_KID = 'old'
+    monkeypatch.setattr(keys, '_backend', None)
+    access = str(UserRefreshToken.for_user(user).access_token)
+
+    settings.JWT_ACTIVE_KID = 'new'
+    monkeypatch.setattr(keys, '_backend', None)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+    assert client.get(reverse('me')).status_code == status.HTTP_200_OK
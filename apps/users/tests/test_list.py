@@ -1,9 +1,15 @@
-from rest_framework_simplejwt.tokens import RefreshToken
+from datetime import timedelta
+
 from django.contrib.auth import get_user_model
+from django.test import Client
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.test import APIClient
 
 import pytest
 
+from apps.users.pagination import ApproximateCountPaginator
+
 
 @pytest.fixture
 def user():
@@ -55,3 +61,159 @@ def test_list_users(staff):
     assert 'results' in response.data
     if not response.data['results']:
         assert response.data['message'] == 'No users found'
+
+
+@pytest.fixture
+def many_users(staff):
+    """Sete usuários; três com o mesmo date_joined para testar o desempate por id"""
+    User = get_user_model()
+    joined = timezone.now() - timedelta(days=1)
+    for i in range(7):
+        User.objects.create_user(email=f'list{i}@example.com', username=f'list{i}', password='password123')
+    users = list(User.objects.exclude(pk=staff.pk))
+    for i, user in enumerate(users):
+        user.date_joined = joined + timedelta(minutes=min(i, 3))
+    User.objects.bulk_update(users, ['date_joined'])
+    return list(User.objects.order_by('date_joined', 'id').values_list('email', flat=True))
+
+
+def staff_client(staff):
+    client = APIClient()
+    client.force_authenticate(user=staff)
+    return client
+
+
+@pytest.mark.django_db
+def test_list_users_cursor_pagination(staff, many_users):
+    """Percorre todas as páginas para frente e para trás sem repetir nem pular usuários"""
+    client = staff_client(staff)
+
+    response = client.get('/users/users-list-service/', {'pagination': 'cursor', 'page_size': 3})
+    assert 'count' not in response.data
+    assert response.data['previous'] is None
+
+    pages = [response.data]
+    while pages[-1]['next']:
+        pages.append(client.get(pages[-1]['next']).data)
+    emails = [user['email'] for page in pages for user in page['results']]
+    assert emails == many_users
+
+    backwards = [pages[-1]]
+    while backwards[-1]['previous']:
+        backwards.append(client.get(backwards[-1]['previous']).data)
+    assert [page['results'] for page in reversed(backwards)] == [page['results'] for page in pages]
+
+
+@pytest.mark.django_db
+def test_list_users_cursor_round_trip(staff, many_users):
+    """Voltar uma página e seguir em frente de novo devolve as mesmas páginas"""
+    client = staff_client(staff)
+    first = client.get('/users/users-list-service/', {'pagination': 'cursor', 'page_size': 2}).data
+    second = client.get(first['next']).data
+    third = client.get(second['next']).data
+
+    back = client.get(third['previous']).data
+    assert back['results'] == second['results']
+    forward = client.get(back['next']).data
+    assert forward['results'] == third['results']
+    assert client.get(forward['next']).data['results'] == client.get(third['next']).data['results']
+
+
+@pytest.mark.django_db
+def test_list_users_invalid_cursor(staff):
+    response = staff_client(staff).get('/users/users-list-service/', {'cursor': 'nao-e-um-cursor'})
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_list_users_page_number_is_default(staff, many_users):
+    response = staff_client(staff).get('/users/users-list-service/', {'page': 1})
+    assert response.data['count'] == 8
+    assert [user['email'] for user in response.data['results']] == many_users
+
+
+@pytest.mark.django_db
+def test_list_users_exact_count_below_threshold(staff, many_users, settings):
+    settings.PAGINATION_EXACT_COUNT_THRESHOLD = 100
+    response = staff_client(staff).get('/users/users-list-service/')
+    assert response.data['count'] == 8
+    assert response.data['count_approximate'] is False
+
+
+@pytest.mark.django_db
+def test_list_users_cached_count_above_threshold(staff, many_users, settings):
+    """Acima do threshold a contagem vem do cache até o TTL expirar"""
+    settings.PAGINATION_EXACT_COUNT_THRESHOLD = 5
+    client = staff_client(staff)
+
+    response = client.get('/users/users-list-service/')
+    assert response.data['count'] == 8
+    assert response.data['count_approximate'] is True
+
+    get_user_model().objects.create_user(email='new@example.com', username='new', password='password123')
+    assert client.get('/users/users-list-service/').data['count'] == 8
+
+
+@pytest.mark.django_db
+def test_admin_changelist_uses_approximate_paginator(many_users, settings):
+    settings.PAGINATION_EXACT_COUNT_THRESHOLD = 5
+    admin_user = get_user_model().objects.create_superuser(
+        email='admin@example.com', username='admin', password='password123', first_name='A', last_name='B')
+    client = Client()
+    client.force_login(admin_user)
+
+    response = client.get('/admin/users/user/')
+
+    assert response.status_code == 200
+    assert isinstance(response.context['cl'].paginator, ApproximateCountPaginator)
+    assert response.context['cl'].result_count == 9
+
+
+@pytest.fixture
+def directory(staff):
+    User = get_user_model()
+    User.objects.create_user(email='ana.silva@example.com', username='ana', password='password123',
+                             first_name='Ana', last_name='Silva', country='US', organization='ACME')
+    User.objects.create_user(email='bruno@example.com', username='bruno', password='password123',
+                             first_name='Bruno', last_name='Silva', is_active=False, language='PT')
+    User.objects.create_user(email='carla@example.com', username='carla', password='password123',
+                             first_name='Carla', last_name='Souza', organization='ACME')
+
+
+def listed_emails(client, params):
+    response = client.get('/users/users-list-service/', params)
+    assert response.status_code == 200, response.data
+    return {user['email'] for user in response.data['results']}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params, expected', [
+    ({'search': 'silva'}, {'ana.silva@example.com', 'bruno@example.com'}),
+    ({'search': 'ana SILVA'}, {'ana.silva@example.com'}),
+    ({'search': 'CARLA@'}, {'carla@example.com'}),
+    ({'is_active': 'false'}, {'bruno@example.com'}),
+    ({'is_staff': 'true'}, {'testuser2@example.com'}),
+    ({'country': 'US'}, {'ana.silva@example.com'}),
+    ({'language': 'PT'}, {'bruno@example.com'}),
+    ({'organization': 'ACME', 'search': 'souza'}, {'carla@example.com'}),
+])
+def test_list_users_search_and_filters(staff, directory, params, expected):
+    assert listed_emails(staff_client(staff), params) == expected
+
+
+@pytest.mark.django_db
+def test_list_users_filters_with_cursor_pagination(staff, directory):
+    params = {'search': 'silva', 'pagination': 'cursor', 'page_size': 1}
+    client = staff_client(staff)
+    first = client.get('/users/users-list-service/', params).data
+    second = client.get(first['next']).data
+    assert {first['results'][0]['email'], second['results'][0]['email']} == {
+        'ana.silva@example.com', 'bruno@example.com'}
+    assert second['next'] is None
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params', [{'is_active': 'talvez'}, {'country': 'XX'}])
+def test_list_users_invalid_filter(staff, params):
+    response = staff_client(staff).get('/users/users-list-service/', params)
+    assert response.status_code == 400
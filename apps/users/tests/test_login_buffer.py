@@ -0,0 +1,75 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from apps.users.buffers import flush_login_buffer, get_login_buffer
+
+
+@pytest.fixture
+def write_behind(settings):
+    settings.LOGIN_WRITE_BEHIND = True
+    settings.LOGIN_WRITE_BEHIND_BACKEND = 'memory'
+    settings.LOGIN_WRITE_BEHIND_MAX_STALENESS = 3600
+    yield
+    get_login_buffer().drain()
+
+
+@pytest.fixture
+def user():
+    return get_user_model().objects.create_user(
+        email='testuser1@example.com',
+        username='testuser1',
+        password='password123',
+        is_active=True
+    )
+
+
+def login(user):
+    return APIClient().post(
+        reverse('login'), {'email': user.email, 'password': 'password123'}, format='json')
+
+
+@pytest.mark.django_db
+def test_login_write_behind_defers_writes(write_behind, user):
+    """Com write-behind o login não grava OutstandingToken até o flush"""
+    last_login = user.last_login
+
+    response = login(user)
+
+    assert response.status_code == 200
+    assert not OutstandingToken.objects.exists()
+
+    result = flush_login_buffer()
+
+    assert result == {'last_logins': 1, 'outstanding_tokens': 1}
+    assert OutstandingToken.objects.filter(user=user).count() == 1
+    user.refresh_from_db()
+    assert user.last_login > last_login
+
+
+@pytest.mark.django_db
+def test_login_write_behind_flushes_when_stale(write_behind, settings, user):
+    """Passada a staleness máxima, o próprio request descarrega o buffer"""
+    settings.LOGIN_WRITE_BEHIND_MAX_STALENESS = 0
+
+    response = login(user)
+
+    assert response.status_code == 200
+    assert OutstandingToken.objects.filter(user=user).count() == 1
+    assert get_login_buffer().oldest() is None
+
+
+@pytest.mark.django_db
+def test_logout_before_flush(write_behind, user):
+    """Logout antes do flush não gera conflito de jti"""
+    response = login(user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+    logout = client.post(reverse('logout'), {'refresh': response.data['refresh']}, format='json')
+    assert logout.status_code == 205
+
+    flush_login_buffer()
+    assert OutstandingToken.objects.count() == 1
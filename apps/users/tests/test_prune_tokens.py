@@ -0,0 +1,34 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from apps.users.tasks import task_prune_expired_tokens
+
+
+def make_token(jti, expires_at, blacklisted=False):
+    token = OutstandingToken.objects.create(jti=jti, token='', expires_at=expires_at)
+    if blacklisted:
+        BlacklistedToken.objects.create(token=token)
+    return token
+
+
+@pytest.mark.django_db
+def test_prune_removes_only_expired_tokens(settings):
+    """Remove apenas os tokens expirados, em lotes, e reporta o total"""
+    settings.TOKEN_PRUNE_CHUNK_SIZE = 2
+    past = timezone.now() - timedelta(days=1)
+    future = timezone.now() + timedelta(days=1)
+    for i in range(3):
+        make_token(f'expired-{i}', past, blacklisted=i == 0)
+    make_token('valid', future, blacklisted=True)
+
+    result = task_prune_expired_tokens()
+
+    assert result['outstanding_tokens'] == 3
+    assert result['blacklisted_tokens'] == 1
+    assert result['chunks'] == 2
+    assert 'elapsed_seconds' in result
+    assert list(OutstandingToken.objects.values_list('jti', flat=True)) == ['valid']
+    assert BlacklistedToken.objects.count() == 1
@@ -0,0 +1,60 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+
+@pytest.fixture
+def rates(settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {'anon_ip': '100/min', 'anon_email': '2/min', 'anon_global': '100/min'},
+    }
+
+
+def login(client, email):
+    return client.post(reverse('login'), {'email': email, 'password': 'password123'}, format='json')
+
+
+@pytest.mark.django_db
+def test_login_throttled_per_email(rates, django_assert_num_queries):
+    """Excedido o limite por e-mail, o login é recusado sem tocar no banco"""
+    client = APIClient()
+    for _ in range(2):
+        assert login(client, 'victim@example.com').status_code == status.HTTP_401_UNAUTHORIZED
+
+    with django_assert_num_queries(0):
+        response = login(client, 'Victim@Example.com ')
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert int(response['Retry-After']) >= 1
+
+    # Outros e-mails continuam liberados
+    assert login(client, 'other@example.com').status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_throttle_counters_are_per_endpoint(rates):
+    """O limite do login não consome o da recuperação de senha"""
+    client = APIClient()
+    for _ in range(3):
+        login(client, 'victim@example.com')
+
+    response = client.post(reverse('recover_password'), {'email': 'victim@example.com'}, format='json')
+
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_rejected_requests_do_not_consume_global_budget(settings):
+    """Um IP barrado pelo próprio limite não esgota o teto global dos demais"""
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {'anon_ip': '2/min', 'anon_email': '100/min', 'anon_global': '5/min'},
+    }
+    abusive = APIClient(REMOTE_ADDR='10.0.0.1')
+    responses = [login(abusive, f'user{i}@example.com').status_code for i in range(10)]
+    assert responses.count(status.HTTP_429_TOO_MANY_REQUESTS) == 8
+
+    other = APIClient(REMOTE_ADDR='10.0.0.2')
+    assert login(other, 'other@example.com').status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,116 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.users.authentication import revoke_user_tokens
+from apps.users.tokens import TOKEN_GENERATION_CLAIM, UserRefreshToken
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        email='user@example.com', username='user', password='password123')
+
+
+@pytest.fixture
+def superuser():
+    return User.objects.create_superuser(
+        email='admin@example.com', username='admin', password='password123')
+
+
+def client_for(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {UserRefreshToken.for_user(user).access_token}')
+    return client
+
+
+def is_authenticated(client):
+    return client.get(reverse('choices-list')).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_tokens_carry_generation(user):
+    refresh = UserRefreshToken.for_user(user)
+
+    assert refresh[TOKEN_GENERATION_CLAIM] == 0
+    assert refresh.access_token[TOKEN_GENERATION_CLAIM] == 0
+
+
+@pytest.mark.django_db
+def test_generation_check_is_served_from_cache(user, django_assert_num_queries):
+    client = client_for(user)
+
+    # snapshot e geração vêm da mesma consulta
+    with django_assert_num_queries(1):
+        assert is_authenticated(client)
+    with django_assert_num_queries(0):
+        assert is_authenticated(client)
+
+
+@pytest.mark.django_db
+def test_logout_all_revokes_every_token(user):
+    first, second = client_for(user), client_for(user)
+    assert is_authenticated(first) and is_authenticated(second)
+
+    response = first.post(reverse('logout-all'))
+
+    assert response.status_code == status.HTTP_205_RESET_CONTENT
+    assert not is_authenticated(first)
+    assert not is_authenticated(second)
+    # tokens emitidos depois continuam valendo
+    assert is_authenticated(client_for(User.objects.get(pk=user.pk)))
+
+
+@pytest.mark.django_db
+def test_password_change_revokes_tokens(user):
+    client = client_for(user)
+    assert is_authenticated(client)
+
+    user.reset_password()
+
+    assert not is_authenticated(client)
+
+
+@pytest.mark.django_db
+def test_login_only_save_keeps_tokens(user):
+    client = client_for(user)
+    user.save(update_fields=['last_login'])
+
+    assert is_authenticated(client)
+
+
+@pytest.mark.django_db
+def test_inactivation_revokes_tokens_after_reactivation(user, superuser):
+    client = client_for(user)
+    assert is_authenticated(client)
+
+    admin = client_for(superuser)
+    admin.delete(reverse('user-inactivate'), {'id': str(user.id)}, format='json')
+    admin.put(reverse('user-activate', kwargs={'id': user.id}))
+
+    assert User.objects.get(pk=user.pk).is_active
+    assert not is_authenticated(client)
+
+
+@pytest.mark.django_db
+def test_bulk_inactivation_bumps_generation(user, superuser):
+    client_for(superuser).post(
+        reverse('users-bulk-activation'), {'action': 'inactivate', 'ids': [str(user.id)]}, format='json')
+
+    assert User.objects.get(pk=user.pk).token_generation == user.token_generation + 1
+
+
+@pytest.mark.django_db
+def test_introspection_reports_revoked_tokens(user, superuser):
+    token = str(UserRefreshToken.for_user(user).access_token)
+    revoke_user_tokens([user.pk])
+
+    response = client_for(superuser).post(reverse('token-introspect'), {'tokens': [token]}, format='json')
+
+    [result] = response.data['results']
+    assert not result['valid']
+    assert result['error'] == 'Token has been revoked'
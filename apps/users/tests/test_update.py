@@ -116,3 +116,35 @@ def test_normal_user_cannot_update_other_user(normal_user, another_user):
     assert normal_user.email == 'hacker_email@example.com'
     # another_user NÃO deve ser atualizado
     assert another_user.email == 'another@example.com'
+
+
+@pytest.mark.django_db
+def test_update_loads_target_user_once(superuser, normal_user, django_assert_num_queries):
+    """A linha do usuário alvo é buscada uma única vez: SELECT + UPDATE"""
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(superuser).access_token}')
+    client.get('/users/choices/')  # aquece o cache de autenticação
+
+    with django_assert_num_queries(2):
+        response = client.put('/users/user-update-service/', {
+            'id': str(normal_user.id),
+            'email': normal_user.email,  # email inalterado não consulta unicidade
+            'first_name': 'Updated',
+        }, format='json')
+
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_update_own_email_checks_uniqueness_once(normal_user, another_user, django_assert_num_queries):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(normal_user).access_token}')
+    client.get('/users/choices/')
+
+    with django_assert_num_queries(3):  # SELECT, unicidade do email e UPDATE
+        response = client.put('/users/user-update-service/', {'email': 'new@example.com'}, format='json')
+    assert response.status_code == status.HTTP_200_OK
+
+    response = client.put('/users/user-update-service/', {'email': another_user.email}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data['email'] == ['Usuário com este email já existe.']
@@ -0,0 +1,158 @@
+"""
+Throttling distribuído para os endpoints anônimos (login, cadastro e
+recuperação de senha).
+
+Usa contadores de janela deslizante no cache do Django (Redis): a contagem
+estimada é `anterior * (1 - fração decorrida da janela) + atual`, o que
+custa um GET (das duas janelas) e um INCR por request em vez da lista de
+timestamps do `SimpleRateThrottle` do DRF. Requests recusados não são
+contados. O DRF aplica os throttles em `initial()`, antes
+do handler, então um request rejeitado não chega a fazer hash de senha nem
+consulta ao banco.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from apps.core.logs import logger
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Throttle base; subclasses definem `scope` (chave em
+    `DEFAULT_THROTTLE_RATES`) e `get_ident_key`. O contador é separado por
+    view via `throttle_scope` da view.
+    """
+    scope = None
+
+    def __init__(self):
+        self.num_requests, self.duration = self.parse_rate(api_settings.DEFAULT_THROTTLE_RATES[self.scope])
+        self.estimated = 0
+        self.elapsed = 0
+        self.current_key = None
+
+    @staticmethod
+    def parse_rate(rate):
+        num, period = rate.split('/')
+        return int(num), DURATIONS[period[0]]
+
+    def get_ident_key(self, request, view):
+        """Identificador do cliente; None desativa o throttle para o request."""
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        if not self.check(request, view):
+            return False
+        self.hit()
+        return True
+
+    def check(self, request, view):
+        """Verifica o limite contando este request, sem consumir nada."""
+        self.current_key = None
+        ident = self.get_ident_key(request, view)
+        if ident is None:
+            return True
+
+        now = time.time()
+        window = int(now // self.duration)
+        self.elapsed = now - window * self.duration
+        prefix = f'throttle:{getattr(view, "throttle_scope", view.__class__.__name__)}:{self.scope}:{ident}'
+        current_key, previous_key = f'{prefix}:{window}', f'{prefix}:{window - 1}'
+
+        try:
+            counts = cache.get_many([current_key, previous_key])
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # Sem o Redis o throttle é desligado em vez de derrubar o login
+            logger.warning("Throttle %s indisponível: %s", self.scope, e)
+            return True
+
+        weight = 1 - self.elapsed / self.duration
+        self.estimated = counts.get(previous_key, 0) * weight + counts.get(current_key, 0) + 1
+        self.current_key = current_key
+        return self.estimated <= self.num_requests
+
+    def hit(self):
+        """Consome o request verificado por `check`."""
+        if self.current_key is None:
+            return
+        try:
+            self._incr(self.current_key)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.warning("Throttle %s indisponível: %s", self.scope, e)
+
+    def _incr(self, key):
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Primeira requisição da janela; a chave vive duas janelas para
+            # servir de "anterior" na próxima.
+            if cache.add(key, 1, timeout=self.duration * 2):
+                return 1
+            return cache.incr(key)
+
+    def wait(self):
+        # Tempo até o peso da janela anterior baixar o suficiente; no pior
+        # caso, o fim da janela atual.
+        return max(1.0, self.duration - self.elapsed)
+
+
+class AnonIPThrottle(SlidingWindowThrottle):
+    scope = 'anon_ip'
+
+    def get_ident_key(self, request, view):
+        return self.get_ident(request)
+
+
+class AnonEmailThrottle(SlidingWindowThrottle):
+    """Limita tentativas por e-mail alvo, mesmo vindas de IPs diferentes."""
+    scope = 'anon_email'
+
+    def get_ident_key(self, request, view):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        return hashlib.sha256(email.strip().lower().encode()).hexdigest()
+
+
+class AnonGlobalThrottle(SlidingWindowThrottle):
+    """Teto global do endpoint, somando todos os clientes."""
+    scope = 'anon_global'
+
+    def get_ident_key(self, request, view):
+        return 'all'
+
+
+class AnonThrottle(BaseThrottle):
+    """
+    Aplica os limites por IP, por e-mail e global como um só throttle.
+
+    O DRF chama todos os throttles da view e cada um contaria o request mesmo
+    quando outro o recusa: um único IP abusivo esgotaria o teto global de
+    todos os anônimos. Aqui todos os limites são verificados antes e os
+    contadores só avançam se o request for aceito. Verificação e incremento
+    não são atômicos: requests simultâneos podem passar um pouco do limite.
+    """
+    throttle_classes = [AnonIPThrottle, AnonEmailThrottle, AnonGlobalThrottle]
+
+    def __init__(self):
+        self.throttles = [throttle_class() for throttle_class in self.throttle_classes]
+        self.rejected = []
+
+    def allow_request(self, request, view):
+        self.rejected = [throttle for throttle in self.throttles if not throttle.check(request, view)]
+        if self.rejected:
+            return False
+        for throttle in self.throttles:
+            throttle.hit()
+        return True
+
+    def wait(self):
+        return max(throttle.wait() for throttle in self.rejected)
+
+
+ANON_THROTTLE_CLASSES = [AnonThrottle]
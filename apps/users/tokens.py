@@ -0,0 +1,60 @@
+from django.conf import settings
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, BlacklistMixin, RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from apps.users.blacklist import might_be_blacklisted
+from apps.users.buffers import record_outstanding_token
+from apps.users.keys import get_token_backend
+
+# Geração dos tokens do usuário no momento da emissão; tokens de uma geração
+# anterior à atual de `User.token_generation` são recusados. Tokens sem a
+# claim (emitidos antes dela existir) contam como geração 0.
+TOKEN_GENERATION_CLAIM = 'token_generation'
+
+
+class KeyRingTokenMixin:
+    """Assina e verifica com o backend de `apps.users.keys` (HS256 ou key ring)."""
+
+    def get_token_backend(self):
+        return get_token_backend()
+
+
+class UserAccessToken(KeyRingTokenMixin, AccessToken):
+    """Access token validado pelo `CachedJWTAuthentication`."""
+
+
+class UserRefreshToken(KeyRingTokenMixin, RefreshToken):
+    """
+    Refresh token emitido pelo `LoginView` e validado pelo `LogoutView`.
+
+    - Com `LOGIN_WRITE_BEHIND` ativo, o `OutstandingToken` vai para o buffer de
+      login em vez de ser inserido na hora.
+    - A checagem da blacklist passa antes pelo filtro de Bloom e só consulta o
+      banco em um resultado positivo.
+    - Carrega a `TOKEN_GENERATION_CLAIM`, copiada para o access token.
+    """
+    access_token_class = UserAccessToken
+
+    @classmethod
+    def for_user(cls, user):
+        # Pula o BlacklistMixin.for_user (que registra o token) para incluir a
+        # claim de geração antes de o token ser serializado
+        token = super(BlacklistMixin, cls).for_user(user)
+        token[TOKEN_GENERATION_CLAIM] = user.token_generation
+        outstanding = {
+            'jti': token[api_settings.JTI_CLAIM],
+            'token': str(token),
+            'created_at': token.current_time,
+            'expires_at': datetime_from_epoch(token['exp']),
+        }
+        if settings.LOGIN_WRITE_BEHIND:
+            record_outstanding_token(user, **outstanding)
+        else:
+            OutstandingToken.objects.create(user=user, **outstanding)
+        return token
+
+    def check_blacklist(self):
+        if might_be_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
@@ -2,7 +2,9 @@ from django.urls import path
 
 from apps.users.views import (LoginView, ListUsers, SignUpView,
                               RecoverPassword, UpdateUser, InactivateUser,
-                              ActivateUser, LogoutView, MeView, ChoicesListView)
+                              ActivateUser, LogoutView, LogoutAllView, MeView)
+from apps.users.views_bulk import BulkActivationView, UserExportView, UserImportView
+from apps.users.views_service import ChoicesListView, MetricsView, TokenIntrospectView
 
 urlpatterns = [
     path(
@@ -34,9 +36,21 @@ urlpatterns = [
         'user-activate-service/<str:id>/',
         ActivateUser.as_view(),
         name='user-activate'),
+    path(
+        'users-bulk-activation-service/',
+        BulkActivationView.as_view(),
+        name='users-bulk-activation'),
     path('logout-servive/', LogoutView.as_view(), name='logout'),
+    path('logout-all-service/', LogoutAllView.as_view(), name='logout-all'),
     path('me/', MeView.as_view(), name='me'),
     path('choices/', ChoicesListView.as_view(),
          name='choices-list'),
+    path('token-introspect/', TokenIntrospectView.as_view(),
+         name='token-introspect'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    path('users-import-service/', UserImportView.as_view(),
+         name='users-import'),
+    path('users-export-service/', UserExportView.as_view(),
+         name='users-export'),
 
 ]
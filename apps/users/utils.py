@@ -1,10 +1,70 @@
 from django.core.exceptions import ObjectDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework.exceptions import ValidationError
 
 from apps.users.models import User
 
 
-def get_target_user(request_user, id=None):
+class UserLoader:
+    """
+    Mapa de identidade de usuários com escopo de request.
+
+    A view, `get_target_user` e os serializers de escrita pedem o mesmo
+    usuário por id; com o loader compartilhado (`get_user_loader`) cada linha
+    é buscada no máximo uma vez e todos recebem a mesma instância, então o que
+    um altera o outro enxerga.
+    """
+
+    def __init__(self):
+        self._users = {}
+
+    @staticmethod
+    def _key(pk):
+        try:
+            return User._meta.pk.to_python(pk)
+        except DjangoValidationError:
+            return None
+
+    def add(self, user):
+        self._users[user.pk] = user
+        return user
+
+    def get(self, pk):
+        """:raises User.DoesNotExist: inclusive para ids malformados."""
+        key = self._key(pk)
+        if key is None:
+            raise User.DoesNotExist
+        if key not in self._users:
+            # Ausências também ficam no mapa
+            self._users[key] = User.objects.filter(pk=key).first()
+        if self._users[key] is None:
+            raise User.DoesNotExist
+        return self._users[key]
+
+    def full(self, user):
+        """Instância completa de `user` (ver `get_full_user`)."""
+        if user.pk in self._users:
+            return self._users[user.pk]
+        if not user.get_deferred_fields():
+            return self.add(user)
+        return self.get(user.pk)
+
+
+def get_user_loader(request=None):
+    """
+    Loader do request (DRF ou Django), criado no primeiro uso.
+
+    Sem request devolve um loader avulso, que não compartilha nada.
+    """
+    if request is None:
+        return UserLoader()
+    request = getattr(request, '_request', request)
+    if not hasattr(request, '_user_loader'):
+        request._user_loader = UserLoader()  # pylint: disable=protected-access
+    return request._user_loader  # pylint: disable=protected-access
+
+
+def get_target_user(request_user, id=None, loader=None):
     """
     Retorna o usuário alvo para update/inactivate.
 
@@ -12,12 +72,24 @@ def get_target_user(request_user, id=None):
     - Usuários comuns sempre retornam a si mesmos.
     - Levanta ValidationError se o usuário alvo não existir.
     """
+    loader = loader or UserLoader()
     if request_user.is_superuser and id:
         try:
-            target_user = User.objects.get(id=id)
+            target_user = loader.get(id)
         except ObjectDoesNotExist:
             raise ValidationError({'detail': 'Usuário não encontrado.'})
     else:
-        target_user = request_user
+        target_user = loader.full(request_user)
 
     return target_user
+
+
+def get_full_user(user, loader=None):
+    """
+    Garante uma instância completa de `User`.
+
+    O `request.user` resolvido por `CachedJWTAuthentication` é um snapshot com
+    campos diferidos; para serializar ou salvar o perfil completo é mais barato
+    buscar a linha uma única vez do que carregar cada campo diferido sob demanda.
+    """
+    return (loader or UserLoader()).full(user)
@@ -1,17 +1,17 @@
 import traceback
 
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import F
 from django.utils import timezone
 from drf_yasg import openapi
-from drf_yasg.utils import swagger_auto_schema
+from drf_yasg.utils import no_body, swagger_auto_schema
 from rest_framework import status
 from rest_framework.generics import ListAPIView
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.exceptions import TokenError
-from rest_framework_simplejwt.tokens import RefreshToken
 
 from apps.core.logs import logger
 from apps.users.permissions import IsStaffOrAdmin
@@ -24,23 +24,87 @@ from apps.users.serializers import (
     UserActivateSerializer, LogoutSerializer, UserSerializer
 )
 from apps.users.models import User
-from apps.users.tasks import task_send_password_reset_email
-from apps.users.utils import get_target_user
-from apps.users.choices import LanguageChoices, CountryChoices, CurrencyChoices, TimezoneChoices
+from apps.users.authentication import invalidate_cached_user, revoke_user_tokens
+from apps.users.buffers import record_last_login
+from apps.users.hashing import HashingCapacityExceeded, check_password
+from apps.users.compiled import compiled_serializer
+from apps.users.conditional import (PreconditionFailed, check_if_match, current_validators, is_conditional,
+                                    is_not_modified, make_etag, not_modified_response, representation_variant,
+                                    set_validators, user_etag)
+from apps.users.filters import BOOLEAN_FILTERS, CHOICE_FILTERS, TEXT_FILTERS, filter_users
+from apps.users.pagination import KEYSET_ORDERING, EstimatedCountPagination, KeysetPagination
+from apps.users.throttling import ANON_THROTTLE_CLASSES
+from apps.users.tokens import UserRefreshToken
+from apps.users.tasks import task_reset_password, task_send_password_reset_email
+from apps.users.utils import get_target_user, get_full_user, get_user_loader
+
+
+FIELDS_PARAMETER = openapi.Parameter(
+    'fields', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+    description='Campos da resposta separados por vírgula (ex.: id,email).')
 
 
 class ListUsers(ListAPIView):
     """
     View for listing all users.
     :permission_classes: Only authenticated staff or admin users can access this view.
+    :param pagination: `cursor` para a paginação por cursor (keyset), que
+        segue pelos links `next`/`previous`; sem ele, paginação por página.
+    :param fields: campos da resposta separados por vírgula (ex.: `id,email`).
+    :param search: busca por email, nome ou sobrenome.
+    :param is_active, is_staff, country, language, organization: filtros exatos.
     """
     permission_classes = [IsAuthenticated, IsStaffOrAdmin]
     serializer_class = UserRetrieveSerializer
-    pagination_class = PageNumberPagination
-    queryset = User.objects.all()
-
+    pagination_class = EstimatedCountPagination
+    queryset = User.objects.order_by(*KEYSET_ORDERING)
+
+    def get_sparse_fields(self):
+        if getattr(self, 'swagger_fake_view', False) or self.request is None:
+            # geração do schema (drf_yasg) não tem request real
+            return None
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = self.serializer_class.parse_fields(self.request)
+        return self._sparse_fields
+
+    def get_queryset(self):
+        queryset = filter_users(super().get_queryset(), self.request.query_params)
+        fields = self.get_sparse_fields() or self.serializer_class.allowed_fields()
+        # As colunas da ordenação também são lidas pela paginação por cursor
+        return queryset.only(*self.serializer_class.only_columns(fields), *KEYSET_ORDERING)
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.get_sparse_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        if not settings.COMPILED_SERIALIZERS:
+            return super().list(request, *args, **kwargs)
+        compiled = compiled_serializer(self.serializer_class, self.get_sparse_fields())
+        queryset = self.filter_queryset(self.get_queryset()).values(*compiled.columns, *KEYSET_ORDERING)
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(compiled.many(page))
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if params.get('pagination') == 'cursor' or KeysetPagination.cursor_query_param in params:
+                self._paginator = KeysetPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    @swagger_auto_schema(manual_parameters=[
+        openapi.Parameter('search', openapi.IN_QUERY, type=openapi.TYPE_STRING),
+        FIELDS_PARAMETER,
+        openapi.Parameter('pagination', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=['cursor']),
+        *[openapi.Parameter(field, openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN) for field in BOOLEAN_FILTERS],
+        *[openapi.Parameter(field, openapi.IN_QUERY, type=openapi.TYPE_STRING)
+          for field in CHOICE_FILTERS + TEXT_FILTERS],
+    ])
     def get(self, request, *args, **kwargs):
-        response = super().list(request, *args, **kwargs)
+        response = self.list(request, *args, **kwargs)
         if not response.data['results']:
             response.data['message'] = 'No users found'
         return response
@@ -48,12 +112,28 @@ class ListUsers(ListAPIView):
 class RetrieveUser(APIView):
     """
     View for retrieving a specific user by ID.
+    :param fields: campos da resposta separados por vírgula (ex.: `id,email`).
     """
+    @swagger_auto_schema(manual_parameters=[FIELDS_PARAMETER])
     def get(self, request, id, *args, **kwargs):
+        fields = UserRetrieveSerializer.parse_fields(request)
+        variant = representation_variant(request, fields)
+        if is_conditional(request):
+            validators = current_validators(id)
+            if validators is not None:
+                etag = make_etag(id, *validators, variant)
+                if is_not_modified(request, etag, validators[1]):
+                    return not_modified_response(etag, validators[1])
+
+        columns = UserRetrieveSerializer.only_columns(fields or UserRetrieveSerializer.allowed_fields())
         try:
-            user = User.objects.get(id=id)
-            serializer = UserRetrieveSerializer(user)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            user = User.objects.only(*columns, 'version', 'updated_at').get(id=id)
+            if settings.COMPILED_SERIALIZERS:
+                response = Response(compiled_serializer(UserRetrieveSerializer, fields).one(user),
+                                    status=status.HTTP_200_OK)
+            else:
+                response = Response(UserRetrieveSerializer(user, fields=fields).data, status=status.HTTP_200_OK)
+            return set_validators(response, user_etag(user, variant), user.updated_at)
         except ObjectDoesNotExist:
             return Response({'error': 'User not found'}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -68,6 +148,8 @@ class LoginView(APIView):
     :param password: Senha do usuário (obrigatória).
     """
     permission_classes = [AllowAny]
+    throttle_classes = ANON_THROTTLE_CLASSES
+    throttle_scope = 'login'
 
     @swagger_auto_schema(request_body=UserLoginSerializer)
     def post(self, request):
@@ -89,14 +171,19 @@ class LoginView(APIView):
                 return Response({'message': 'Invalid credentials'},
                                 status=status.HTTP_401_UNAUTHORIZED)
 
-            if not user.check_password(password):
+            # Hash no pool limitado: com a fila cheia responde 503 + Retry-After
+            if not check_password(user, password):
                 return Response({'message': 'Invalid credentials'},
                                 status=status.HTTP_401_UNAUTHORIZED)
 
-            user.last_login = timezone.now()
-            user.save(update_fields=['last_login'])
+            if settings.LOGIN_WRITE_BEHIND:
+                # last_login vai para o buffer e é gravado em lote depois
+                record_last_login(user, timezone.now())
+            else:
+                user.last_login = timezone.now()
+                user.save(update_fields=['last_login'])
 
-            refresh = RefreshToken.for_user(user)
+            refresh = UserRefreshToken.for_user(user)
             return Response({
                 'refresh': str(refresh),
                 'access': str(refresh.access_token),
@@ -109,6 +196,8 @@ class SignUpView(APIView):
     Registro de usuários.
     """
     permission_classes = [AllowAny]
+    throttle_classes = ANON_THROTTLE_CLASSES
+    throttle_scope = 'signup'
 
     @swagger_auto_schema(request_body=UserCreateSerializer)
     def post(self, request, *args, **kwargs):
@@ -127,6 +216,8 @@ class UpdateUser(APIView):
     :param email: User's email (optional).
     :param first_name: User's first name (optional).
     :param last_name: User's last name (optional).
+    :param version: versão lida do usuário (opcional, alternativa ao If-Match).
+    :header If-Match: ETag lido do usuário; se ele mudou desde então, 412.
     """
     permission_classes = [IsAuthenticated]
 
@@ -140,19 +231,21 @@ class UpdateUser(APIView):
         # Para mitigar, apenas superusers podem usar o id passado.
         # ==============================================================
 
-        target_user = get_target_user(request.user, id=id_from_body)
+        target_user = get_target_user(request.user, id=id_from_body, loader=get_user_loader(request))
 
-        # Cria o serializer passando o usuário alvo como instance
+        # Cria o serializer passando o usuário alvo como instance; a versão
+        # do If-Match (ou do campo `version`) condiciona o UPDATE
         serializer = UserUpdateSerializer(
             instance=target_user,
             data=request.data,
-            context={'id': target_user.id, 'request': request},
+            context={'id': target_user.id, 'request': request, 'version': check_if_match(request, target_user)},
             partial=True
         )
 
         if serializer.is_valid():
             user = serializer.save()
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            response = Response(serializer.data, status=status.HTTP_200_OK)
+            return set_validators(response, user_etag(user, representation_variant(request)), user.updated_at)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -161,6 +254,8 @@ class InactivateUser(APIView):
     """
     View for inactivating a user.
     :permission_classes: Only authenticated staff or admin users can access this view.
+    :raises PreconditionFailed: 412 se o usuário for alterado por outra escrita
+        entre a leitura e o UPDATE (mesmo contrato do UpdateUser).
     """
     permission_classes = [IsAuthenticated]
 
@@ -170,7 +265,7 @@ class InactivateUser(APIView):
         id_from_body = request.data.get('id')
 
         # Determina o usuário alvo usando função utilitária
-        target_user = get_target_user(request.user, id=id_from_body)
+        target_user = get_target_user(request.user, id=id_from_body, loader=get_user_loader(request))
 
         # Cria o serializer para validação
         serializer = UserInactivateSerializer(
@@ -180,8 +275,14 @@ class InactivateUser(APIView):
 
         if serializer.is_valid():
             user = serializer.validated_data['user']
-            user.is_active = False
-            user.save()
+            # UPDATE condicional à versão lida: não sobrescreve uma escrita
+            # concorrente. Revoga os tokens já emitidos (inclusive se for
+            # reativado depois).
+            changes = {'is_active': False, 'token_generation': F('token_generation') + 1}
+            if not user.update_if_version(changes, user.version):
+                raise PreconditionFailed()
+            # is_active faz parte do snapshot usado na autenticação
+            invalidate_cached_user(user.pk)
             return Response(
                 {'message': 'User successfully inactivated!'},
                 status=status.HTTP_204_NO_CONTENT
@@ -195,6 +296,8 @@ class ActivateUser(APIView):
     View for activating a user.
     :permission_classes: Only authenticated staff or admin users can access this view.
     :param id: User's ID (required).
+    :raises PreconditionFailed: 412 se o usuário for alterado por outra escrita
+        entre a leitura e o UPDATE (mesmo contrato do UpdateUser).
     """
     @staticmethod
     def put(request, id, *args, **kwargs):
@@ -205,8 +308,9 @@ class ActivateUser(APIView):
 
         if serializer.is_valid():
             user = serializer.validated_data['user']
-            user.is_active = True
-            user.save()
+            if not user.update_if_version({'is_active': True}, user.version):
+                raise PreconditionFailed()
+            invalidate_cached_user(user.pk)
             return Response(
                 {'message': 'User sucessfully activated!'}, status=status.HTTP_200_OK)
 
@@ -215,6 +319,8 @@ class ActivateUser(APIView):
 
 class RecoverPassword(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = ANON_THROTTLE_CLASSES
+    throttle_scope = 'recover_password'
 
     @swagger_auto_schema(
         request_body=openapi.Schema(
@@ -235,8 +341,14 @@ class RecoverPassword(APIView):
 
         try:
             user = User.objects.get(email=email)
-            new_password = user.reset_password()
-            task_send_password_reset_email.delay(user.id, new_password)
+            try:
+                new_password = user.reset_password()
+            except HashingCapacityExceeded:
+                # Um 503 só para emails cadastrados também permitiria
+                # enumeration: a redefinição segue pelo Celery
+                task_reset_password.delay(user.id)
+            else:
+                task_send_password_reset_email.delay(user.id, new_password)
         except User.DoesNotExist:
             # Silenciar esse erro evita exploração por enumeration
             pass
@@ -254,6 +366,30 @@ class RecoverPassword(APIView):
             status=status.HTTP_200_OK,
         )
 
+
+class LogoutAllView(APIView):
+    """
+    - Objetivo:
+        Encerrar todas as sessões do usuário autenticado: todos os access e
+        refresh tokens já emitidos deixam de valer, sem blacklist token a token.
+
+    - Permissões:
+        Usuários autenticados (todos os perfis de usuários).
+
+    - Retorno:
+        JSON (205 Reset Content)
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        request_body=no_body,
+        responses={205: openapi.Response("Todas as sessões foram encerradas.")},
+    )
+    def post(self, request):
+        revoke_user_tokens([request.user.pk])
+        return Response({"detail": "Todas as sessões foram encerradas."}, status=status.HTTP_205_RESET_CONTENT)
+
+
 class LogoutView(APIView):
     """
     - Objetivo:
@@ -281,7 +417,7 @@ class LogoutView(APIView):
             return Response({"detail": "Refresh token ausente."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            token = RefreshToken(refresh_token)
+            token = UserRefreshToken(refresh_token)
             token.blacklist()  # ← aqui é onde ele vai para a blacklist
             return Response({"detail": "Logout realizado com sucesso."}, status=status.HTTP_205_RESET_CONTENT)
         except TokenError as e:
@@ -301,43 +437,27 @@ class MeView(APIView):
     """
     permission_classes = [IsAuthenticated]
 
+    @swagger_auto_schema(manual_parameters=[FIELDS_PARAMETER])
     def get(self, request):
-        serializer = UserSerializer(request.user)
-        return Response(serializer.data, status=status.HTTP_200_OK)
-
-
-class ChoicesListView(APIView):
-    """
-    Endpoint para listar opções de enums (choices).
-    Query param: type=[language|country|currency|timezone]
-    Default: language
-    """
-    permission_classes = [IsAuthenticated]
-
-    @swagger_auto_schema(
-        manual_parameters=[
-            openapi.Parameter(
-                'type',
-                openapi.IN_QUERY,
-                description="Tipo de choices: language, country, currency, timezone",
-                type=openapi.TYPE_STRING,
-                enum=['language', 'country', 'currency', 'timezone'],
-                required=False,
-                default='language'
-            )
-        ]
-    )
-    def get(self, request):
-        choice_type = request.query_params.get('type', 'language').lower()
-        choices_map = {
-            'language': LanguageChoices,
-            'country': CountryChoices,
-            'currency': CurrencyChoices,
-            'timezone': TimezoneChoices,
-        }
-        choices_class = choices_map.get(choice_type, LanguageChoices)
-        data = [
-            {'value': c.value, 'label': c.label}
-            for c in choices_class
-        ]
-        return Response(data, status=status.HTTP_200_OK)
\ No newline at end of file
+        fields = UserSerializer.parse_fields(request)
+        variant = representation_variant(request, fields)
+        if is_conditional(request):
+            validators = current_validators(request.user.pk)
+            if validators is not None:
+                etag = make_etag(request.user.pk, *validators, variant)
+                if is_not_modified(request, etag, validators[1]):
+                    return not_modified_response(etag, validators[1])
+
+        # O ETag sai da mesma leitura que o corpo: o snapshot do cache de
+        # autenticação pode estar atrasado em relação ao banco neste worker
+        if fields is None:
+            user = get_full_user(request.user, loader=get_user_loader(request))
+        else:
+            columns = UserSerializer.only_columns(fields)
+            user = User.objects.only(*columns, 'version', 'updated_at').get(pk=request.user.pk)
+        validators = user.version, user.updated_at
+        if settings.COMPILED_SERIALIZERS:
+            response = Response(compiled_serializer(UserSerializer, fields).one(user), status=status.HTTP_200_OK)
+        else:
+            response = Response(UserSerializer(user, fields=fields).data, status=status.HTTP_200_OK)
+        return set_validators(response, make_etag(user.pk, *validators, variant), validators[1])
@@ -0,0 +1,162 @@
+"""
+Operações em massa sobre o cadastro de usuários: importação, exportação e
+ativação/inativação em lote.
+"""
+import os
+from uuid import uuid4
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.users.bulk import count_matching, protected_users, set_active_by_filter, set_active_by_ids
+from apps.users.exports import EXPORT_FORMATS, stream_export
+from apps.users.imports import ImportFormatError, detect_format, iter_rows
+from apps.users.permissions import IsStaffOrAdmin
+from apps.users.serializers import UserBulkActivationSerializer
+from apps.users.tasks import task_bulk_set_active, task_import_users
+
+
+class BulkActivationView(APIView):
+    """
+    - Objetivo:
+        Ativar ou inativar vários usuários de uma vez, por lista de `ids` ou
+        por `filters` da listagem (ex.: `{"organization": "ACME"}`), com
+        UPDATEs em conjunto em vez de um save por usuário.
+
+    - Permissões:
+        Usuários autenticados da equipe ou administradores.
+
+    - Retorno:
+        200 OK com `{changed, unchanged, skipped, missing}`; `skipped` conta a
+        própria conta e, para quem não é superuser, os superusers, que nunca
+        são alterados em massa. Acima de
+        BULK_ACTIVATION_INLINE_LIMIT usuários, 202 Accepted com o `task_id`
+        da task em lotes (relatório em `core/task-result/<task_id>/`).
+    """
+    permission_classes = [IsAuthenticated, IsStaffOrAdmin]
+
+    @swagger_auto_schema(request_body=UserBulkActivationSerializer)
+    def post(self, request):
+        serializer = UserBulkActivationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        ids, filters, active = data.get('ids'), data.get('filters'), data['active']
+
+        actor = {'actor_id': str(request.user.pk), 'actor_is_superuser': request.user.is_superuser}
+
+        size = len(ids) if ids is not None else count_matching(filters)
+        if size > settings.BULK_ACTIVATION_INLINE_LIMIT:
+            task = task_bulk_set_active.delay(
+                active, ids=[str(pk) for pk in ids] if ids is not None else None, filters=filters, **actor)
+            return Response({
+                'task_id': task.id,
+                'status_url': reverse('task_result', kwargs={'task_id': task.id}),
+            }, status=status.HTTP_202_ACCEPTED)
+
+        protected = protected_users(**actor)
+        if ids is not None:
+            report = set_active_by_ids(ids, active, protected=protected)
+        else:
+            report = set_active_by_filter(filters, active, settings.BULK_ACTIVATION_CHUNK_SIZE, protected=protected)
+        return Response(report, status=status.HTTP_200_OK)
+
+
+class UserImportView(APIView):
+    """
+    - Objetivo:
+        Importar usuários em massa a partir de um arquivo CSV ou XLSX
+        (colunas obrigatórias: email e password; opcionais: os demais campos
+        do cadastro). O processamento é feito pelo Celery.
+
+    - Permissões:
+        Usuários autenticados da equipe ou administradores.
+
+    - Retorno:
+        202 Accepted com o `task_id`; o progresso e o relatório de erros por
+        linha ficam em `core/task-result/<task_id>/`.
+    """
+    permission_classes = [IsAuthenticated, IsStaffOrAdmin]
+    parser_classes = [MultiPartParser]
+
+    @swagger_auto_schema(manual_parameters=[
+        openapi.Parameter('file', openapi.IN_FORM, type=openapi.TYPE_FILE, required=True,
+                          description='Arquivo .csv ou .xlsx'),
+    ])
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'file': 'Envie o arquivo no campo "file".'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            file_format = detect_format(upload.name)
+        except ImportFormatError as e:
+            return Response({'file': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        os.makedirs(settings.IMPORT_UPLOAD_DIR, exist_ok=True)
+        path = os.path.join(settings.IMPORT_UPLOAD_DIR, f'{uuid4()}.{file_format}')
+        # O upload é removido aqui em qualquer saída, até a task assumir o arquivo
+        owns_file = True
+        try:
+            with open(path, 'wb') as destination:
+                for chunk in upload.chunks():
+                    destination.write(chunk)
+
+            # Cabeçalho inválido é recusado aqui em vez de virar uma task com erro
+            try:
+                next(iter_rows(path, file_format), None)
+            except (ImportFormatError, ValueError, OSError) as e:
+                return Response({'file': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+            task = task_import_users.delay(path, file_format)
+            owns_file = False
+        finally:
+            if owns_file and os.path.exists(path):
+                os.remove(path)
+
+        return Response({
+            'task_id': task.id,
+            'status_url': reverse('task_result', kwargs={'task_id': task.id}),
+        }, status=status.HTTP_202_ACCEPTED)
+
+
+class UserExportView(APIView):
+    """
+    - Objetivo:
+        Exportar todo o cadastro de usuários em um único download, sem
+        paginação. `?file_format=` aceita csv (padrão), ndjson ou xlsx.
+
+    - Permissões:
+        Usuários autenticados da equipe ou administradores.
+
+    - Retorno:
+        Arquivo enviado em streaming (200 OK); a memória usada não depende
+        do tamanho da tabela.
+    """
+    permission_classes = [IsAuthenticated, IsStaffOrAdmin]
+
+    @swagger_auto_schema(manual_parameters=[
+        openapi.Parameter('file_format', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                          enum=list(EXPORT_FORMATS), default='csv'),
+    ])
+    def get(self, request):
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {'file_format': f'Formato inválido. Use: {", ".join(EXPORT_FORMATS)}.'},
+                status=status.HTTP_400_BAD_REQUEST)
+
+        response = StreamingHttpResponse(
+            stream_export(file_format, settings.EXPORT_CHUNK_SIZE),
+            content_type=EXPORT_FORMATS[file_format])
+        filename = f'users-{timezone.now():%Y%m%d-%H%M%S}.{file_format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
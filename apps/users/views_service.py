@@ -0,0 +1,146 @@
+"""
+Endpoints de apoio, fora do cadastro de usuários: catálogo de choices, JWKS,
+introspecção de tokens e métricas do processo.
+"""
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.users.authentication import get_auth_cache_stats
+from apps.users.catalog import (ALL_TYPES, CATALOG_LANGUAGES, CHOICE_TYPES, get_catalog_data, get_catalog_entry,
+                                resolve_language, resolve_type)
+from apps.users.conditional import none_match_satisfied
+from apps.users.hashing import get_hashing_pool
+from apps.users.introspection import introspect_tokens
+from apps.users.keys import get_jwks
+from apps.users.permissions import IsStaffOrAdmin
+from apps.users.serializers import TokenIntrospectSerializer
+
+
+class ChoicesListView(APIView):
+    """
+    Endpoint para listar opções de enums (choices).
+    Query param: type=[language|country|currency|timezone|all]
+    Default: language
+
+    As respostas são pré-renderizadas no import (apps/users/catalog.py), com
+    ETag do conteúdo e Cache-Control longo; os rótulos seguem `?lang=` ou o
+    `Accept-Language`.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                'type',
+                openapi.IN_QUERY,
+                description="Tipo de choices: language, country, currency, timezone ou all (todos)",
+                type=openapi.TYPE_STRING,
+                enum=[*CHOICE_TYPES, ALL_TYPES],
+                required=False,
+                default='language'
+            ),
+            openapi.Parameter(
+                'lang',
+                openapi.IN_QUERY,
+                description="Idioma dos rótulos (padrão: Accept-Language)",
+                type=openapi.TYPE_STRING,
+                enum=list(CATALOG_LANGUAGES),
+                required=False,
+            ),
+        ]
+    )
+    def get(self, request):
+        choice_type, language = resolve_type(request), resolve_language(request)
+        entry = get_catalog_entry(choice_type, language, request.accepted_renderer.format)
+        if entry is None:
+            # Ex.: API navegável; renderiza pelo caminho normal do DRF
+            return Response(get_catalog_data(choice_type, language), status=status.HTTP_200_OK)
+
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match is not None and none_match_satisfied(if_none_match, entry.etag):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = HttpResponse(entry.body, content_type=entry.content_type)
+        response['ETag'] = entry.etag
+        response['Cache-Control'] = f'private, max-age={settings.CHOICES_MAX_AGE}'
+        patch_vary_headers(response, ['Accept', 'Accept-Language', 'Authorization'])
+        return response
+
+
+class JWKSView(APIView):
+    """
+    - Objetivo:
+        Publicar as chaves públicas de verificação dos JWT (JWKS), para que
+        outros serviços validem os tokens localmente.
+
+    - Permissões:
+        Pública.
+
+    - Retorno:
+        JSON (200 OK ou 304 Not Modified), com ETag e Cache-Control.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        body, etag = get_jwks()
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match is not None and none_match_satisfied(if_none_match, etag):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = etag
+        response['Cache-Control'] = f'public, max-age={settings.JWKS_MAX_AGE}'
+        return response
+
+
+class TokenIntrospectView(APIView):
+    """
+    - Objetivo:
+        Validar vários access/refresh tokens em uma única chamada (gateways).
+        Para cada token retorna validade, expiração, user_id, se o usuário
+        está ativo e seu nível de acesso.
+
+    - Permissões:
+        Usuários autenticados da equipe ou administradores (contas de serviço).
+
+    - Retorno:
+        JSON (200 OK) com os resultados na mesma ordem dos tokens enviados.
+    """
+    permission_classes = [IsAuthenticated, IsStaffOrAdmin]
+
+    @swagger_auto_schema(request_body=TokenIntrospectSerializer)
+    def post(self, request):
+        serializer = TokenIntrospectSerializer(data=request.data)
+        if serializer.is_valid():
+            results = introspect_tokens(serializer.validated_data['tokens'])
+            return Response({'results': results}, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class MetricsView(APIView):
+    """
+    - Objetivo:
+        Expor métricas do processo atual: cache de autenticação e pool de
+        hashing de senhas (profundidade da fila e latência dos hashes).
+
+    - Permissões:
+        Usuários autenticados da equipe ou administradores.
+
+    - Retorno:
+        JSON (200 OK)
+    """
+    permission_classes = [IsAuthenticated, IsStaffOrAdmin]
+
+    def get(self, request):
+        return Response({
+            'auth_cache': get_auth_cache_stats(),
+            'password_hashing': get_hashing_pool().stats(),
+        }, status=status.HTTP_200_OK)
@@ -3,6 +3,7 @@ from pathlib import Path
 from datetime import timedelta
 
 import dj_database_url
+from celery.schedules import crontab
 from decouple import config, Csv
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -26,13 +27,14 @@ CORS_ALLOW_ALL_ORIGINS = config("CORS_ALLOW_ALL_ORIGINS", cast=bool, default=Tru
 REDIS_HOST = config('REDIS_HOST')
 REDIS_PORT = config('REDIS_PORT')
 REDIS_DB = config('REDIS_DB')
+REDIS_URL = f'redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}'
 
 # BEAT
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers.DatabaseScheduler"
 
 # Celery
-CELERY_BROKER_URL = f'redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}'
-CELERY_RESULT_BACKEND = f'redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}'
+CELERY_BROKER_URL = REDIS_URL
+CELERY_RESULT_BACKEND = REDIS_URL
 
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
@@ -58,6 +60,144 @@ CELERY_TASK_ROUTES = {
     },
 }
 
+# LOGIN WRITE-BEHIND
+# Quando ativo, last_login e o OutstandingToken do login vão para um buffer
+# (redis | memory) e são gravados em lote, no máximo MAX_STALENESS segundos depois.
+LOGIN_WRITE_BEHIND = config('LOGIN_WRITE_BEHIND', cast=bool, default=False)
+LOGIN_WRITE_BEHIND_BACKEND = config('LOGIN_WRITE_BEHIND_BACKEND', default='redis')
+LOGIN_WRITE_BEHIND_MAX_STALENESS = config('LOGIN_WRITE_BEHIND_MAX_STALENESS', cast=int, default=30)
+
+# LOG DA API (apps.core.api_logs)
+# O middleware coloca um registro compacto num buffer (memory | redis) que é
+# gravado em lote fora do request, a cada FLUSH_INTERVAL segundos.
+API_LOG_ENABLED = config('API_LOG_ENABLED', cast=bool, default=True)
+API_LOG_BACKEND = config('API_LOG_BACKEND', default='memory')
+API_LOG_BUFFER_SIZE = config('API_LOG_BUFFER_SIZE', cast=int, default=10000)
+API_LOG_FLUSH_INTERVAL = config('API_LOG_FLUSH_INTERVAL', cast=int, default=5)
+# Corpos: gravados até MAX_BODY_LENGTH bytes; acima de MAX_BODY_READ o corpo
+# do request nem é lido pelo middleware
+API_LOG_MAX_BODY_LENGTH = config('API_LOG_MAX_BODY_LENGTH', cast=int, default=1024)
+API_LOG_MAX_BODY_READ = config('API_LOG_MAX_BODY_READ', cast=int, default=65536)
+API_LOG_SKIP_PATHS = ('/admin/', '/static/', '/swagger/', '/redoc/')
+# Amostragem: a primeira regra (padrão da rota, padrão do status, taxa) que
+# casar vale; sem regra, API_LOG_SAMPLE_RATE. Erros são sempre registrados.
+API_LOG_SAMPLE_RATE = config('API_LOG_SAMPLE_RATE', cast=float, default=1.0)
+API_LOG_SAMPLE_RULES = [
+    ('*', '5??', 1.0),
+    ('*', '4??', 1.0),
+    # polling do status das tasks
+    ('core/task-result/*', '*', 0.1),
+]
+# Retenção: no Postgres o log é particionado por dia e os dias expirados são
+# descartados inteiros; os agregados horários (APILogRollup) ficam mais tempo
+API_LOG_RETENTION_DAYS = config('API_LOG_RETENTION_DAYS', cast=int, default=30)
+API_LOG_ROLLUP_RETENTION_DAYS = config('API_LOG_ROLLUP_RETENTION_DAYS', cast=int, default=400)
+
+# CACHE
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    }
+}
+
+# Cache do usuário autenticado (LRU local ao worker + Redis)
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', cast=int, default=300)
+AUTH_USER_CACHE_LOCAL_TTL = config('AUTH_USER_CACHE_LOCAL_TTL', cast=int, default=5)
+AUTH_USER_CACHE_LOCAL_MAXSIZE = config('AUTH_USER_CACHE_LOCAL_MAXSIZE', cast=int, default=10000)
+# Espelho de User.token_generation no cache compartilhado; cobre a vida do refresh token
+AUTH_TOKEN_GENERATION_CACHE_TTL = config('AUTH_TOKEN_GENERATION_CACHE_TTL', cast=int, default=86400)
+
+# Filtro de Bloom na frente da blacklist de refresh tokens (redis | memory | vazio)
+# Após ativar, construa o filtro com: python manage.py rebuild_blacklist_filter
+TOKEN_BLACKLIST_FILTER_BACKEND = config('TOKEN_BLACKLIST_FILTER_BACKEND', default='')
+TOKEN_BLACKLIST_FILTER_CAPACITY = config('TOKEN_BLACKLIST_FILTER_CAPACITY', cast=int, default=1_000_000)
+TOKEN_BLACKLIST_FILTER_ERROR_RATE = config('TOKEN_BLACKLIST_FILTER_ERROR_RATE', cast=float, default=0.01)
+# Validade (s) da marca de pronto no Redis: limita a janela de um jti perdido numa
+# queda do Redis. O rebuild periódico (de hora em hora) a renova; 0 não expira.
+TOKEN_BLACKLIST_FILTER_READY_TTL = config('TOKEN_BLACKLIST_FILTER_READY_TTL', cast=int, default=7200)
+
+# Poda diária dos tokens expirados de token_blacklist, em lotes de TOKEN_PRUNE_CHUNK_SIZE
+TOKEN_PRUNE_CHUNK_SIZE = config('TOKEN_PRUNE_CHUNK_SIZE', cast=int, default=1000)
+
+PASSWORD_HASHERS = [
+    'apps.users.hashers.ConfigurablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+# Custo do PBKDF2; use `python manage.py calibrate_password_hashers` para
+# escolher o valor (0 = padrão do Django)
+PASSWORD_PBKDF2_ITERATIONS = config('PASSWORD_PBKDF2_ITERATIONS', cast=int, default=0)
+# Hashes desatualizados são refeitos pelo Celery após o login (senha cifrada,
+# válida por PASSWORD_REHASH_TTL segundos)
+PASSWORD_REHASH_ASYNC = config('PASSWORD_REHASH_ASYNC', cast=bool, default=True)
+PASSWORD_REHASH_TTL = config('PASSWORD_REHASH_TTL', cast=int, default=600)
+
+# Threads de request por processo do gunicorn (gunicorn_config.py)
+GUNICORN_THREADS = config('GUNICORN_THREADS', cast=int, default=2)
+
+# Pool dedicado para hash de senhas (por processo). Com WORKERS + QUEUE_SIZE
+# hashes em andamento, novos requests recebem 503 com Retry-After. Cada
+# request espera o próprio hash, então essa capacidade precisa ficar abaixo de
+# GUNICORN_THREADS: o padrão deixa metade das threads livre para o resto da API.
+PASSWORD_HASHING_WORKERS = config('PASSWORD_HASHING_WORKERS', cast=int, default=max(1, GUNICORN_THREADS // 2))
+PASSWORD_HASHING_QUEUE_SIZE = config('PASSWORD_HASHING_QUEUE_SIZE', cast=int, default=0)
+PASSWORD_HASHING_TIMEOUT = config('PASSWORD_HASHING_TIMEOUT', cast=int, default=10)
+PASSWORD_HASHING_RETRY_AFTER = config('PASSWORD_HASHING_RETRY_AFTER', cast=int, default=1)
+
+# Paginação: COUNT exato até o threshold; acima dele, estimativa do planner
+# (Postgres) ou COUNT em cache por PAGINATION_COUNT_CACHE_TTL segundos
+PAGINATION_EXACT_COUNT_THRESHOLD = config('PAGINATION_EXACT_COUNT_THRESHOLD', cast=int, default=10000)
+PAGINATION_COUNT_CACHE_TTL = config('PAGINATION_COUNT_CACHE_TTL', cast=int, default=60)
+
+# Leituras de usuário (listagem, /me) pelos serializers compilados de
+# apps.users.compiled; False volta para o ModelSerializer do DRF
+COMPILED_SERIALIZERS = config('COMPILED_SERIALIZERS', cast=bool, default=True)
+
+# Importação em massa de usuários (CSV/XLSX). O upload é salvo em
+# IMPORT_UPLOAD_DIR, que precisa ser compartilhado com o worker do Celery.
+IMPORT_UPLOAD_DIR = config('IMPORT_UPLOAD_DIR', default=os.path.join(BASE_DIR, 'shared_tmp', 'imports'))
+IMPORT_CHUNK_SIZE = config('IMPORT_CHUNK_SIZE', cast=int, default=500)
+IMPORT_HASHING_WORKERS = config('IMPORT_HASHING_WORKERS', cast=int, default=os.cpu_count() or 2)
+IMPORT_MAX_REPORTED_ERRORS = config('IMPORT_MAX_REPORTED_ERRORS', cast=int, default=1000)
+# Exportação: linhas buscadas por vez no cursor do banco
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', cast=int, default=2000)
+# Ativação/inativação em massa: acima de BULK_ACTIVATION_INLINE_LIMIT usuários
+# vira uma task do Celery, que altera BULK_ACTIVATION_CHUNK_SIZE linhas por vez
+BULK_ACTIVATION_INLINE_LIMIT = config('BULK_ACTIVATION_INLINE_LIMIT', cast=int, default=1000)
+BULK_ACTIVATION_CHUNK_SIZE = config('BULK_ACTIVATION_CHUNK_SIZE', cast=int, default=1000)
+BULK_ACTIVATION_MAX_IDS = config('BULK_ACTIVATION_MAX_IDS', cast=int, default=50000)
+
+# Tarefas periódicas, sincronizadas com o DatabaseScheduler do django_celery_beat
+CELERY_BEAT_SCHEDULE = {
+    'flush-login-buffer': {
+        'task': 'task_flush_login_buffer',
+        'schedule': LOGIN_WRITE_BEHIND_MAX_STALENESS,
+    },
+    'flush-api-logs': {
+        'task': 'task_flush_api_logs',
+        'schedule': API_LOG_FLUSH_INTERVAL,
+    },
+    'maintain-api-log-partitions': {
+        'task': 'task_maintain_api_log_partitions',
+        'schedule': crontab(minute=0),
+    },
+    'rollup-api-logs': {
+        'task': 'task_rollup_api_logs',
+        'schedule': crontab(minute=5),
+    },
+    'prune-expired-tokens': {
+        'task': 'task_prune_expired_tokens',
+        'schedule': crontab(hour=3, minute=0),
+    },
+    'rebuild-blacklist-filter': {
+        'task': 'task_rebuild_blacklist_filter',
+        'schedule': crontab(minute=30),
+    },
+}
+
 # Email
 EMAIL_HOST = config('EMAIL_HOST')
 EMAIL_PORT = config('EMAIL_PORT', cast=int)
@@ -87,7 +227,6 @@ THIRD_APPS = [
     'django_celery_beat',  # agendamento de tarefas
     'rest_framework',  # api rest
     'rest_framework_simplejwt.token_blacklist',  # blacklist de tokens
-    'drf_api_logger',  # log de api
     'corsheaders',  # cors
     'drf_yasg',  # swagger
 ]
@@ -124,7 +263,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     "corsheaders.middleware.CorsMiddleware",
-    "drf_api_logger.middleware.api_logger_middleware.APILoggerMiddleware",
+    'apps.core.api_logs.APILogMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -177,13 +316,37 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # JSON via orjson; MessagePack para chamadas internas (Accept/Content-Type application/msgpack)
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.core.renderers.ORJSONRenderer',
+        'apps.core.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'apps.core.parsers.ORJSONParser',
+        'apps.core.parsers.MessagePackParser',
+        'apps.core.parsers.LegacyMessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'TEST_REQUEST_RENDERER_CLASSES': [
+        'rest_framework.renderers.MultiPartRenderer',
+        'rest_framework.renderers.JSONRenderer',
+        'apps.core.renderers.MessagePackRenderer',
+    ],
+    # Throttles de janela deslizante dos endpoints anônimos (apps/users/throttling.py)
+    'DEFAULT_THROTTLE_RATES': {
+        'anon_ip': config('THROTTLE_ANON_IP', default='20/min'),
+        'anon_email': config('THROTTLE_ANON_EMAIL', default='5/min'),
+        'anon_global': config('THROTTLE_ANON_GLOBAL', default='600/min'),
+    },
     'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.openapi.AutoSchema',
     'EXCEPTION_HANDLER': 'apps.core.handlers.custom_exception_handler',
 }
@@ -202,12 +365,27 @@ REDOC_SETTINGS = {
     'LAZY_RENDERING': False,
 }
 
+# Assinatura dos JWT: HS256 (SECRET_KEY) ou assimétrica (RS256 | EdDSA) com as
+# chaves <kid>.pem de JWT_KEYS_DIR, publicadas em /.well-known/jwks.json.
+# Veja apps/users/keys.py para o procedimento de rotação.
+JWT_ALGORITHM = config('JWT_ALGORITHM', default='HS256')
+JWT_KEYS_DIR = config('JWT_KEYS_DIR', default=os.path.join(BASE_DIR, 'keys'))
+JWT_ACTIVE_KID = config('JWT_ACTIVE_KID', default='')
+JWKS_MAX_AGE = config('JWKS_MAX_AGE', cast=int, default=3600)
+
+# Cache dos clientes para o catálogo de choices (apps/users/catalog.py), que só muda em deploy
+CHOICES_MAX_AGE = config('CHOICES_MAX_AGE', cast=int, default=86400)
+
+# Máximo de tokens por chamada em /users/token-introspect/
+TOKEN_INTROSPECT_MAX_TOKENS = config('TOKEN_INTROSPECT_MAX_TOKENS', cast=int, default=100)
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=120),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
-    'UPDATE_LAST_LOGIN': True,
+    # Com write-behind o last_login é gravado pelo buffer, não a cada token
+    'UPDATE_LAST_LOGIN': not LOGIN_WRITE_BEHIND,
 
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
@@ -223,15 +401,10 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'USER_AUTHENTICATION_RULE': 'rest_framework_simplejwt.authentication.default_user_authentication_rule',
 
-    'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
+    'AUTH_TOKEN_CLASSES': ('apps.users.tokens.UserAccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
     'TOKEN_USER_CLASS': 'rest_framework_simplejwt.models.TokenUser',
 
     'JTI_CLAIM': 'jti',
 
 }
-
-# Logs
-DRF_API_LOGGER_DATABASE = True
-DRF_API_LOGGER_SIGNAL = True
-DRF_API_LOGGER_TIMEDELTA = -180
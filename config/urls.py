@@ -5,6 +5,8 @@ from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 
+from apps.users.views_service import JWKSView
+
 schema_view = get_schema_view(
     openapi.Info(
         title="Django",
@@ -26,6 +28,7 @@ urlpatterns = [
         admin.site.urls),
     path('core/', include('apps.core.urls')),
     path('users/', include('apps.users.urls')),
+    path('.well-known/jwks.json', JWKSView.as_view(), name='jwks'),
 ]
 
 
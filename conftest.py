@@ -0,0 +1,23 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def local_memory_cache(settings):
+    """Os testes não dependem de um Redis rodando: usa cache em memória."""
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+    yield
+    from django.core.cache import cache  # pylint: disable=import-outside-toplevel
+    from apps.users.authentication import _local_cache  # pylint: disable=import-outside-toplevel
+
+    cache.clear()
+    _local_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def api_log_disabled(settings):
+    """O log da API tem os próprios testes (apps/core/tests.py)."""
+    settings.API_LOG_ENABLED = False
@@ -6,9 +6,12 @@ from decouple import config as config_
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 django.setup()
 
+from django.conf import settings  # noqa: E402  pylint: disable=wrong-import-position
+
 bind = f"[::]:{config_('PORT', default='8000')}"
 workers = 2
-threads = 2
+# O pool de hash de senhas é dimensionado a partir deste valor
+threads = settings.GUNICORN_THREADS
 worker_class = 'sync'
 worker_connections = 1000
 timeout = 300
@@ -24,3 +27,16 @@ access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s"
 
 def post_fork(server, worker):
     pass
+
+
+def worker_exit(server, worker):
+    # Shutdown gracioso: descarrega o buffer write-behind do login e o log
+    # da API em memória, que morreria com o processo
+    from django.conf import settings  # pylint: disable=import-outside-toplevel
+    from apps.core.api_logs import flush_api_logs  # pylint: disable=import-outside-toplevel
+    from apps.users.buffers import flush_login_buffer  # pylint: disable=import-outside-toplevel
+
+    if settings.LOGIN_WRITE_BEHIND:
+        flush_login_buffer()
+    if settings.API_LOG_ENABLED and settings.API_LOG_BACKEND == 'memory':
+        flush_api_logs()